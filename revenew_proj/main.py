@@ -1,19 +1,32 @@
-import sys
+import argparse
+import os
+
+# Pick up solver defaults from the project settings, like manage.py does
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'revenew_proj.settings')
 
 # Import from the app
 from optimizador.dataloader import DataLoader
+from optimizador.multiperiod import MultiPeriodModel, RollingHorizonPlanner
 from optimizador.optimizer import OptimizationModel
+from optimizador.pareto import ParetoFrontier
 from optimizador.results import ResultsHandler
+from optimizador.solver import SolverConfig
 
 
-def run_optimization(csv_path):
+def run_optimization(csv_path, config=None, integer=False, pareto=None,
+                     export_model=None):
     """
     Command-line interface for solving the optimization problem from a CSV file.
 
     Usage:
-        python main.py optimization_problem_data.csv
+        python main.py optimization_problem_data.csv [--solver fast] [--time-limit 10]
     Args:
         csv_path (str): Path to the CSV file containing production parameters.
+        config (SolverConfig): Solver settings, defaults to the project settings.
+        integer (bool): Whether to plan whole units only.
+        pareto (str): Optional second objective to print the frontier for.
+        export_model (str): Optional '.mps', '.lp' or '.npz' file to save the
+            model to.
     """
 
     try:
@@ -24,11 +37,13 @@ def run_optimization(csv_path):
             params = loader.load()
 
             # STEP 2: Solve optimization
-            model = OptimizationModel(params)
+            model = OptimizationModel(params, config, integer=integer)
+            if export_model:
+                model.compile('Integer' if integer else 'Continuous').write(export_model)
             solution = model.solve()
 
             # STEP 3: Format result
-            formatter = ResultsHandler(solution)
+            formatter = ResultsHandler(solution, params)
             result = formatter.format()
 
             # Print to console
@@ -40,12 +55,102 @@ def run_optimization(csv_path):
                 print(f"Product B: {result['Product_B']}")
                 print(f"Total Revenue: ${result['Total_Revenue']:.2f}")
 
+            stats = result.get("solver_stats")
+            if stats:
+                print(f"Solver: {stats['backend']}, "
+                      f"{stats['wall_time']:.3f} s, "
+                      f"{stats['iterations']} iterations")
+                if "mip_gap" in stats:
+                    print(f"MIP gap: {stats['mip_gap']:.2%}, first incumbent "
+                          f"after {stats['time_to_first_incumbent']:.4f} s")
+
+            if pareto:
+                frontier = ParetoFrontier(params, pareto, config).compute()
+                print(f"Pareto frontier (revenue vs. {pareto}):")
+                for point in frontier:
+                    print(f"  {point[pareto]:10.2f}  ${point['Total_Revenue']:.2f}")
+
     except Exception as e:
         print("Error:", str(e))
 
 
+def run_multi_period(csv_path, config=None, window=None, export_model=None):
+    """
+    Command-line interface for multi-period planning from a long-format CSV file.
+
+    Usage:
+        python main.py periods.csv --periods [--window 52]
+    Args:
+        csv_path (str): Path to the CSV file with Period,Parameter,Value lines.
+        config (SolverConfig): Solver settings, defaults to the project settings.
+        window (int): Re-plan only this many trailing periods (rolling horizon).
+        export_model (str): Optional '.mps', '.lp' or '.npz' file to save the
+            full-horizon model to.
+    """
+
+    try:
+        with open(csv_path, 'rb') as f:
+            periods = DataLoader(f).load_periods()
+
+        if export_model:
+            MultiPeriodModel(periods, config=config).compile().write(export_model)
+
+        if window:
+            planner = RollingHorizonPlanner(window, config=config)
+            plan = planner.extend(periods)
+            status, revenue = planner.last_status, planner.total_revenue
+        else:
+            result = MultiPeriodModel(periods, config=config).solve()
+            plan, status, revenue = (result["plan"], result["status"],
+                                     result["Total_Revenue"])
+
+        print("Optimization status:", status)
+        if plan is not None:
+            print(plan.round(2).to_string())
+            print(f"Total Revenue: ${revenue:.2f}")
+
+    except Exception as e:
+        print("Error:", str(e))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Solve the production optimization problem from a CSV file.")
+    parser.add_argument("csv_file", help="CSV file with one row of parameters")
+    parser.add_argument("--solver", choices=SolverConfig.BACKENDS,
+                        help="solver backend (default: OPTIMIZADOR_SOLVER setting)")
+    parser.add_argument("--integer", action="store_true",
+                        help="produce whole units only (MIP mode)")
+    parser.add_argument("--pareto", choices=ParetoFrontier.OBJECTIVES,
+                        help="also compute the revenue trade-off frontier")
+    parser.add_argument("--periods", action="store_true",
+                        help="plan several periods from a long-format CSV "
+                             "(Period,Parameter,Value)")
+    parser.add_argument("--window", type=int,
+                        help="with --periods, re-plan only this many "
+                             "trailing periods (rolling horizon)")
+    parser.add_argument("--export-model", metavar="PATH",
+                        help="also save the model as .mps, .lp or .npz "
+                             "(replay it with 'manage.py replay_models')")
+    parser.add_argument("--time-limit", type=float,
+                        help="maximum solver time in seconds")
+    parser.add_argument("--mip-gap", type=float,
+                        help="relative MIP gap at which to stop")
+    parser.add_argument("--threads", type=int,
+                        help="number of solver threads")
+    parser.add_argument("--verbose", dest="quiet", action="store_false",
+                        default=None, help="print the solver log")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <csv_file>")
+    args = parse_args()
+    config = SolverConfig.from_settings(
+        backend=args.solver, time_limit=args.time_limit,
+        mip_gap=args.mip_gap, threads=args.threads, quiet=args.quiet)
+    if args.periods:
+        run_multi_period(args.csv_file, config, window=args.window,
+                         export_model=args.export_model)
     else:
-        run_optimization(sys.argv[1])
+        run_optimization(args.csv_file, config, integer=args.integer,
+                         pareto=args.pareto, export_model=args.export_model)
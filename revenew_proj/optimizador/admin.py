@@ -1,3 +1,9 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import OptimizationRun
+
+
+@admin.register(OptimizationRun)
+class OptimizationRunAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'created_at', 'integer', 'status', 'total_revenue')
+    list_filter = ('status', 'integer')
@@ -0,0 +1,221 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+class Saturated(Exception):
+    '''
+    Raised when a gate cannot admit more work.
+    Attributes:
+        gate (str): Name of the saturated gate.
+        retry_after (int): Seconds after which the client may retry.
+    '''
+
+    def __init__(self, gate, reason, retry_after):
+        super().__init__(f"Too many concurrent {gate} requests ({reason}).")
+        self.gate = gate
+        self.retry_after = retry_after
+
+
+class Gate:
+    '''
+    Limits how many callers run a kind of work at once.
+    Up to `limit` callers are admitted; the next `max_queue` ones wait for a
+    free slot for at most `timeout` seconds, and anyone beyond that is
+    refused right away. Refusals are counted separately for a full queue
+    (rejected) and for waiting too long (timed_out).
+    Attributes:
+        name (str): Name of the kind of work, e.g. 'solve'.
+        limit (int): Concurrent callers admitted, None for no limit.
+        max_queue (int): Callers allowed to wait for a slot.
+        timeout (float): Seconds a caller may wait.
+        retry_after (int): Retry-After hint carried by Saturated.
+    '''
+
+    def __init__(self, name, limit, max_queue=0, timeout=0.0, retry_after=5):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        '''
+        Takes a slot, waiting in the queue if needed.
+        Args:
+            timeout (float): Overrides the gate's timeout.
+        Raises:
+            Saturated: If the queue is full or no slot freed up in time.
+        '''
+        timeout = self.timeout if timeout is None else timeout
+        with self._cond:
+            if self.limit is not None and self.active >= self.limit:
+                if self.waiting >= self.max_queue or timeout <= 0:
+                    self.rejected += 1
+                    raise Saturated(self.name, "queue full", self.retry_after)
+
+                self.waiting += 1
+                deadline = time.monotonic() + timeout
+                try:
+                    while self.active >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.timed_out += 1
+                            raise Saturated(self.name, "timed out in queue",
+                                            self.retry_after)
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+            self.admitted += 1
+
+    def wait(self, ready, timeout=None):
+        '''
+        Waits in the queue without taking a slot, e.g. for an identical
+        request that another caller is computing. Counted and bounded like
+        acquire(): refused if the queue is full, given up after timeout.
+        Args:
+            ready (callable): Called with the seconds left, blocks for at
+                most that long and returns whether the wait is over.
+            timeout (float): Overrides the gate's timeout.
+        Raises:
+            Saturated: If the queue is full or the wait took too long.
+        '''
+        timeout = self.timeout if timeout is None else timeout
+        with self._cond:
+            if self.limit is not None and self.waiting >= self.max_queue:
+                self.rejected += 1
+                raise Saturated(self.name, "queue full", self.retry_after)
+            self.waiting += 1
+
+        deadline = time.monotonic() + timeout
+        try:
+            while not ready(max(deadline - time.monotonic(), 0.0)):
+                if time.monotonic() >= deadline:
+                    with self._cond:
+                        self.timed_out += 1
+                    raise Saturated(self.name, "timed out waiting for an "
+                                    "identical request", self.retry_after)
+        finally:
+            with self._cond:
+                self.waiting -= 1
+
+    def try_acquire(self) -> bool:
+        '''
+        Takes a slot only if one is free and no caller is waiting for it.
+        Never waits and is not counted as a rejection: meant for background
+        work that must not compete with requests.
+        Returns:
+            bool: Whether a slot was taken (release it with release()).
+        '''
+        with self._cond:
+            if self.waiting or (self.limit is not None and self.active >= self.limit):
+                return False
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self, timeout=None):
+        '''Holds a slot for the duration of the block (see acquire()).'''
+        self.acquire(timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @contextmanager
+    def try_slot(self, timeout=None):
+        '''
+        Like slot(), but never raises: yields True if a slot was taken, False
+        if the caller should degrade instead (e.g. skip optional work).
+        '''
+        try:
+            self.acquire(timeout)
+        except Saturated:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "active": self.active,
+                "waiting": self.waiting,
+                "max_queue": self.max_queue,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+
+class AdmissionController:
+    '''
+    The gates of one process:
+        - 'solve': solver runs. When saturated, requests are refused (503).
+        - 'render': plot rendering. When saturated, results are shown
+          without plots.
+    Attributes:
+        solve (Gate): Gate for solver runs.
+        render (Gate): Gate for plot rendering.
+    '''
+
+    def __init__(self, max_solves=4, max_renders=2, max_queue=16,
+                 queue_timeout=10.0, render_timeout=1.0, retry_after=5):
+        self.solve = Gate('solve', max_solves, max_queue, queue_timeout,
+                          retry_after)
+        self.render = Gate('render', max_renders, max_queue, render_timeout,
+                           retry_after)
+
+    def stats(self) -> dict:
+        return {gate.name: gate.stats() for gate in (self.solve, self.render)}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_admission() -> AdmissionController:
+    '''
+    Returns the process-wide AdmissionController configured by the
+    OPTIMIZADOR_ADMISSION setting, e.g.:
+
+        OPTIMIZADOR_ADMISSION = {
+            'MAX_SOLVES': 4,       # Concurrent solves, None for no limit
+            'MAX_RENDERS': 2,      # Concurrent plot renders, None for no limit
+            'MAX_QUEUE': 16,       # Requests waiting per gate
+            'QUEUE_TIMEOUT': 10,   # Seconds a solve may wait for a slot
+            'RENDER_TIMEOUT': 1,   # Seconds before plots are skipped instead
+            'RETRY_AFTER': 5,      # Retry-After header of 503 responses
+        }
+    '''
+    global _default
+    with _default_lock:
+        if _default is None:
+            config = getattr(settings, 'OPTIMIZADOR_ADMISSION', {})
+            _default = AdmissionController(
+                max_solves=config.get('MAX_SOLVES', 4),
+                max_renders=config.get('MAX_RENDERS', 2),
+                max_queue=config.get('MAX_QUEUE', 16),
+                queue_timeout=config.get('QUEUE_TIMEOUT', 10.0),
+                render_timeout=config.get('RENDER_TIMEOUT', 1.0),
+                retry_after=config.get('RETRY_AFTER', 5))
+        return _default
@@ -0,0 +1,271 @@
+from io import BytesIO
+import base64
+
+import matplotlib.pyplot as plt
+import numpy as np
+from django.core.exceptions import ValidationError
+
+from .optimizer import OptimizationModel
+from .scenarios import ResultBatch, ScenarioBatch
+
+
+def shadow_prices(batch) -> np.ndarray:
+    '''
+    Computes the shadow price of each machine's hours for every scenario of
+    a batch, by enumerating the vertices of the dual problem
+        min cap1*y1 + cap2*y2  s.t.  a1*y1 + a2*y2 >= price_A,
+                                     b1*y1 + b2*y2 >= price_B,  y >= 0
+    with vectorized NumPy operations, like OptimizationModel's fast batch
+    solver does for the primal. For whole-unit plans these are the prices of
+    the continuous relaxation.
+    Args:
+        batch (ScenarioBatch): The scenarios.
+    Returns:
+        ndarray: Shape (len(batch), 2), the revenue gained per extra hour on
+            machine 1 and 2; NaN where the problem has no optimal solution.
+    '''
+    col = batch.column
+    price_A, price_B = col("Price_Product_A"), col("Price_Product_B")
+    a1 = col("Product_A_Production_Time_Machine_1")
+    b1 = col("Product_B_Production_Time_Machine_1")
+    cap1 = col("Machine_1_Available_Hours")
+    a2 = col("Product_A_Production_Time_Machine_2")
+    b2 = col("Product_B_Production_Time_Machine_2")
+    cap2 = col("Machine_2_Available_Hours")
+
+    # Candidate dual vertices, one column each (NaN where they do not exist)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det = a1 * b2 - a2 * b1
+        zeros = np.zeros(len(batch))
+        y1 = np.stack([
+            zeros,
+            np.where(a1 > 0, price_A / a1, np.nan),
+            np.where(b1 > 0, price_B / b1, np.nan),
+            zeros, zeros,
+            np.where(det != 0, (price_A * b2 - a2 * price_B) / det, np.nan),
+        ], axis=1)
+        y2 = np.stack([
+            zeros, zeros, zeros,
+            np.where(a2 > 0, price_A / a2, np.nan),
+            np.where(b2 > 0, price_B / b2, np.nan),
+            np.where(det != 0, (a1 * price_B - b1 * price_A) / det, np.nan),
+        ], axis=1)
+
+    tol = 1e-9
+    feasible = (
+        (y1 >= -tol) & (y2 >= -tol)
+        & (a1[:, None] * y1 + a2[:, None] * y2
+           >= (price_A - tol * np.maximum(1.0, price_A))[:, None])
+        & (b1[:, None] * y1 + b2[:, None] * y2
+           >= (price_B - tol * np.maximum(1.0, price_B))[:, None])
+    )
+    cost = np.where(feasible, cap1[:, None] * y1 + cap2[:, None] * y2, np.inf)
+    best = np.argmin(cost, axis=1)
+    rows = np.arange(len(batch))
+
+    prices = np.stack([y1[rows, best], y2[rows, best]], axis=1)
+    prices[~feasible.any(axis=1)] = np.nan
+    return np.maximum(prices, 0.0)
+
+
+class ScenarioComparison:
+    '''
+    Compares solved scenarios against a baseline: quantity and revenue
+    deltas, machine slack, binding constraints and shadow prices, all
+    computed column-wise over the whole set, plus one overlay chart.
+    Attributes:
+        batch (ScenarioBatch): The scenarios.
+        results (ResultBatch): Their solutions, in the same order.
+        labels (list): Display name of each scenario.
+        baseline (int): Index of the scenario deltas are taken against.
+    '''
+    MIN_SCENARIOS = 2
+    MAX_SCENARIOS = 50
+    MACHINES = [1, 2]
+
+    def __init__(self, batch, results, labels=None, baseline=0):
+        self.check_size(len(batch))
+        if not 0 <= baseline < len(batch):
+            raise ValidationError("The baseline must be one of the compared scenarios.")
+        self.batch = batch
+        self.results = results
+        self.labels = labels or [f"Row {i + 1}" for i in range(len(batch))]
+        self.baseline = baseline
+
+    @classmethod
+    def check_size(cls, count):
+        '''Raises ValidationError unless count scenarios can be compared.'''
+        if not cls.MIN_SCENARIOS <= count <= cls.MAX_SCENARIOS:
+            raise ValidationError(
+                f"Select between {cls.MIN_SCENARIOS} and {cls.MAX_SCENARIOS} "
+                f"scenarios to compare, got {count}.")
+
+    @classmethod
+    def from_runs(cls, runs, baseline=0):
+        '''
+        Compares stored runs, without solving them again.
+        Args:
+            runs (list): OptimizationRun instances.
+            baseline (int): Index of the baseline run.
+        '''
+        batch = ScenarioBatch.from_records(run.params for run in runs)
+        results = ResultBatch.empty(len(runs))
+        for index, run in enumerate(runs):
+            results.set(index, run.solution)
+        return cls(batch, results, [f"#{run.pk} {run.name}" for run in runs], baseline)
+
+    @classmethod
+    def from_batch(cls, batch, integer=False, baseline=0, config=None):
+        '''
+        Solves and compares the scenarios of an uploaded batch.
+        Args:
+            batch (ScenarioBatch): The scenarios, e.g. from DataLoader.load_batch().
+            integer (bool): Whether to plan whole units only.
+            baseline (int): Index of the baseline scenario.
+            config (SolverConfig): Solver settings, default from settings.
+        Raises:
+            ValidationError: If the batch is too small or too large.
+        '''
+        cls.check_size(len(batch))
+        results = OptimizationModel.solve_batch(batch, config, integer)
+        return cls(batch, results, baseline=baseline)
+
+    def compute(self) -> dict:
+        '''
+        Returns:
+            dict: Arrays with one entry per scenario (NaN where a scenario
+                has no optimal solution):
+                - optimal: Whether the scenario was solved to optimality.
+                - Product_A, Product_B, Total_Revenue: The plans.
+                - delta_Product_A, delta_Product_B, delta_Total_Revenue:
+                  Differences to the baseline.
+                - delta_Total_Revenue_pct: Revenue change in percent.
+                - slack: Unused hours per machine, shape (n, 2).
+                - binding: Whether each machine is at capacity, shape (n, 2).
+                - binding_changed: Whether that differs from the baseline,
+                  shape (n, 2). False unless both are optimal.
+                - shadow_price: Revenue per extra machine hour, shape (n, 2).
+                - delta_shadow_price: Difference to the baseline, shape (n, 2).
+        '''
+        col = self.batch.column
+        optimal = self.results.column('status') == 1
+        quantity_A = self.results.column('Product_A')
+        quantity_B = self.results.column('Product_B')
+        revenue = self.results.column('Total_Revenue')
+
+        used = np.stack([
+            col(f"Product_A_Production_Time_Machine_{m}") * quantity_A
+            + col(f"Product_B_Production_Time_Machine_{m}") * quantity_B
+            for m in self.MACHINES], axis=1)
+        capacity = np.stack([col(f"Machine_{m}_Available_Hours")
+                             for m in self.MACHINES], axis=1)
+        slack = capacity - used
+        # Stored runs are rounded to 2 decimals: allow for the hours that
+        # rounding each quantity by up to 0.005 units can hide
+        rounding = 0.005 * np.stack([
+            col(f"Product_A_Production_Time_Machine_{m}")
+            + col(f"Product_B_Production_Time_Machine_{m}")
+            for m in self.MACHINES], axis=1)
+        binding = optimal[:, None] & (
+            slack <= rounding + 1e-9 * np.maximum(1.0, capacity))
+        prices = shadow_prices(self.batch)
+        prices[~optimal] = np.nan
+
+        analysis = {
+            "optimal": optimal,
+            "Product_A": quantity_A,
+            "Product_B": quantity_B,
+            "Total_Revenue": revenue,
+            "slack": slack,
+            "binding": binding,
+            "shadow_price": prices,
+        }
+        for name in ("Product_A", "Product_B", "Total_Revenue", "shadow_price"):
+            analysis[f"delta_{name}"] = analysis[name] - analysis[name][self.baseline]
+        analysis["binding_changed"] = (
+            (optimal & optimal[self.baseline])[:, None]
+            & (binding != binding[self.baseline]))
+        base_revenue = revenue[self.baseline]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            analysis["delta_Total_Revenue_pct"] = np.where(
+                base_revenue != 0,
+                100.0 * analysis["delta_Total_Revenue"] / abs(base_revenue), np.nan)
+        return analysis
+
+    def rows(self) -> list:
+        '''
+        Returns:
+            list: One dict per scenario for the comparison table, with the
+                values of compute() as floats (None for NaN) and 'label',
+                'status', 'is_baseline' and 'machines' (one dict per machine
+                with 'slack', 'binding', 'binding_changed', 'shadow_price'
+                and 'delta_shadow_price').
+        '''
+        analysis = self.compute()
+
+        def number(value):
+            return None if np.isnan(value) else round(float(value), 2)
+
+        rows = []
+        for index, label in enumerate(self.labels):
+            row = {
+                "label": label,
+                "status": self.results[index]["status"],
+                "is_baseline": index == self.baseline,
+                "machines": [{
+                    "machine": m,
+                    "slack": number(analysis["slack"][index, i]),
+                    "binding": bool(analysis["binding"][index, i]),
+                    "binding_changed": bool(analysis["binding_changed"][index, i]),
+                    "shadow_price": number(analysis["shadow_price"][index, i]),
+                    "delta_shadow_price": number(analysis["delta_shadow_price"][index, i]),
+                } for i, m in enumerate(self.MACHINES)],
+            }
+            for name in ("Product_A", "Product_B", "Total_Revenue",
+                         "delta_Product_A", "delta_Product_B",
+                         "delta_Total_Revenue", "delta_Total_Revenue_pct"):
+                row[name] = number(analysis[name][index])
+            rows.append(row)
+        return rows
+
+    def plot(self) -> str:
+        '''
+        Generates one chart of all scenarios: production quantities as
+        grouped bars, with revenue overlaid on a second axis.
+        Returns:
+            str: A base64-encoded string representing the plot image.
+        '''
+        x = np.arange(len(self.labels))
+        quantity_A = np.nan_to_num(self.results.column('Product_A'))
+        quantity_B = np.nan_to_num(self.results.column('Product_B'))
+        revenue = self.results.column('Total_Revenue')
+
+        fig, ax = plt.subplots(figsize=(max(8, 0.45 * len(x) + 4), 5))
+        width = 0.4
+        ax.bar(x - width / 2, quantity_A, width, color="steelblue", label="Product A")
+        ax.bar(x + width / 2, quantity_B, width, color="salmon", label="Product B")
+        ax.set_ylabel("Quantity (Units)")
+        ax.set_ylim(bottom=0)
+        ax.set_xticks(x)
+        ax.set_xticklabels(self.labels, rotation=45 if len(x) > 6 else 0,
+                           ha='right' if len(x) > 6 else 'center')
+
+        revenue_ax = ax.twinx()
+        revenue_ax.plot(x, revenue, '-o', color='black', label="Total Revenue")
+        revenue_ax.axhline(revenue[self.baseline], color='gray', linestyle=':',
+                           label="Baseline revenue")
+        revenue_ax.set_ylabel("Total Revenue")
+        revenue_ax.set_ylim(bottom=0)
+
+        handles, labels = ax.get_legend_handles_labels()
+        more_handles, more_labels = revenue_ax.get_legend_handles_labels()
+        ax.legend(handles + more_handles, labels + more_labels, loc='upper left')
+        ax.set_title("Scenario Comparison")
+
+        # Save to memory
+        buffer = BytesIO()
+        plt.tight_layout()
+        plt.savefig(buffer, format='png')
+        plt.close(fig)  # Close the figure to free memory
+        plot_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        return f"data:image/png;base64,{plot_base64}"
@@ -0,0 +1,350 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import cached_property
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from pulp import (LpAffineExpression, LpConstraint, LpMaximize, LpMinimize,
+                  LpProblem, LpVariable)
+
+
+class CompiledModel:
+    '''
+    Matrix form of a linear model:
+
+        optimize  objective · x
+        s.t.      A x (senses) rhs,   lower <= x <= upper
+
+    with A stored as coordinates (rows, cols, values). Everything that is
+    not a number (names, categories, senses and the sparsity pattern of A)
+    makes up the structure, which structure_key identifies. Two models with
+    the same key only differ in their coefficients, so a PuLP problem built
+    for one can be reused for the other by patching numbers into it (see
+    ModelCache).
+    Attributes:
+        name (str): Problem name.
+        sense (int): LpMaximize or LpMinimize.
+        variables (ndarray): Variable names.
+        categories (ndarray): PuLP category of each variable.
+        lower, upper (ndarray): Variable bounds, NaN where unbounded.
+        objective (ndarray): Dense objective coefficients.
+        constraints (ndarray): Constraint names.
+        senses (ndarray): PuLP sense of each constraint.
+        rhs (ndarray): Right-hand side of each constraint.
+        rows, cols, values (ndarray): Nonzero pattern and coefficients of A,
+            sorted by row.
+    '''
+    ARRAYS = ('variables', 'categories', 'lower', 'upper', 'objective',
+              'constraints', 'senses', 'rhs', 'rows', 'cols', 'values')
+
+    def __init__(self, name, sense, variables, categories, lower, upper,
+                 objective, constraints, senses, rhs, rows, cols, values):
+        self.name = name
+        self.sense = int(sense)
+        self.variables = np.asarray(variables, dtype=str)
+        self.categories = np.asarray(categories, dtype=str)
+        self.lower = np.asarray(lower, dtype='f8')
+        self.upper = np.asarray(upper, dtype='f8')
+        self.objective = np.asarray(objective, dtype='f8')
+        self.constraints = np.asarray(constraints, dtype=str)
+        self.senses = np.asarray(senses, dtype='i1')
+        self.rhs = np.asarray(rhs, dtype='f8')
+        self.rows = np.asarray(rows, dtype='i4')
+        self.cols = np.asarray(cols, dtype='i4')
+        self.values = np.asarray(values, dtype='f8')
+
+    @property
+    def shape(self) -> tuple:
+        return len(self.constraints), len(self.variables)
+
+    @cached_property
+    def structure_key(self) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{self.name}\0{self.sense}".encode('utf-8'))
+        for name in ('variables', 'categories', 'constraints',
+                     'senses', 'rows', 'cols'):
+            array = getattr(self, name)
+            digest.update(f"\0{name}:{array.dtype.str}:{len(array)}".encode('utf-8'))
+            digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    @classmethod
+    def from_problem(cls, prob):
+        '''
+        Extracts the matrix form of a PuLP problem.
+        Args:
+            prob (LpProblem): The problem.
+        Returns:
+            CompiledModel: Its matrix form.
+        '''
+        variables = prob.variables()
+        index = {v.name: j for j, v in enumerate(variables)}
+
+        objective = np.zeros(len(variables))
+        for var, coef in prob.objective.items():
+            objective[index[var.name]] = coef
+
+        rows, cols, values, senses, rhs = [], [], [], [], []
+        for i, constraint in enumerate(prob.constraints.values()):
+            for var, coef in constraint.expr.items():
+                rows.append(i)
+                cols.append(index[var.name])
+                values.append(coef)
+            senses.append(constraint.sense)
+            rhs.append(-constraint.constant)
+
+        def bound(b):
+            return np.nan if b is None else b
+
+        return cls(
+            prob.name, prob.sense,
+            [v.name for v in variables], [v.cat for v in variables],
+            [bound(v.lowBound) for v in variables],
+            [bound(v.upBound) for v in variables],
+            objective, list(prob.constraints), senses, rhs, rows, cols, values)
+
+    def to_problem(self):
+        '''
+        Builds the PuLP problem from expressions given as (variable,
+        coefficient) lists, which is much faster than operator overloading.
+        Returns:
+            tuple: The problem and its variables, in the order of `variables`.
+        '''
+        prob = LpProblem(self.name, self.sense)
+        variables = [
+            LpVariable(name, lowBound=_bound(lo), upBound=_bound(up), cat=cat)
+            for name, cat, lo, up in zip(self.variables.tolist(),
+                                         self.categories.tolist(),
+                                         self.lower.tolist(), self.upper.tolist())]
+        prob.addVariables(variables)
+
+        nonzero = np.flatnonzero(self.objective)
+        prob.setObjective(LpAffineExpression(
+            [(variables[j], self.objective[j]) for j in nonzero.tolist()]))
+
+        bounds = np.searchsorted(self.rows, np.arange(len(self.constraints) + 1))
+        cols, values = self.cols.tolist(), self.values.tolist()
+        for i, (name, sense, rhs) in enumerate(zip(self.constraints.tolist(),
+                                                   self.senses.tolist(),
+                                                   self.rhs.tolist())):
+            start, end = bounds[i], bounds[i + 1]
+            terms = [(variables[j], v)
+                     for j, v in zip(cols[start:end], values[start:end])]
+            prob.addConstraint(LpConstraint(
+                LpAffineExpression(terms), sense, name, rhs))
+        return prob, variables
+
+    def patch(self, prob, variables, previous=None):
+        '''
+        Writes the coefficients of this model into a problem built for a model
+        with the same structure_key.
+        Args:
+            prob (LpProblem): The problem, as from to_problem().
+            variables (list): Its variables, as from to_problem().
+            previous (CompiledModel): The model whose numbers the problem holds
+                now. Only coefficients that differ from it are written; if
+                None, all of them are.
+        '''
+        def changed(name):
+            new = getattr(self, name)
+            if previous is None:
+                return np.arange(len(new)).tolist()
+            old = getattr(previous, name)
+            same = (new == old) | (np.isnan(new) & np.isnan(old))
+            return np.flatnonzero(~same).tolist()
+
+        for j in changed('objective'):
+            prob.objective[variables[j]] = float(self.objective[j])
+        for j in changed('lower'):
+            variables[j].lowBound = _bound(self.lower[j])
+        for j in changed('upper'):
+            variables[j].upBound = _bound(self.upper[j])
+
+        constraints = list(prob.constraints.values())
+        for k in changed('values'):
+            constraints[self.rows[k]].expr[variables[self.cols[k]]] = float(self.values[k])
+        for i in changed('rhs'):
+            constraints[i].changeRHS(float(self.rhs[i]))
+
+    def write(self, path):
+        '''
+        Saves the model; the format follows the extension: '.mps' and '.lp'
+        (through PuLP, readable by any LP solver) or '.npz' (the arrays
+        themselves, the fastest to save and load).
+        Args:
+            path (str): Destination file.
+        '''
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.npz':
+            np.savez(path, name=np.array(self.name), sense=np.array(self.sense),
+                     **{name: getattr(self, name) for name in self.ARRAYS})
+        elif extension == '.mps':
+            self.to_problem()[0].writeMPS(path, with_objsense=True)
+        elif extension == '.lp':
+            self.to_problem()[0].writeLP(path)
+        else:
+            raise ValueError(f"Unknown model format {extension!r}, "
+                             "expected '.mps', '.lp' or '.npz'.")
+
+    @classmethod
+    def read(cls, path):
+        '''
+        Loads a model saved with write(). PuLP has no LP-format reader, so
+        '.lp' files cannot be read back; use '.mps' or '.npz'.
+        Args:
+            path (str): Source file.
+        Returns:
+            CompiledModel: The model.
+        '''
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.npz':
+            with np.load(path, allow_pickle=False) as data:
+                return cls(str(data['name']), int(data['sense']),
+                           **{name: data[name] for name in cls.ARRAYS})
+        if extension == '.mps':
+            _, prob = LpProblem.fromMPS(path, sense=_mps_sense(path))
+            return cls.from_problem(prob)
+        raise ValueError(f"Cannot read models from {extension!r} files, "
+                         "expected '.mps' or '.npz'.")
+
+
+def _mps_sense(path):
+    # PuLP's reader ignores the OBJSENSE section written by writeMPS()
+    with open(path) as f:
+        for line in f:
+            words = line.split()
+            if not words or words[0] != 'OBJSENSE':
+                if words and words[0] in ('NAME', 'ROWS'):
+                    break
+                continue
+            sense = words[1] if len(words) > 1 else next(f, '').strip()
+            return LpMaximize if sense.upper().startswith('MAX') else LpMinimize
+    return LpMinimize
+
+
+def _bound(value):
+    return None if np.isnan(value) else float(value)
+
+
+class _Instance:
+    __slots__ = ('prob', 'variables', 'model')
+
+    def __init__(self, prob, variables, model):
+        self.prob = prob
+        self.variables = variables
+        self.model = model  # CompiledModel whose numbers prob holds
+
+
+class ModelCache:
+    '''
+    Keeps built PuLP problems, keyed by structure, for reuse.
+    A model whose structure was seen before is not built again: an idle
+    problem of the same structure is taken and only the coefficients that
+    differ are patched into it. A problem is used by one caller at a time;
+    concurrent callers with the same structure each get their own.
+    Attributes:
+        max_entries (int): Number of structures kept, least recently used
+            ones are dropped first. 0 disables the cache.
+        max_idle (int): Idle problems kept per structure.
+        export_dir (str): If set, every model solved through the cache is
+            also saved there as '.npz', for replaying offline.
+    '''
+
+    def __init__(self, max_entries=64, max_idle=4, export_dir=None):
+        self.max_entries = max_entries
+        self.max_idle = max_idle
+        self.export_dir = export_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._idle = OrderedDict()
+        if export_dir:
+            os.makedirs(export_dir, exist_ok=True)
+
+    @contextmanager
+    def problem(self, model):
+        '''
+        Provides a PuLP problem holding the given model.
+        Args:
+            model (CompiledModel): The model to solve.
+        Yields:
+            tuple: The problem and its variables, as from to_problem().
+        '''
+        key = model.structure_key
+        with self._lock:
+            idle = self._idle.get(key)
+            instance = idle.pop() if idle else None
+            if instance is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if instance is None:
+            instance = _Instance(*model.to_problem(), model)
+        else:
+            model.patch(instance.prob, instance.variables, instance.model)
+            instance.model = model
+            # No values from the previous solve must leak into this one
+            for var in instance.variables:
+                var.varValue = None
+
+        if self.export_dir:
+            model.write(os.path.join(
+                self.export_dir, f"{key[:16]}-{time.time_ns()}.npz"))
+
+        try:
+            yield instance.prob, instance.variables
+        finally:
+            self._release(key, instance)
+
+    def _release(self, key, instance):
+        if not self.max_entries:
+            return
+        if not instance.model.objective.any():
+            # Solving an empty objective makes PuLP add a '__dummy' variable
+            # to the problem for good: it must not be patched and reused
+            return
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(idle) < self.max_idle:
+                idle.append(instance)
+            while len(self._idle) > self.max_entries:
+                self._idle.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._idle.clear()
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_model_cache() -> ModelCache:
+    '''
+    Returns the process-wide ModelCache configured by the
+    OPTIMIZADOR_MODEL_CACHE setting, e.g.:
+
+        OPTIMIZADOR_MODEL_CACHE = {
+            'MAX_ENTRIES': 64,     # 0 disables the cache
+            'MAX_IDLE': 4,
+            'EXPORT_DIR': None,    # Directory to save every solved model to
+        }
+    '''
+    global _default
+    with _default_lock:
+        if _default is None:
+            try:
+                config = getattr(settings, 'OPTIMIZADOR_MODEL_CACHE', {})
+            except ImproperlyConfigured:  # Used outside of Django
+                config = {}
+            _default = ModelCache(config.get('MAX_ENTRIES', 64),
+                                  config.get('MAX_IDLE', 4),
+                                  config.get('EXPORT_DIR'))
+        return _default
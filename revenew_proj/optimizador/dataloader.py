@@ -24,6 +24,17 @@ class DataLoader:
           for p in PRODUCTS]
     ]
 
+    # Optional per-machine overtime limits (used by the overtime frontier);
+    # empty cells mean no overtime
+    OVERTIME_COLUMNS = [f'Machine_{m}_Overtime_Hours' for m in MACHINES]
+
+    # Long-format multi-period files: one (Period, Parameter, Value) per line
+    PERIOD_COLUMNS = ['Period', 'Parameter', 'Value']
+    OPTIONAL_PERIOD_PARAMETERS = [
+        *[f'Demand_Product_{p}' for p in PRODUCTS],
+        *[f'Holding_Cost_Product_{p}' for p in PRODUCTS],
+    ]
+
     def __init__(self, file):
         '''
         Initializes the DataLoader with the file path.
@@ -40,31 +51,263 @@ class DataLoader:
         Raises:
             ValidationError: If the CSV file is invalid.
         '''
+        parsed = self._parsed_upload()
+        if parsed is not None:
+            if len(parsed) != 1:
+                raise ValidationError(
+                    "CSV should contain exactly one row of parameters.")
+            return next(parsed.scenarios())
+
         try:
             # Load CSV into DataFrame
             df = pd.read_csv(self.file)
         except Exception as e:
             raise ValidationError(f"Error reading CSV file: {e}")
 
-        # Ensure required columns are present
-        missing = [col for col in self.REQUIRED_COLUMNS if col not in df.columns]
+        self._validate(df)
+
+        # Optional: check if there is exactly one row
+        if len(df) != 1:
+            raise ValidationError(
+                "CSV should contain exactly one row of parameters.")
+
+        # Return the clean row as a dictionary
+        return df.iloc[0].to_dict()
+
+    def iter_scenarios(self, chunksize=500, row_errors=False):
+        '''
+        Lazily loads and validates a CSV file with one scenario per row.
+        The file is read in chunks so memory stays bounded regardless of
+        the number of rows.
+        Args:
+            chunksize (int): Number of rows parsed and validated at a time.
+            row_errors (bool): Whether to yield a ValidationError in place of
+                each row with invalid values, instead of raising it, so
+                callers can report bad rows and go on with the others.
+        Yields:
+            dict: The validated parameters of each scenario, in file order.
+        Raises:
+            ValidationError: If the CSV file, or any chunk of it, is invalid.
+        '''
+        parsed = self._parsed_upload(row_errors)
+        if parsed is not None:
+            yield from parsed.scenarios()
+            return
+
+        for chunk in self._iter_chunks(chunksize, validate=not row_errors):
+            if not row_errors:
+                yield from chunk.to_dict('records')
+                continue
+            self._check_columns(chunk)
+            try:
+                self._validate(chunk)
+                yield from chunk.to_dict('records')
+            except ValidationError:
+                # Find the bad rows of the chunk one by one
+                for i in range(len(chunk)):
+                    row = chunk.iloc[[i]].copy()
+                    try:
+                        self._validate(row)
+                    except ValidationError as e:
+                        yield e
+                        continue
+                    # Columns with a bad value elsewhere were read as text
+                    record = row.to_dict('records')[0]
+                    yield {**record, **self.validate_params(record)}
+
+    def load_batch(self, chunksize=10000):
+        '''
+        Loads and validates a CSV file with one scenario per row into a
+        compact columnar ScenarioBatch (64 bytes per scenario).
+        Args:
+            chunksize (int): Number of rows parsed and validated at a time.
+        Returns:
+            ScenarioBatch: The validated scenarios, in file order.
+        Raises:
+            ValidationError: If the CSV file is invalid or has no rows.
+        '''
+        from .scenarios import ScenarioBatch
+
+        parsed = self._parsed_upload()
+        if parsed is not None:
+            # Already packed while streaming in, no copy needed
+            batches = [parsed.batch()] if len(parsed) else []
+        else:
+            batches = [ScenarioBatch.from_dataframe(chunk)
+                       for chunk in self._iter_chunks(chunksize)]
+        if not batches or not sum(len(b) for b in batches):
+            raise ValidationError(
+                "CSV should contain at least one row of parameters.")
+        return batches[0] if len(batches) == 1 else ScenarioBatch.concatenate(batches)
+
+    def _parsed_upload(self, row_errors=False):
+        '''
+        Returns the upload if StreamingCSVUploadHandler already parsed it
+        (raising the error it found, if any, and unless row_errors, that of
+        its first invalid row), otherwise None.
+        '''
+        from .uploadhandlers import ParsedCSVUpload
+
+        if not isinstance(self.file, ParsedCSVUpload):
+            return None
+        if self.file.error is not None:
+            raise ValidationError(self.file.error)
+        if self.file.row_errors and not row_errors:
+            raise ValidationError(next(iter(self.file.row_errors.values())))
+        return self.file
+
+    def _iter_chunks(self, chunksize, validate=True):
+        # Yields DataFrames of at most chunksize rows, validated unless told
+        try:
+            reader = pd.read_csv(self.file, chunksize=chunksize)
+            for chunk in reader:
+                if validate:
+                    self._validate(chunk)
+                yield chunk
+        except ValidationError:
+            raise
+        except Exception as e:
+            raise ValidationError(f"Error reading CSV file: {e}")
+
+    def load_periods(self):
+        '''
+        Loads and validates a long-format multi-period CSV file.
+        Each line holds one parameter of one period, e.g.
+        "3,Machine_1_Available_Hours,40". Every period needs all
+        REQUIRED_COLUMNS; OPTIONAL_PERIOD_PARAMETERS (per-period demand caps
+        and inventory holding costs) may be given for some or all periods.
+        Returns:
+            DataFrame: One row per period, sorted by period, one column per
+                parameter. Optional parameters are NaN where not given.
+        Raises:
+            ValidationError: If the CSV file is invalid.
+        '''
+        try:
+            df = pd.read_csv(self.file)
+        except Exception as e:
+            raise ValidationError(f"Error reading CSV file: {e}")
+
+        missing = [col for col in self.PERIOD_COLUMNS if col not in df.columns]
         if missing:
             raise ValidationError(f"Missing required columns: {missing}")
 
+        df['Value'] = pd.to_numeric(df['Value'], errors='coerce')
+        if df['Value'].isnull().any():
+            raise ValidationError("CSV contains non-numeric values.")
+        if (df['Value'] < 0).any():
+            raise ValidationError("CSV contains negative values.")
+        if df.duplicated(['Period', 'Parameter']).any():
+            raise ValidationError(
+                "CSV contains the same parameter twice for a period.")
+
+        if df.empty:
+            raise ValidationError("CSV should contain at least one period.")
+
+        wide = df.pivot(index='Period', columns='Parameter',
+                        values='Value').sort_index()
+
+        columns = self.REQUIRED_COLUMNS + [
+            col for col in self.OPTIONAL_PERIOD_PARAMETERS if col in wide.columns]
+        wide = wide.reindex(columns=columns)
+        incomplete = wide.index[wide[self.REQUIRED_COLUMNS].isnull().any(axis=1)]
+        if len(incomplete):
+            raise ValidationError(
+                f"Missing required parameters for periods: {list(incomplete)}")
+        return wide
+
+    @classmethod
+    def validate_params(cls, params):
+        '''
+        Validates a single scenario given as a mapping (e.g. a JSON object).
+        Args:
+            params (dict): The parameters of one scenario.
+        Returns:
+            dict: The required parameters and any OVERTIME_COLUMNS, converted
+                to floats (a missing overtime limit becomes 0).
+        Raises:
+            ValidationError: If the scenario is invalid.
+        '''
+        if not isinstance(params, dict):
+            raise ValidationError("Each scenario must be an object.")
+
+        missing = [col for col in cls.REQUIRED_COLUMNS if col not in params]
+        if missing:
+            raise ValidationError(f"Missing required columns: {missing}")
+
+        clean = {}
+        for col in cls.REQUIRED_COLUMNS:
+            value = params[col]
+            # Booleans are ints in Python but never a valid parameter
+            if isinstance(value, bool):
+                raise ValidationError(
+                    "Scenario contains non-numeric values in required columns.")
+            try:
+                clean[col] = float(value)
+            except (TypeError, ValueError):
+                clean[col] = float('nan')
+            if clean[col] != clean[col]:  # NaN
+                raise ValidationError(
+                    "Scenario contains non-numeric values in required columns.")
+            if clean[col] < 0:
+                raise ValidationError(
+                    "Scenario contains negative values in required columns.")
+
+        for col in cls.OVERTIME_COLUMNS:
+            if col not in params:
+                continue
+            value = params[col]
+            if value is None or value == '' or value != value:
+                value = 0.0  # No overtime (None, empty or NaN)
+            try:
+                clean[col] = float('nan') if isinstance(value, bool) else float(value)
+            except (TypeError, ValueError):
+                clean[col] = float('nan')
+            if clean[col] != clean[col]:  # NaN
+                raise ValidationError(
+                    "Scenario contains non-numeric values in overtime columns.")
+            if clean[col] < 0:
+                raise ValidationError(
+                    "Scenario contains negative values in overtime columns.")
+        return clean
+
+    def _validate(self, df):
+        '''
+        Runs the column, type and sign checks shared by all loaders, and
+        fills empty overtime limits with 0.
+        Args:
+            df (DataFrame): The parsed CSV rows.
+        Raises:
+            ValidationError: If any check fails.
+        '''
+        self._check_columns(df)
+
         # Ensure all required columns are numeric
-        if not df[self.REQUIRED_COLUMNS].apply(pd.to_numeric, errors='coerce').notnull().all().all():
+        required = df[self.REQUIRED_COLUMNS].apply(pd.to_numeric, errors='coerce')
+        if not required.notnull().all().all():
             raise ValidationError(
                 "CSV contains non-numeric values in required columns.")
 
         # Check that all required values are non-negative
-        if (df[self.REQUIRED_COLUMNS] < 0).any().any():
+        if (required < 0).any().any():
             raise ValidationError(
                 "CSV contains negative values in required columns.")
 
-        # Optional: check if there is exactly one row
-        if len(df) != 1:
-            raise ValidationError(
-                "CSV should contain exactly one row of parameters.")
+        # Overtime limits are optional: empty cells are 0, anything else must
+        # be a non-negative number. Filled in place for the callers.
+        for col in self.OVERTIME_COLUMNS:
+            if col not in df.columns:
+                continue
+            overtime = pd.to_numeric(df[col], errors='coerce')
+            if (overtime.isnull() & df[col].notnull()).any():
+                raise ValidationError(
+                    "CSV contains non-numeric values in overtime columns.")
+            if (overtime < 0).any():
+                raise ValidationError(
+                    "CSV contains negative values in overtime columns.")
+            df[col] = overtime.fillna(0.0)
 
-        # Return the clean row as a dictionary
-        return df.iloc[0].to_dict()
+    def _check_columns(self, df):
+        # Ensure required columns are present
+        missing = [col for col in self.REQUIRED_COLUMNS if col not in df.columns]
+        if missing:
+            raise ValidationError(f"Missing required columns: {missing}")
@@ -0,0 +1,334 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pulp import (LpAffineExpression, LpConstraint, LpConstraintLE,
+                  LpMaximize, LpProblem, LpStatus, LpVariable)
+
+from .dataloader import DataLoader
+from .optimizer import OptimizationModel
+from .scenarios import ScenarioBatch
+from .solver import SolverConfig
+
+# Raw material used per unit of each product, per plant
+RAW_MATERIAL_COLUMNS = [f'Raw_Material_Product_{p}' for p in DataLoader.PRODUCTS]
+
+
+class LagrangianDecomposition:
+    '''
+    Solves a multi-plant production problem whose plants only interact
+    through a shared raw-material budget:
+
+        max  sum over plants of revenue(plant)
+        s.t. each plant's machine constraints
+             sum over plants of raw material used <= budget
+
+    The budget constraint is relaxed with a multiplier (the price of raw
+    material). For a given price every plant is an independent
+    OptimizationModel whose product prices are reduced by the raw material
+    they use, so plants are solved in parallel worker processes. The price is
+    then bisected between a value where the plants overuse the budget and one
+    where they stay within it; the dual bound comes from the same solves.
+    Once the bracket is tight, the two bracketing plans are blended so that
+    the budget is met exactly, which gives a feasible plan whose revenue
+    converges to the optimum.
+    Attributes:
+        plants (list): Parameter dicts, one per plant, each with the
+            REQUIRED_COLUMNS of DataLoader and the RAW_MATERIAL_COLUMNS.
+        budget (float): Shared raw-material budget.
+        config (SolverConfig): Solver settings for the plant subproblems.
+        workers (int): Worker processes; 1 solves in the calling process.
+        tolerance (float): Relative duality gap at which to stop.
+        max_iterations (int): Maximum number of price updates.
+    '''
+
+    def __init__(self, plants, budget, config=None, workers=1,
+                 tolerance=1e-6, max_iterations=60):
+        self.batch = ScenarioBatch.from_records(plants)
+        self.raw = np.array([[plant[col] for col in RAW_MATERIAL_COLUMNS]
+                             for plant in plants], dtype=float)
+        self.budget = budget
+        self.config = config or SolverConfig.from_settings()
+        self.workers = workers
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def solve(self) -> dict:
+        '''
+        Runs the decomposition.
+        Returns:
+            dict: A dictionary containing:
+                - 'status': "Optimal" once the gap is within tolerance,
+                  "Not Solved" if the iteration limit was hit first.
+                - 'Total_Revenue': Revenue of the feasible plan.
+                - 'Product_A', 'Product_B': Per-plant quantities (arrays).
+                - 'multiplier': Price of raw material (its shadow price).
+                - 'upper_bound': Best Lagrangian (dual) bound.
+                - 'gap': Relative gap between upper_bound and Total_Revenue.
+                - 'iterations': Number of rounds of plant solves.
+                - 'history': Per-iteration multiplier, bound, revenue and gap.
+                - 'wall_time': Seconds spent in solve().
+        '''
+        start = time.perf_counter()
+        chunks = np.array_split(np.arange(len(self.batch)),
+                                max(1, min(self.workers, len(self.batch))))
+        pool = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+
+        def evaluate(multiplier):
+            return self._evaluate(multiplier, chunks, pool)
+
+        try:
+            history = []
+
+            # --- STEP 1: Without a raw material price, is the budget binding? ---
+            low = evaluate(0.0)
+            upper_bound = low["bound"]
+            if low["usage"] <= self.budget:
+                history.append(self._record(0, 0.0, upper_bound, low["revenue"]))
+                return self._result(low, 0.0, upper_bound, 0, history, start)
+
+            # --- STEP 2: A price at which no raw material is worth using ---
+            with np.errstate(divide='ignore', invalid='ignore'):
+                prices = np.stack([self.batch.column(f"Price_Product_{p}")
+                                   for p in DataLoader.PRODUCTS], axis=1)
+                ratios = np.where(self.raw > 0, prices / self.raw, 0.0)
+            high = evaluate(float(ratios.max()) * (1 + 1e-9) + 1e-12)
+            upper_bound = min(upper_bound, high["bound"])
+
+            # --- STEP 3: Bisect the price, blending the bracketing plans ---
+            iteration = 0
+            while True:
+                plan = self._blend(low, high)
+                gap = (upper_bound - plan["revenue"]) / max(abs(upper_bound), 1e-9)
+                history.append(self._record(
+                    iteration, high["multiplier"], upper_bound, plan["revenue"]))
+                if gap <= self.tolerance or iteration >= self.max_iterations:
+                    break
+
+                iteration += 1
+                middle = evaluate((low["multiplier"] + high["multiplier"]) / 2)
+                upper_bound = min(upper_bound, middle["bound"])
+                if middle["usage"] > self.budget:
+                    low = middle
+                else:
+                    high = middle
+
+            return self._result(plan, high["multiplier"], upper_bound,
+                                iteration, history, start,
+                                converged=gap <= self.tolerance)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    def _evaluate(self, multiplier, chunks, pool):
+        '''
+        Solves every plant with product prices reduced by the raw material
+        price and returns the plan, its raw material usage, its revenue at
+        the original prices and the Lagrangian bound for this price.
+        '''
+        data = self.batch.data.copy()
+        for i, p in enumerate(DataLoader.PRODUCTS):
+            data[f"Price_Product_{p}"] -= multiplier * self.raw[:, i]
+
+        jobs = [(data[chunk], self.config) for chunk in chunks]
+        if pool is None:
+            parts = [_solve_plants(*job) for job in jobs]
+        else:
+            parts = list(pool.map(_solve_plants, *zip(*jobs)))
+        quantities = np.concatenate(parts)
+
+        reduced_revenue = sum(
+            data[f"Price_Product_{p}"] @ quantities[:, i]
+            for i, p in enumerate(DataLoader.PRODUCTS))
+        usage = float((self.raw * quantities).sum())
+        return {
+            "multiplier": multiplier,
+            "quantities": quantities,
+            "usage": usage,
+            "revenue": self._revenue(quantities),
+            "bound": float(reduced_revenue + multiplier * self.budget),
+        }
+
+    def _blend(self, low, high):
+        # The low-price plan overuses the budget, the high-price one does not
+        theta = (self.budget - high["usage"]) / (low["usage"] - high["usage"])
+        quantities = theta * low["quantities"] + (1 - theta) * high["quantities"]
+        return {"quantities": quantities, "revenue": self._revenue(quantities)}
+
+    def _revenue(self, quantities):
+        return float(sum(
+            self.batch.column(f"Price_Product_{p}") @ quantities[:, i]
+            for i, p in enumerate(DataLoader.PRODUCTS)))
+
+    @staticmethod
+    def _record(iteration, multiplier, upper_bound, revenue):
+        return {
+            "iteration": iteration,
+            "multiplier": multiplier,
+            "upper_bound": upper_bound,
+            "Total_Revenue": revenue,
+            "gap": (upper_bound - revenue) / max(abs(upper_bound), 1e-9),
+        }
+
+    def _result(self, plan, multiplier, upper_bound, iterations, history,
+                start, converged=True):
+        return {
+            "status": LpStatus[1] if converged else LpStatus[0],
+            "Total_Revenue": plan["revenue"],
+            "Product_A": plan["quantities"][:, 0],
+            "Product_B": plan["quantities"][:, 1],
+            "multiplier": multiplier,
+            "upper_bound": upper_bound,
+            "gap": history[-1]["gap"],
+            "iterations": iterations,
+            "history": history,
+            "wall_time": time.perf_counter() - start,
+        }
+
+
+def _solve_plants(data, config):
+    '''
+    Worker entry point: solves a chunk of plant subproblems.
+    Args:
+        data (ndarray): Plant parameters with PARAMS_DTYPE.
+        config (SolverConfig): Solver settings.
+    Returns:
+        ndarray: Quantities of Product A and B, one row per plant.
+    '''
+    results = OptimizationModel.solve_batch(ScenarioBatch(data), config)
+    if (results.column("status") != 1).any():
+        raise ValueError("A plant subproblem has no optimal solution.")
+    return np.stack([results.column("Product_A"),
+                     results.column("Product_B")], axis=1)
+
+
+def solve_monolithic(plants, budget, config=None) -> dict:
+    '''
+    Solves the multi-plant problem as a single LP, for reference.
+    Args:
+        plants (list): Plant parameter dicts, see LagrangianDecomposition.
+        budget (float): Shared raw-material budget.
+        config (SolverConfig): Solver settings.
+    Returns:
+        dict: 'status', 'Total_Revenue', 'Product_A' and 'Product_B'
+            (arrays), 'multiplier' and 'wall_time'.
+    '''
+    start = time.perf_counter()
+    config = (config or SolverConfig.from_settings()).for_pulp()
+    prob = LpProblem("Multi_Plant_Production", LpMaximize)
+    x = {p: [LpVariable(f"Product_{p}_{i}", lowBound=0) for i in range(len(plants))]
+         for p in DataLoader.PRODUCTS}
+
+    objective, raw_terms = [], []
+    for i, plant in enumerate(plants):
+        for p in DataLoader.PRODUCTS:
+            objective.append((x[p][i], plant[f"Price_Product_{p}"]))
+            raw_terms.append((x[p][i], plant[f"Raw_Material_Product_{p}"]))
+        for m in DataLoader.MACHINES:
+            terms = [(x[p][i], plant[f"Product_{p}_Production_Time_Machine_{m}"])
+                     for p in DataLoader.PRODUCTS]
+            prob.addConstraint(LpConstraint(
+                LpAffineExpression(terms), LpConstraintLE,
+                f"Plant_{i}_Machine_{m}", plant[f"Machine_{m}_Available_Hours"]))
+    prob.addConstraint(LpConstraint(
+        LpAffineExpression(raw_terms), LpConstraintLE, "Raw_Material_Budget", budget))
+    prob.setObjective(LpAffineExpression(objective))
+
+    status, _ = config.run(prob)
+    optimal = LpStatus[status] == "Optimal"
+    return {
+        "status": LpStatus[status],
+        "Total_Revenue": prob.objective.value() if optimal else None,
+        "Product_A": np.array([v.varValue for v in x["A"]]) if optimal else None,
+        "Product_B": np.array([v.varValue for v in x["B"]]) if optimal else None,
+        "multiplier": prob.constraints["Raw_Material_Budget"].pi,
+        "wall_time": time.perf_counter() - start,
+    }
+
+
+def synthetic_plants(n_plants, seed=0, budget_share=0.5):
+    '''
+    Generates a random multi-plant instance for benchmarking.
+    Args:
+        n_plants (int): Number of plants.
+        seed (int): Random seed.
+        budget_share (float): Budget as a share of the raw material the
+            plants would use without it, so that it is binding.
+    Returns:
+        tuple: The plant parameter dicts and the budget.
+    '''
+    rng = np.random.default_rng(seed)
+    plants = []
+    for _ in range(n_plants):
+        plant = {col: float(rng.uniform(0.5, 3.0))
+                 for col in DataLoader.REQUIRED_COLUMNS
+                 if 'Production_Time' in col}
+        plant.update({
+            'Machine_1_Available_Hours': float(rng.uniform(20, 80)),
+            'Machine_2_Available_Hours': float(rng.uniform(20, 80)),
+            'Price_Product_A': float(rng.uniform(50, 150)),
+            'Price_Product_B': float(rng.uniform(50, 150)),
+            'Raw_Material_Product_A': float(rng.uniform(0.5, 2.0)),
+            'Raw_Material_Product_B': float(rng.uniform(0.5, 2.0)),
+        })
+        plants.append(plant)
+
+    unconstrained = OptimizationModel.solve_batch(
+        ScenarioBatch.from_records(plants), SolverConfig('fast'))
+    usage = sum(
+        plant['Raw_Material_Product_A'] * row['Product_A']
+        + plant['Raw_Material_Product_B'] * row['Product_B']
+        for plant, row in zip(plants, unconstrained))
+    return plants, budget_share * usage
+
+
+def benchmark(n_plants, workers=1, config=None, seed=0) -> list:
+    '''
+    Compares the decomposition with the monolithic LP on a synthetic instance.
+    The monolithic LP needs a general LP solver, so it runs with
+    config.for_pulp(). The decomposition is timed with that same backend,
+    which makes the first report a like-for-like comparison; with 'fast'
+    it is timed again with the closed-form plant solver, whose reported
+    speedup then also reflects the faster backend.
+    Args:
+        n_plants (int): Number of plants.
+        workers (int): Worker processes for the decomposition.
+        config (SolverConfig): Solver settings.
+        seed (int): Random seed of the instance.
+    Returns:
+        list: One dict per decomposition backend, with revenue, wall time,
+            gap and iterations of both approaches, the backend of each
+            ('backend', 'monolithic_backend'), the relative difference in
+            revenue and the speedup.
+    '''
+    config = config or SolverConfig.from_settings()
+    plants, budget = synthetic_plants(n_plants, seed)
+    monolithic_config = config.for_pulp()
+    monolithic = solve_monolithic(plants, budget, monolithic_config)
+
+    # for_pulp() returns config itself unless it is the 'fast' backend
+    plant_configs = [monolithic_config]
+    if config is not monolithic_config:
+        plant_configs.append(config)
+
+    reports = []
+    for plant_config in plant_configs:
+        decomposed = LagrangianDecomposition(
+            plants, budget, plant_config, workers=workers).solve()
+        reports.append({
+            "plants": n_plants,
+            "workers": workers,
+            "backend": plant_config.backend,
+            "monolithic_backend": monolithic_config.backend,
+            "decomposition_revenue": decomposed["Total_Revenue"],
+            "decomposition_time": decomposed["wall_time"],
+            "decomposition_gap": decomposed["gap"],
+            "iterations": decomposed["iterations"],
+            "monolithic_revenue": monolithic["Total_Revenue"],
+            "monolithic_time": monolithic["wall_time"],
+            "revenue_difference": (
+                (monolithic["Total_Revenue"] - decomposed["Total_Revenue"])
+                / max(abs(monolithic["Total_Revenue"]), 1e-9)),
+            "speedup": monolithic["wall_time"] / decomposed["wall_time"],
+        })
+    return reports
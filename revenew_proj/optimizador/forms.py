@@ -6,5 +6,27 @@ class UploadForm(forms.Form):
     This form includes a single file field for the CSV upload.
     Attributes:
         csv_file (FileField): The file field for uploading the CSV.
+        integer_mode (BooleanField): Whether to plan whole units only.
+        pareto_objective (ChoiceField): Optional second objective to trade
+            revenue against on a Pareto frontier.
     '''
+    PARETO_CHOICES = [
+        ('', "None"),
+        ('overtime', "Revenue vs. overtime"),
+        ('utilization', "Revenue vs. machine utilization"),
+    ]
+
     csv_file = forms.FileField(label="Upload CSV",)
+    integer_mode = forms.BooleanField(label="Whole units only", required=False)
+    pareto_objective = forms.ChoiceField(
+        label="Trade-off frontier", choices=PARETO_CHOICES, required=False)
+
+
+class CompareForm(forms.Form):
+    '''Form for uploading a batch of scenarios to compare side by side.
+    Attributes:
+        csv_file (FileField): CSV with one scenario per row.
+        integer_mode (BooleanField): Whether to plan whole units only.
+    '''
+    csv_file = forms.FileField(label="Scenarios CSV")
+    integer_mode = forms.BooleanField(label="Whole units only", required=False)
@@ -0,0 +1,348 @@
+import asyncio
+import http.cookiejar
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from . import singleflight
+from .dataloader import DataLoader
+from .timing import parse_server_timing
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def synthetic_scenarios(count, seed=0, distinct=None) -> list:
+    '''
+    Generates random scenarios with every required column.
+    Args:
+        count (int): Number of scenarios.
+        seed (int): Seed of the random generator, for reproducible runs.
+        distinct (int): Draw the scenarios from a pool of this many, so that
+            some repeat (and hit the result caches); None for all distinct.
+    Returns:
+        list: Parameter dicts.
+    '''
+    rng = np.random.default_rng(seed)
+    pool = distinct or count
+    times = rng.uniform(1, 20, (pool, 4)).round(2)
+    hours = rng.uniform(100, 1000, (pool, 2)).round(1)
+    prices = rng.uniform(5, 100, (pool, 2)).round(2)
+    values = np.hstack([times, hours, prices])
+    # Columns of REQUIRED_COLUMNS: 4 production times, 2 capacities, 2 prices
+    pool = [dict(zip(DataLoader.REQUIRED_COLUMNS, map(float, row))) for row in values]
+    picks = rng.integers(0, len(pool), count) if distinct else range(count)
+    return [pool[i] for i in picks]
+
+
+def synthetic_csv(scenarios) -> bytes:
+    '''Writes scenarios as a CSV file DataLoader accepts, one per row.'''
+    lines = [",".join(DataLoader.REQUIRED_COLUMNS)]
+    lines += [",".join(f"{s[col]:g}" for col in DataLoader.REQUIRED_COLUMNS)
+              for s in scenarios]
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+
+class LoadResult:
+    '''
+    Samples of one load test run.
+    Attributes:
+        driver (str): Name of the driver that produced them.
+        samples (list): (status, latency in s, stage durations, error) per
+            request; status is None when no response came back.
+        wall_time (float): Seconds from the first to the last request.
+    '''
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.samples = []
+        self.wall_time = 0.0
+
+    def add(self, status, latency, stages=None, error=None):
+        self.samples.append((status, latency, stages or {}, error))
+
+    def summary(self) -> dict:
+        '''
+        Returns:
+            dict: 'requests', 'ok' (2xx), 'shed' (503), 'errors' (anything
+                else), 'error_rate' (shed and errors over requests),
+                'throughput' (requests/s), 'latency' (p50, p90, p95, p99 and
+                max of successful requests, in s) and 'stages' (mean and
+                p95 per Server-Timing stage, in s).
+        '''
+        statuses = np.array([s[0] or 0 for s in self.samples])
+        latencies = np.array([s[1] for s in self.samples])
+        ok = (statuses >= 200) & (statuses < 300)
+        shed = statuses == 503
+        summary = {
+            "driver": self.driver,
+            "requests": len(self.samples),
+            "ok": int(ok.sum()),
+            "shed": int(shed.sum()),
+            "errors": int((~ok & ~shed).sum()),
+            "error_rate": float((~ok).mean()) if len(self.samples) else 0.0,
+            "throughput": len(self.samples) / self.wall_time if self.wall_time else 0.0,
+            "latency": dict.fromkeys([f"p{p}" for p in PERCENTILES] + ["max"]),
+            "stages": {},
+        }
+        if ok.any():
+            summary["latency"] = {
+                **{f"p{p}": float(v) for p, v in zip(
+                    PERCENTILES, np.percentile(latencies[ok], PERCENTILES))},
+                "max": float(latencies[ok].max()),
+            }
+
+        names = dict.fromkeys(name for s in self.samples for name in s[2])
+        for name in names:
+            durations = np.array([s[2][name] for s in self.samples if name in s[2]])
+            summary["stages"][name] = {
+                "mean": float(durations.mean()),
+                "p95": float(np.percentile(durations, 95)),
+            }
+        return summary
+
+
+class Driver(ABC):
+    '''
+    Sends uploads to upload_view and times them. Requests are scheduled
+    open-loop at `rate` per second (or back to back when rate is 0) and at
+    most `concurrency` are in flight. Latency is measured from the scheduled
+    start, so requests delayed by a saturated client count as slow instead
+    of going unnoticed. Every upload carries the driver's tag in an
+    X-Load-Test header, which the runs it records are marked with; the
+    server only accepts it with DEBUG on or with its
+    OPTIMIZADOR_LOAD_TEST_TOKEN, sent along in X-Load-Test-Token.
+    Attributes:
+        tag (str): Marks the runs recorded by this driver's uploads.
+    '''
+    name = None
+
+    def __init__(self, tag=None):
+        self.tag = tag or uuid.uuid4().hex
+
+    @abstractmethod
+    def run(self, payloads, concurrency=8, rate=0.0) -> LoadResult:
+        '''
+        Args:
+            payloads (list): CSV bytes, one upload each.
+            concurrency (int): Requests in flight at most.
+            rate (float): Requests started per second, 0 for no limit.
+        Returns:
+            LoadResult: One sample per payload.
+        '''
+
+    def headers(self) -> dict:
+        '''Headers that mark an upload as part of this test.'''
+        headers = {'X-Load-Test': self.tag}
+        token = getattr(settings, 'OPTIMIZADOR_LOAD_TEST_TOKEN', None)
+        if token:
+            headers['X-Load-Test-Token'] = token
+        return headers
+
+    @staticmethod
+    def _schedule(start, index, rate):
+        return start + index / rate if rate else None
+
+
+class _ThreadedDriver(Driver):
+    '''Driver with one thread per client, each sending through sender().'''
+
+    def run(self, payloads, concurrency=8, rate=0.0):
+        result = LoadResult(self.name)
+        lock = threading.Lock()
+        next_index = iter(range(len(payloads)))
+        start = time.perf_counter()
+
+        def worker():
+            send = self.sender()
+            while True:
+                with lock:
+                    index = next(next_index, None)
+                if index is None:
+                    return
+                scheduled = self._schedule(start, index, rate)
+                if scheduled is not None:
+                    time.sleep(max(0.0, scheduled - time.perf_counter()))
+                began = time.perf_counter() if scheduled is None else scheduled
+                try:
+                    status, timing = send(payloads[index], index)
+                    error = None
+                except Exception as e:
+                    status, timing, error = None, None, repr(e)
+                latency = time.perf_counter() - began
+                with lock:
+                    result.add(status, latency, parse_server_timing(timing), error)
+
+        threads = [threading.Thread(target=worker, daemon=True)
+                   for _ in range(max(concurrency, 1))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.wall_time = time.perf_counter() - start
+        return result
+
+    @abstractmethod
+    def sender(self):
+        '''Returns a callable (payload, index) -> (status, Server-Timing).'''
+
+
+@contextmanager
+def in_process(fresh_cache=True):
+    '''
+    Settings for driving the app in-process: the test clients' host is
+    allowed, the drivers' load test tags are accepted and, with
+    fresh_cache, results go to an empty in-memory cache instead of the
+    shared one and identical uploads are only coalesced within this run,
+    so repeated runs start equally cold.
+    '''
+    overrides = {
+        'ALLOWED_HOSTS': [*settings.ALLOWED_HOSTS, 'testserver'],
+        'OPTIMIZADOR_LOAD_TEST_TOKEN': (
+            getattr(settings, 'OPTIMIZADOR_LOAD_TEST_TOKEN', None) or uuid.uuid4().hex),
+    }
+    if fresh_cache:
+        overrides['CACHES'] = {**settings.CACHES, 'loadtest': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f"loadtest-{uuid.uuid4().hex}",
+        }}
+        overrides['OPTIMIZADOR_RESULT_CACHE'] = {
+            **getattr(settings, 'OPTIMIZADOR_RESULT_CACHE', {}), 'ALIAS': 'loadtest'}
+        # The file backend's lock files are shared with other processes
+        overrides['OPTIMIZADOR_SINGLEFLIGHT'] = {'BACKEND': 'local'}
+    with override_settings(**overrides):
+        if not fresh_cache:
+            yield
+            return
+        # get_singleflight() keeps its instance: let it build one from the
+        # overridden settings, and put the process-wide one back afterwards
+        with singleflight._default_lock:
+            saved, singleflight._default = singleflight._default, None
+        try:
+            yield
+        finally:
+            with singleflight._default_lock:
+                singleflight._default = saved
+
+
+class WSGIDriver(_ThreadedDriver):
+    '''
+    Drives the app in-process through its WSGI handler, one thread per client.
+    Attributes:
+        fresh_cache (bool): Whether to start from empty result caches.
+    '''
+    name = 'wsgi'
+
+    def __init__(self, fresh_cache=True, tag=None):
+        super().__init__(tag)
+        self.fresh_cache = fresh_cache
+
+    def run(self, payloads, concurrency=8, rate=0.0):
+        with in_process(self.fresh_cache):
+            return super().run(payloads, concurrency, rate)
+
+    def sender(self):
+        client = Client(raise_request_exception=False)
+
+        def send(payload, index):
+            upload = SimpleUploadedFile(f"load_{index}.csv", payload, "text/csv")
+            response = client.post(reverse('upload'), {'csv_file': upload},
+                                   headers=self.headers())
+            return response.status_code, response.get('Server-Timing')
+        return send
+
+
+class HTTPDriver(_ThreadedDriver):
+    '''Drives a running server (e.g. runserver, gunicorn or uvicorn) over HTTP.'''
+    name = 'http'
+
+    def __init__(self, url='http://127.0.0.1:8000/optimizador/', timeout=60.0,
+                 tag=None):
+        super().__init__(tag)
+        self.url = url
+        self.timeout = timeout
+
+    def sender(self):
+        # Like a browser: fetch the form once for the CSRF cookie, then post
+        cookies = http.cookiejar.CookieJar()
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+        opener.open(self.url, timeout=self.timeout).read()
+        token = next((c.value for c in cookies if c.name == settings.CSRF_COOKIE_NAME), '')
+
+        def send(payload, index):
+            boundary = uuid.uuid4().hex
+            body = (f"--{boundary}\r\nContent-Disposition: form-data; "
+                    f"name=\"csv_file\"; filename=\"load_{index}.csv\"\r\n"
+                    f"Content-Type: text/csv\r\n\r\n").encode() + payload + \
+                f"\r\n--{boundary}--\r\n".encode()
+            request = urllib.request.Request(self.url, data=body, headers={
+                'Content-Type': f"multipart/form-data; boundary={boundary}",
+                'X-CSRFToken': token,
+                'Referer': self.url,
+                **self.headers(),
+            })
+            try:
+                with opener.open(request, timeout=self.timeout) as response:
+                    response.read()
+                    return response.status, response.headers.get('Server-Timing')
+            except urllib.error.HTTPError as e:
+                return e.code, e.headers.get('Server-Timing')
+        return send
+
+
+class ASGIDriver(Driver):
+    '''
+    Drives the app in-process through its ASGI handler, with asyncio tasks
+    as clients. Sync views such as upload_view then run in Django's
+    sync-to-async thread, which is what this mode measures.
+    Attributes:
+        fresh_cache (bool): Whether to start from empty result caches.
+    '''
+    name = 'asgi'
+
+    def __init__(self, fresh_cache=True, tag=None):
+        super().__init__(tag)
+        self.fresh_cache = fresh_cache
+
+    def run(self, payloads, concurrency=8, rate=0.0):
+        with in_process(self.fresh_cache):
+            return asyncio.run(self._run(payloads, concurrency, rate))
+
+    async def _run(self, payloads, concurrency, rate):
+        result = LoadResult(self.name)
+        next_index = iter(range(len(payloads)))
+        start = time.perf_counter()
+
+        async def worker():
+            client = AsyncClient(raise_request_exception=False)
+            for index in next_index:
+                scheduled = self._schedule(start, index, rate)
+                if scheduled is not None:
+                    await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                began = time.perf_counter() if scheduled is None else scheduled
+                upload = SimpleUploadedFile(f"load_{index}.csv", payloads[index], "text/csv")
+                try:
+                    response = await client.post(reverse('upload'), {'csv_file': upload},
+                                                 headers=self.headers())
+                    status, timing, error = (response.status_code,
+                                             response.get('Server-Timing'), None)
+                except Exception as e:
+                    status, timing, error = None, None, repr(e)
+                result.add(status, time.perf_counter() - began,
+                           parse_server_timing(timing), error)
+
+        await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+        result.wall_time = time.perf_counter() - start
+        return result
+
+
+DRIVERS = {'wsgi': WSGIDriver, 'asgi': ASGIDriver, 'http': HTTPDriver}
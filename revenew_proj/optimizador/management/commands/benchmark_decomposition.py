@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from optimizador.decomposition import benchmark
+from optimizador.solver import SolverConfig
+
+
+class Command(BaseCommand):
+    help = ("Compares the multi-plant Lagrangian decomposition with the "
+            "monolithic LP on synthetic instances. Each size is reported with "
+            "the monolithic LP's backend on both sides and, for --solver "
+            "fast, with the closed-form plant solver as well.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--plants", type=int, nargs="+", default=[10, 50],
+                            help="numbers of plants to benchmark")
+        parser.add_argument("--workers", type=int, default=1,
+                            help="worker processes for the plant subproblems")
+        parser.add_argument("--solver", choices=SolverConfig.BACKENDS, default="fast",
+                            help="backend for the plant subproblems (default: fast)")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        config = SolverConfig.from_settings(backend=options["solver"])
+        self.stdout.write(
+            f"{'plants':>8} {'backend':>12} {'iters':>6} {'decomp s':>10} "
+            f"{'mono s':>10} {'speedup':>8} {'gap':>10} {'rev diff':>10}")
+
+        for n_plants in options["plants"]:
+            for result in benchmark(n_plants, options["workers"], config,
+                                    options["seed"]):
+                backends = f"{result['backend']}/{result['monolithic_backend']}"
+                self.stdout.write(
+                    f"{result['plants']:>8} {backends:>12} {result['iterations']:>6} "
+                    f"{result['decomposition_time']:>10.3f} "
+                    f"{result['monolithic_time']:>10.3f} "
+                    f"{result['speedup']:>7.2f}x "
+                    f"{result['decomposition_gap']:>10.2e} "
+                    f"{result['revenue_difference']:>10.2e}")
@@ -0,0 +1,99 @@
+import json
+import os
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from optimizador.loadtest import DRIVERS, HTTPDriver, synthetic_csv, synthetic_scenarios
+from optimizador.models import OptimizationRun
+
+
+class Command(BaseCommand):
+    help = ("Load-tests upload_view with synthetic CSVs, in-process (wsgi, "
+            "asgi) or against a running server (http), and reports latency "
+            "percentiles, error rates and the Server-Timing stage breakdown.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--driver", nargs="+", choices=list(DRIVERS),
+                            default=["wsgi", "asgi"],
+                            help="serving modes to compare")
+        parser.add_argument("--url", default="http://127.0.0.1:8000/optimizador/",
+                            help="upload URL for the http driver")
+        parser.add_argument("--requests", type=int, default=100,
+                            help="uploads per driver")
+        parser.add_argument("--concurrency", type=int, default=8,
+                            help="requests in flight at most")
+        parser.add_argument("--rate", type=float, default=0.0,
+                            help="requests started per second (0: back to back)")
+        parser.add_argument("--distinct", type=int, default=0,
+                            help="draw uploads from this many scenarios, so "
+                                 "some repeat (0: all distinct)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--save-csv", metavar="DIR",
+                            help="also write the generated uploads to DIR")
+        parser.add_argument("--shared-cache", action="store_true",
+                            help="in-process drivers use the configured result "
+                                 "cache instead of an empty one")
+        parser.add_argument("--keep-runs", action="store_true",
+                            help="keep the runs the uploads record (marked "
+                                 "with the test's load_test tag)")
+        parser.add_argument("--json", action="store_true",
+                            help="print the summaries as JSON")
+
+    def handle(self, *args, **options):
+        # Marks the runs this test's uploads record, and only those are deleted
+        tag = uuid.uuid4().hex
+        summaries = []
+        for offset, name in enumerate(options["driver"]):
+            # Each driver gets its own scenarios, so none is served from
+            # results another one cached
+            scenarios = synthetic_scenarios(
+                options["requests"], options["seed"] + offset,
+                options["distinct"] or None)
+            payloads = [synthetic_csv([s]) for s in scenarios]
+            if options["save_csv"]:
+                self._save(options["save_csv"], name, payloads)
+
+            if name == 'http':
+                driver = HTTPDriver(options["url"], tag=tag)
+            else:
+                driver = DRIVERS[name](fresh_cache=not options["shared_cache"], tag=tag)
+            summaries.append(driver.run(
+                payloads, options["concurrency"], options["rate"]).summary())
+
+        if not options["keep_runs"]:
+            OptimizationRun.objects.filter(load_test=tag).delete()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summaries, indent=2))
+        else:
+            self._report(summaries)
+
+    def _save(self, directory, driver, payloads):
+        os.makedirs(directory, exist_ok=True)
+        for index, payload in enumerate(payloads):
+            with open(os.path.join(directory, f"{driver}_{index:05d}.csv"), 'wb') as f:
+                f.write(payload)
+
+    def _report(self, summaries):
+        def ms(seconds):
+            return f"{seconds * 1000:>8.1f}" if seconds is not None else f"{'-':>8}"
+
+        self.stdout.write(
+            f"{'driver':<6} {'reqs':>6} {'ok':>6} {'shed':>6} {'errors':>6} "
+            f"{'err %':>6} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for s in summaries:
+            latency = s["latency"]
+            self.stdout.write(
+                f"{s['driver']:<6} {s['requests']:>6} {s['ok']:>6} {s['shed']:>6} "
+                f"{s['errors']:>6} {s['error_rate'] * 100:>6.1f} "
+                f"{s['throughput']:>8.1f} {ms(latency['p50'])} {ms(latency['p90'])} "
+                f"{ms(latency['p95'])} {ms(latency['p99'])} {ms(latency['max'])}")
+
+        self.stdout.write("\nServer-Timing stages (mean / p95 ms):")
+        for s in summaries:
+            stages = "  ".join(
+                f"{name} {stats['mean'] * 1000:.1f}/{stats['p95'] * 1000:.1f}"
+                for name, stats in s["stages"].items())
+            self.stdout.write(f"{s['driver']:<6} {stages or '-'}")
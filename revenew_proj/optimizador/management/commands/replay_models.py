@@ -0,0 +1,60 @@
+import glob
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from pulp import LpStatus, value
+
+from optimizador.compiled import CompiledModel
+from optimizador.solver import SolverConfig
+
+
+class Command(BaseCommand):
+    help = ("Solves saved models ('.npz' or '.mps', e.g. captured with "
+            "OPTIMIZADOR_MODEL_CACHE['EXPORT_DIR']) and reports timings.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+",
+                            help="model files, or directories holding them")
+        parser.add_argument("--solver", choices=SolverConfig.BACKENDS,
+                            help="backend to replay with")
+        parser.add_argument("--repeat", type=int, default=1,
+                            help="solves per model; the fastest is reported")
+
+    def handle(self, *args, **options):
+        config = SolverConfig.from_settings(backend=options["solver"]).for_pulp()
+        files = []
+        for path in options["paths"]:
+            if os.path.isdir(path):
+                files += sorted(glob.glob(os.path.join(path, "*.npz"))
+                                + glob.glob(os.path.join(path, "*.mps")))
+            else:
+                files.append(path)
+        if not files:
+            raise CommandError("No model files found.")
+
+        self.stdout.write(
+            f"{'model':<40} {'rows':>7} {'cols':>7} {'load s':>8} "
+            f"{'build s':>8} {'solve s':>8} {'status':>10} {'objective':>14}")
+        for path in files:
+            start = time.perf_counter()
+            try:
+                model = CompiledModel.read(path)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {path}: {e}")
+            load_time = time.perf_counter() - start
+
+            build_time = solve_time = float('inf')
+            for _ in range(max(options["repeat"], 1)):
+                start = time.perf_counter()
+                prob, _ = model.to_problem()
+                build_time = min(build_time, time.perf_counter() - start)
+                status, stats = config.run(prob)
+                solve_time = min(solve_time, stats["wall_time"])
+
+            objective = value(prob.objective)
+            self.stdout.write(
+                f"{os.path.basename(path)[:40]:<40} {model.shape[0]:>7} "
+                f"{model.shape[1]:>7} {load_time:>8.3f} {build_time:>8.3f} "
+                f"{solve_time:>8.3f} {LpStatus[status]:>10} "
+                f"{objective if objective is not None else float('nan'):>14.6g}")
@@ -0,0 +1,61 @@
+import os
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from optimizador.pareto import ParetoFrontier
+from optimizador.presolve import ScenarioLibrary, warm
+
+
+class Command(BaseCommand):
+    help = ("Pre-solves and pre-renders the registered parameter sets into the "
+            "result caches, or registers a new set with --register.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--register", metavar="CSV",
+                            help="validate a scenario CSV and add it to the library")
+        parser.add_argument("--name",
+                            help="name of the registered set (default: file name)")
+        parser.add_argument("--list", action="store_true",
+                            help="list the registered sets")
+        parser.add_argument("--workers", type=int,
+                            help="scenarios warmed concurrently")
+        parser.add_argument("--integer", action="store_true",
+                            help="also warm whole-unit plans")
+        parser.add_argument("--pareto", action="append", default=[],
+                            choices=ParetoFrontier.OBJECTIVES,
+                            help="also warm the frontier against this objective")
+
+    def handle(self, *args, **options):
+        library = ScenarioLibrary.from_settings()
+
+        if options["register"]:
+            path = options["register"]
+            name = options["name"] or os.path.splitext(os.path.basename(path))[0]
+            try:
+                count = library.register(name, path)
+            except OSError as e:
+                raise CommandError(f"Cannot read {path}: {e}")
+            except ValidationError as e:
+                raise CommandError('; '.join(e.messages))
+            self.stdout.write(f"Registered {name!r} ({count} scenarios).")
+            return
+
+        if options["list"]:
+            counts = {}
+            for name, _, _ in library.scenarios():
+                counts[name] = counts.get(name, 0) + 1
+            for name, count in counts.items():
+                self.stdout.write(f"{name}: {count} scenarios")
+            return
+
+        variants = None
+        if options["integer"] or options["pareto"]:
+            variants = [(False, '')] + [(False, p) for p in options["pareto"]]
+            if options["integer"]:
+                variants += [(True, pareto) for _, pareto in variants]
+        stats = warm(library, variants, options["workers"])
+        self.stdout.write(
+            f"{stats['warmed']} warmed, {stats['cached']} already cached, "
+            f"{stats['deferred']} deferred, {stats['failed']} failed "
+            f"in {stats['wall_time']:.1f} s")
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OptimizationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('integer', models.BooleanField(default=False)),
+                ('params', models.JSONField()),
+                ('status', models.CharField(max_length=32)),
+                ('product_a', models.FloatField(null=True)),
+                ('product_b', models.FloatField(null=True)),
+                ('total_revenue', models.FloatField(null=True)),
+            ],
+            options={
+                'ordering': ['-created_at', '-pk'],
+            },
+        ),
+    ]
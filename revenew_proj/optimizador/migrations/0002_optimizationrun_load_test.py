@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('optimizador', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='optimizationrun',
+            name='load_test',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=32),
+        ),
+    ]
@@ -1,3 +1,62 @@
 from django.db import models
 
-# Create your models here.
+
+class OptimizationRun(models.Model):
+    '''
+    A solved upload, kept so that scenarios can be compared later without
+    uploading them again.
+    Attributes:
+        name (str): Name of the uploaded file.
+        created_at (datetime): When the run was solved.
+        integer (bool): Whether whole units were planned.
+        params (dict): The scenario's parameters.
+        status (str): Solver status, e.g. "Optimal".
+        product_a, product_b, total_revenue (float): The plan, None unless
+            optimal.
+        load_test (str): Tag of the load test that sent the upload (its
+            X-Load-Test header), empty for real uploads. 'manage.py loadtest'
+            deletes the runs with its tag afterwards.
+    '''
+    name = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    integer = models.BooleanField(default=False)
+    params = models.JSONField()
+    status = models.CharField(max_length=32)
+    product_a = models.FloatField(null=True)
+    product_b = models.FloatField(null=True)
+    total_revenue = models.FloatField(null=True)
+    load_test = models.CharField(max_length=32, blank=True, default='', db_index=True)
+
+    class Meta:
+        ordering = ['-created_at', '-pk']
+
+    def __str__(self):
+        return f"#{self.pk} {self.name}"
+
+    @classmethod
+    def record(cls, name, params, integer, result, load_test=''):
+        '''
+        Stores a run from the parameters and the result of upload_view.
+        Missing optional values (NaN) are left out of the stored parameters.
+        '''
+        return cls.objects.create(
+            name=name[:255],
+            load_test=load_test[:32],
+            integer=integer,
+            params={key: float(value) for key, value in params.items()
+                    if value == value},
+            status=result["status"],
+            product_a=result["Product_A"],
+            product_b=result["Product_B"],
+            total_revenue=result["Total_Revenue"],
+        )
+
+    @property
+    def solution(self) -> dict:
+        '''The run's result, shaped like the dict from OptimizationModel.solve().'''
+        return {
+            "status": self.status,
+            "Product_A": self.product_a,
+            "Product_B": self.product_b,
+            "Total_Revenue": self.total_revenue,
+        }
@@ -0,0 +1,220 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from pulp import LpConstraintEQ, LpConstraintLE, LpMaximize, LpStatus
+
+from .compiled import CompiledModel, get_model_cache
+from .dataloader import DataLoader
+from .solver import SolverConfig
+
+
+class MultiPeriodModel:
+    '''
+    Production planning over several periods with inventory carry-over.
+    For every period t and product p the model decides how much to produce,
+    sell and keep in stock:
+        inventory[p, t] = inventory[p, t-1] + production[p, t] - sales[p, t]
+    Each period has its own machine capacities and prices (and optionally a
+    demand cap on sales and a holding cost per unit kept), so stock can be
+    built up in cheap periods and sold in expensive ones. The whole horizon is
+    built as one LP; every constraint touches only the handful of variables
+    of its period, so the matrix stays sparse however long the horizon is.
+    Horizons of a shape solved before reuse the built problem (ModelCache).
+    Attributes:
+        periods (DataFrame): One row per period, as returned by
+            DataLoader.load_periods().
+        initial_inventory (dict): Stock of each product before the first period.
+        config (SolverConfig): Solver settings.
+    '''
+    PRODUCTS = DataLoader.PRODUCTS
+    MACHINES = DataLoader.MACHINES
+    KINDS = ("Production", "Sales", "Inventory")
+
+    def __init__(self, periods, initial_inventory=None, config=None):
+        self.periods = periods
+        self.initial_inventory = initial_inventory or {}
+        self.config = (config or SolverConfig.from_settings()).for_pulp()
+
+    def solve(self) -> dict:
+        '''
+        Solves the multi-period problem.
+        Returns:
+            dict: A dictionary containing:
+                - 'status': The status of the optimization.
+                - 'Total_Revenue': Sales revenue minus holding costs.
+                - 'plan': DataFrame indexed by period with production, sales
+                  and end inventory per product and the period's net revenue
+                  (None unless optimal).
+                - 'solver_stats': See OptimizationModel.solve().
+        '''
+        n = len(self.periods)
+        # Horizons of the same shape reuse an already built problem
+        with get_model_cache().problem(self.compile()) as (prob, variables):
+            status, stats = self.config.run(prob)
+            if LpStatus[status] != "Optimal":
+                return {"status": LpStatus[status], "Total_Revenue": None,
+                        "plan": None, "solver_stats": stats}
+            solution = np.array([v.varValue for v in variables]).reshape(-1, n)
+
+        plan = pd.DataFrame(
+            {f"{kind}_Product_{p}": solution[i]
+             for i, (p, kind) in enumerate(product(self.PRODUCTS, self.KINDS))},
+            index=self.periods.index)
+        plan["Revenue"] = self._period_revenue(plan)
+        return {
+            "status": LpStatus[status],
+            "Total_Revenue": float(plan["Revenue"].sum()),
+            "plan": plan,
+            "solver_stats": stats,
+        }
+
+    def compile(self) -> CompiledModel:
+        '''
+        Builds the matrix form of the model with array operations. Variables
+        are ordered by product, then kind (KINDS), then period; every
+        constraint touches only the handful of variables of its period.
+        Returns:
+            CompiledModel: The model, ready to be solved, cached or exported.
+        '''
+        n = len(self.periods)
+        t = np.arange(n)
+        columns = {col: self.periods[col].to_numpy(dtype=float)
+                   for col in self.periods.columns}
+
+        def var(p, kind):
+            # Indices of the variables of one product and kind, one per period
+            return (self.PRODUCTS.index(p) * len(self.KINDS)
+                    + self.KINDS.index(kind)) * n + t
+
+        n_vars = len(self.PRODUCTS) * len(self.KINDS) * n
+        objective = np.zeros(n_vars)
+        upper = np.full(n_vars, np.nan)
+        rows, cols, values = [], [], []
+        constraints, rhs = [], []
+
+        for i, p in enumerate(self.PRODUCTS):
+            make, sell, stock = (var(p, kind) for kind in self.KINDS)
+            objective[sell] = columns[f"Price_Product_{p}"]
+            holding = columns.get(f"Holding_Cost_Product_{p}", np.zeros(n))
+            objective[stock] = -np.nan_to_num(holding)
+
+            # Inventory balance
+            row = i * n + t
+            rows += [row, row, row, row[1:]]
+            cols += [stock, make, sell, stock[:-1]]
+            values += [np.ones(n), -np.ones(n), np.ones(n), -np.ones(n - 1)]
+            constraints += [f"Balance_{p}_{k}" for k in range(n)]
+            balance_rhs = np.zeros(n)
+            balance_rhs[:1] = self.initial_inventory.get(p, 0.0)
+            rhs.append(balance_rhs)
+
+            # Demand cap
+            upper[sell] = columns.get(f"Demand_Product_{p}", np.full(n, np.nan))
+
+        for j, m in enumerate(self.MACHINES):
+            row = (len(self.PRODUCTS) + j) * n + t
+            for p in self.PRODUCTS:
+                rows.append(row)
+                cols.append(var(p, "Production"))
+                values.append(columns[f"Product_{p}_Production_Time_Machine_{m}"])
+            constraints += [f"Machine_{m}_{k}" for k in range(n)]
+            rhs.append(columns[f"Machine_{m}_Available_Hours"])
+
+        rows, cols, values = (np.concatenate(a) for a in (rows, cols, values))
+        order = np.argsort(rows, kind='stable')
+        n_balance = len(self.PRODUCTS) * n
+        return CompiledModel(
+            "Multi_Period_Production", LpMaximize,
+            variables=[f"{kind}_{p}_{k}" for p in self.PRODUCTS
+                       for kind in self.KINDS for k in range(n)],
+            categories=np.full(n_vars, 'Continuous'),
+            lower=np.zeros(n_vars),
+            upper=upper,
+            objective=objective,
+            constraints=constraints,
+            senses=np.r_[np.full(n_balance, LpConstraintEQ),
+                         np.full(len(constraints) - n_balance, LpConstraintLE)],
+            rhs=np.concatenate(rhs),
+            rows=rows[order], cols=cols[order], values=values[order])
+
+    def _period_revenue(self, plan):
+        revenue = np.zeros(len(plan))
+        for p in self.PRODUCTS:
+            revenue += (plan[f"Sales_Product_{p}"].to_numpy()
+                        * self.periods[f"Price_Product_{p}"].to_numpy(dtype=float))
+            holding_col = f"Holding_Cost_Product_{p}"
+            if holding_col in self.periods:
+                holding = self.periods[holding_col].fillna(0).to_numpy(dtype=float)
+                revenue -= plan[f"Inventory_Product_{p}"].to_numpy() * holding
+        return revenue
+
+
+class RollingHorizonPlanner:
+    '''
+    Plans an ever-growing horizon by re-solving only a trailing window.
+    Each time new periods arrive, the last `window` periods are re-planned
+    with MultiPeriodModel, starting from the inventory left by the periods
+    before the window. Periods that drop out of the window keep the plan from
+    the last solve that included them and are never solved again, so the
+    cost of an update does not grow with the length of the horizon.
+    Attributes:
+        window (int): Number of trailing periods re-solved on each update.
+        initial_inventory (dict): Stock of each product before the first period.
+        config (SolverConfig): Solver settings.
+    '''
+
+    def __init__(self, window=52, initial_inventory=None, config=None):
+        if window < 1:
+            raise ValueError("The rolling window must contain at least one period.")
+        self.window = window
+        self.config = config
+        self._inventory = dict(initial_inventory or {})
+        self._open = None          # Periods inside the window
+        self._window_plan = None   # Plan of the last window solve
+        self._frozen = []          # Plans of periods that left the window
+        self.last_status = None
+
+    def extend(self, periods):
+        '''
+        Adds new periods at the end of the horizon and re-plans the window.
+        Args:
+            periods (DataFrame): New periods, as from DataLoader.load_periods().
+        Returns:
+            DataFrame: The plan for the whole horizon so far.
+        '''
+        # Large arrivals are fed window by window so that every period is
+        # solved at least once before it freezes
+        for start in range(0, len(periods), self.window):
+            self._append(periods.iloc[start:start + self.window])
+        return self.plan
+
+    @property
+    def plan(self):
+        parts = self._frozen + (
+            [self._window_plan] if self._window_plan is not None else [])
+        return pd.concat(parts) if parts else None
+
+    @property
+    def total_revenue(self) -> float:
+        plan = self.plan
+        return float(plan["Revenue"].sum()) if plan is not None else 0.0
+
+    def _append(self, block):
+        self._open = block if self._open is None else pd.concat([self._open, block])
+
+        overflow = len(self._open) - self.window
+        if overflow > 0:
+            # The oldest periods leave the window with their last plan
+            leaving = self._window_plan.iloc[:overflow]
+            self._frozen.append(leaving)
+            for p in MultiPeriodModel.PRODUCTS:
+                self._inventory[p] = leaving[f"Inventory_Product_{p}"].iloc[-1]
+            self._open = self._open.iloc[overflow:]
+
+        result = MultiPeriodModel(self._open, self._inventory, self.config).solve()
+        self.last_status = result["status"]
+        if result["plan"] is None:
+            raise ValueError(
+                f"The rolling window could not be solved: {result['status']}.")
+        self._window_plan = result["plan"]
@@ -1,10 +1,19 @@
-from pulp import LpProblem, LpVariable, LpMaximize, lpSum, LpStatus, value
+import math
+import time
+
+import numpy as np
+from pulp import (LpConstraintLE, LpMaximize, LpStatus, value,
+                  LpSolutionOptimal)
+
+from .compiled import CompiledModel, get_model_cache
+from .solver import SolverConfig
 
 
 class OptimizationModel:
     """A class to model and solve a production optimization problem using linear programming."""
 
-    def __init__(self, params: dict):
+    def __init__(self, params: dict, config: SolverConfig = None,
+                 integer: bool = False):
         """Initializes the optimization model with parameters.
         Args:
             params (dict): A dictionary containing the parameters for the optimization problem.
@@ -17,8 +26,98 @@ class OptimizationModel:
                 - 'Product_A_Production_Time_Machine_2' (optional)
                 - 'Product_B_Production_Time_Machine_2' (optional)
                 - 'Machine_2_Available_Hours' (optional)
+            config (SolverConfig): Solver settings. Defaults to the
+                OPTIMIZADOR_SOLVER Django setting.
+            integer (bool): Whether to produce whole units only (MIP mode).
         """
         self.params = params
+        self.config = config or SolverConfig.from_settings()
+        self.integer = integer
+
+    @classmethod
+    def solve_batch(cls, batch, config: SolverConfig = None,
+                    integer: bool = False):
+        """Solves every scenario of a ScenarioBatch.
+        With the 'fast' backend (and continuous quantities) all scenarios are
+        solved at once with vectorized NumPy operations; otherwise each
+        scenario is solved in turn and packed into the result.
+        Args:
+            batch (ScenarioBatch): The scenarios to solve.
+            config (SolverConfig): Solver settings, see __init__.
+            integer (bool): Whether to produce whole units only.
+        Returns:
+            ResultBatch: One solution per scenario, in batch order.
+        """
+        from .scenarios import ResultBatch
+
+        config = config or SolverConfig.from_settings()
+        if config.backend == 'fast' and not integer:
+            return cls._solve_fast_batch(batch)
+
+        results = ResultBatch.empty(len(batch))
+        for index, params in enumerate(batch):
+            results.set(index, cls(params, config, integer).solve())
+        return results
+
+    @staticmethod
+    def _solve_fast_batch(batch):
+        """Vectorized version of _solve_fast() over a whole ScenarioBatch."""
+        from .scenarios import ResultBatch
+
+        col = batch.column
+        price_A, price_B = col("Price_Product_A"), col("Price_Product_B")
+        a1 = col("Product_A_Production_Time_Machine_1")
+        b1 = col("Product_B_Production_Time_Machine_1")
+        cap1 = col("Machine_1_Available_Hours")
+        a2 = col("Product_A_Production_Time_Machine_2")
+        b2 = col("Product_B_Production_Time_Machine_2")
+        cap2 = col("Machine_2_Available_Hours")
+
+        # Candidate vertices, one column each (NaN where they do not exist)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            det = a1 * b2 - a2 * b1
+            zeros = np.zeros(len(batch))
+            x_A = np.stack([
+                zeros,
+                np.where(a1 > 0, cap1 / a1, np.nan), zeros,
+                np.where(a2 > 0, cap2 / a2, np.nan), zeros,
+                np.where(det != 0, (cap1 * b2 - cap2 * b1) / det, np.nan),
+            ], axis=1)
+            x_B = np.stack([
+                zeros,
+                zeros, np.where(b1 > 0, cap1 / b1, np.nan),
+                zeros, np.where(b2 > 0, cap2 / b2, np.nan),
+                np.where(det != 0, (a1 * cap2 - a2 * cap1) / det, np.nan),
+            ], axis=1)
+
+        tol = 1e-9
+        feasible = (
+            (x_A >= -tol) & (x_B >= -tol)
+            & (a1[:, None] * x_A + b1[:, None] * x_B
+               <= (cap1 + tol * np.maximum(1.0, cap1))[:, None])
+            & (a2[:, None] * x_A + b2[:, None] * x_B
+               <= (cap2 + tol * np.maximum(1.0, cap2))[:, None])
+        )
+        revenue = np.where(
+            feasible, price_A[:, None] * x_A + price_B[:, None] * x_B, -np.inf)
+        best = np.argmax(revenue, axis=1)
+        rows = np.arange(len(batch))
+
+        results = ResultBatch.empty(len(batch))
+        out = results.data
+        out["status"] = 1  # Optimal
+        out["Product_A"] = np.maximum(x_A[rows, best], 0.0)
+        out["Product_B"] = np.maximum(x_B[rows, best], 0.0)
+        out["Total_Revenue"] = revenue[rows, best]
+
+        unbounded = (((price_A > 0) & (a1 == 0) & (a2 == 0))
+                     | ((price_B > 0) & (b1 == 0) & (b2 == 0)))
+        infeasible = ~feasible.any(axis=1) & ~unbounded
+        out["status"][unbounded] = -2
+        out["status"][infeasible] = -1
+        for name in ("Product_A", "Product_B", "Total_Revenue"):
+            out[name][unbounded | infeasible] = np.nan
+        return results
 
     def solve(self) -> dict:
         """Solves the production optimization problem using linear programming.
@@ -28,41 +127,227 @@ class OptimizationModel:
                 - 'Product_A': The optimal quantity of Product A to produce.
                 - 'Product_B': The optimal quantity of Product B to produce.
                 - 'Total_Revenue': The total revenue from the optimal production plan.
+                - 'solver_stats': The backend used, its wall time (seconds) and
+                  iteration count (None if the backend does not report it).
+                In integer mode 'integer' is True and 'solver_stats' also holds
+                'lp_bound', 'mip_gap' and 'time_to_first_incumbent'.
+        """
+        if self.integer:
+            return self._solve_integer()
+
+        if self.config.backend == 'fast':
+            return self._solve_fast()
+
+        # Models of the same shape reuse an already built problem
+        with get_model_cache().problem(self.compile()) as (prob, (x_A, x_B)):
+            # Solve the problem
+            status, stats = self.config.run(prob)
+            revenue = value(prob.objective)
+            if revenue is None and status == 1:
+                # An all-zero objective has no terms, PuLP then reports None
+                revenue = 0.0
+
+            # Return solution
+            return {
+                "status": LpStatus[status],
+                "Product_A": x_A.varValue,
+                "Product_B": x_B.varValue,
+                "Total_Revenue": revenue,
+                "solver_stats": stats,
+            }
+
+    def compile(self, cat='Continuous') -> CompiledModel:
+        """Builds the matrix form of the model.
+        Args:
+            cat (str): PuLP category of the decision variables.
+        Returns:
+            CompiledModel: The model, ready to be solved, cached or exported.
+        """
+        p = self.params
+        return CompiledModel(
+            "Production_Optimization", LpMaximize,
+            # Decision variables
+            # Ensure that the decision variables are non-negative
+            variables=["Product_A", "Product_B"],
+            categories=[cat, cat],
+            lower=[0.0, 0.0],
+            upper=[np.nan, np.nan],
+            # Objective function
+            objective=[p["Price_Product_A"], p["Price_Product_B"]],
+            # Constraints
+            # Ensure that the total production time does not exceed available
+            # hours for each machine
+            constraints=["Machine_1_Constraint", "Machine_2_Constraint"],
+            senses=[LpConstraintLE, LpConstraintLE],
+            rhs=[p["Machine_1_Available_Hours"], p["Machine_2_Available_Hours"]],
+            rows=[0, 0, 1, 1],
+            cols=[0, 1, 0, 1],
+            values=[p["Product_A_Production_Time_Machine_1"],
+                    p["Product_B_Production_Time_Machine_1"],
+                    p["Product_A_Production_Time_Machine_2"],
+                    p["Product_B_Production_Time_Machine_2"]],
+        )
+
+    def _solve_integer(self) -> dict:
+        """Solves the problem with whole production quantities.
+        The LP relaxation is solved first (closed form) and rounded into a
+        feasible incumbent, which is available almost immediately. The MIP then
+        runs under the configured time limit, warm-started from the incumbent;
+        if it does not improve on it in time, the incumbent is returned.
+        Returns:
+            dict: Same keys as solve(), in integer mode.
+        """
+        start = time.perf_counter()
+
+        # --- STEP 1: LP relaxation gives an upper bound on revenue ---
+        relaxed = self._solve_fast()
+        if relaxed["status"] != LpStatus[1]:
+            return relaxed
+        lp_bound = relaxed["Total_Revenue"]
+
+        # --- STEP 2: Round it into a first feasible incumbent ---
+        best = self._round_down(relaxed["Product_A"], relaxed["Product_B"])
+        time_to_first_incumbent = time.perf_counter() - start
+
+        # --- STEP 3: Full MIP under the time budget ---
+        model = self.compile(cat='Integer')
+        with get_model_cache().problem(model) as (prob, (x_A, x_B)):
+            x_A.setInitialValue(best[0])
+            x_B.setInitialValue(best[1])
+            # The closed-form path has no branch and bound, for_pulp() uses CBC
+            status, stats = self.config.for_pulp().run(prob, warm_start=True)
+
+            proven = status == 1 and prob.sol_status == LpSolutionOptimal
+            # An all-zero objective has no terms, PuLP then reports None
+            revenue = value(prob.objective) or 0.0
+            if status == 1 and x_A.varValue is not None and revenue > best[2]:
+                best = (x_A.varValue, x_B.varValue, revenue)
+
+        if proven:
+            mip_gap = 0.0
+        else:
+            mip_gap = (lp_bound - best[2]) / max(abs(lp_bound), 1e-9)
+
+        stats.update({
+            "wall_time": time.perf_counter() - start,
+            "lp_bound": lp_bound,
+            "mip_gap": mip_gap,
+            "time_to_first_incumbent": time_to_first_incumbent,
+        })
+        return {
+            # As with PuLP, "Optimal" means a plan was found; mip_gap tells
+            # whether it is proven
+            "status": LpStatus[1],
+            "Product_A": best[0],
+            "Product_B": best[1],
+            "Total_Revenue": best[2],
+            "integer": True,
+            "solver_stats": stats,
+        }
+
+    def _round_down(self, x_A, x_B):
+        """Turns a fractional plan into a feasible whole-unit plan.
+        Both quantities are floored, which keeps the plan feasible, and the
+        freed machine time is then filled greedily with the higher priced
+        product first.
+        Args:
+            x_A (float): Fractional quantity of Product A.
+            x_B (float): Fractional quantity of Product B.
+        Returns:
+            tuple: Whole quantities of A and B and the resulting revenue.
+        """
+        p = self.params
+        quantities = {"A": math.floor(x_A + 1e-9), "B": math.floor(x_B + 1e-9)}
+
+        for product in sorted("AB", key=lambda q: -p[f"Price_Product_{q}"]):
+            if p[f"Price_Product_{product}"] <= 0:
+                continue
+            room = math.inf
+            for m in (1, 2):
+                use = p[f"Product_{product}_Production_Time_Machine_{m}"]
+                if use > 0:
+                    slack = p[f"Machine_{m}_Available_Hours"] - sum(
+                        quantities[q] * p[f"Product_{q}_Production_Time_Machine_{m}"]
+                        for q in "AB")
+                    room = min(room, math.floor(slack / use + 1e-9))
+            if room != math.inf:
+                quantities[product] += max(room, 0)
+
+        revenue = sum(quantities[q] * p[f"Price_Product_{q}"] for q in "AB")
+        return float(quantities["A"]), float(quantities["B"]), revenue
+
+    def _solve_fast(self) -> dict:
+        """Solves the two-product, two-machine LP in closed form.
+        The feasible region is a polygon in the (A, B) plane, so the optimum is
+        one of its vertices: the origin, the axis intercepts of each machine
+        constraint, or the intersection of both constraints. Every candidate is
+        checked for feasibility and the best one is returned.
+        Returns:
+            dict: Same keys as solve().
         """
-        # Create the problem
-        prob = LpProblem("Production_Optimization", LpMaximize)
-
-        # Decision variables
-        # Ensure that the decision variables are non-negative
-        x_A = LpVariable("Product_A", lowBound=0)
-        x_B = LpVariable("Product_B", lowBound=0)
-
-        # Objective function
-        price_A = self.params["Price_Product_A"]
-        price_B = self.params["Price_Product_B"]
-        prob += price_A * x_A + price_B * x_B, "Total_Revenue"
-
-        # Constraints
-        # Ensure that the total production time does not exceed available hours for each machine
-        # Machine 1 constraint
-        a1 = self.params["Product_A_Production_Time_Machine_1"]
-        b1 = self.params["Product_B_Production_Time_Machine_1"]
-        cap1 = self.params["Machine_1_Available_Hours"]
-        prob += a1 * x_A + b1 * x_B <= cap1, "Machine_1_Constraint"
-
-        # Machine 2 constraint
-        a2 = self.params["Product_A_Production_Time_Machine_2"]
-        b2 = self.params["Product_B_Production_Time_Machine_2"]
-        cap2 = self.params["Machine_2_Available_Hours"]
-        prob += a2 * x_A + b2 * x_B <= cap2, "Machine_2_Constraint"
-
-        # Solve the problem
-        status = prob.solve()
-
-        # Return solution
+        start = time.perf_counter()
+        p = self.params
+        price_A, price_B = p["Price_Product_A"], p["Price_Product_B"]
+        machines = [
+            (p[f"Product_A_Production_Time_Machine_{m}"],
+             p[f"Product_B_Production_Time_Machine_{m}"],
+             p[f"Machine_{m}_Available_Hours"])
+            for m in (1, 2)
+        ]
+
+        # A profitable product that uses no machine time can grow forever
+        if ((price_A > 0 and all(a == 0 for a, _, _ in machines))
+                or (price_B > 0 and all(b == 0 for _, b, _ in machines))):
+            return self._fast_no_solution(LpStatus[-2], start, 0)  # Unbounded
+
+        candidates = [(0.0, 0.0)]
+        for a, b, cap in machines:
+            if a > 0:
+                candidates.append((cap / a, 0.0))
+            if b > 0:
+                candidates.append((0.0, cap / b))
+        (a1, b1, cap1), (a2, b2, cap2) = machines
+        det = a1 * b2 - a2 * b1
+        if det != 0:
+            candidates.append(((cap1 * b2 - cap2 * b1) / det,
+                               (a1 * cap2 - a2 * cap1) / det))
+
+        tol = 1e-9
+        best = None
+        for x_A, x_B in candidates:
+            feasible = x_A >= -tol and x_B >= -tol and all(
+                a * x_A + b * x_B <= cap + tol * max(1.0, cap)
+                for a, b, cap in machines)
+            if not feasible:
+                continue
+            revenue = price_A * x_A + price_B * x_B
+            if best is None or revenue > best[2]:
+                best = (max(x_A, 0.0), max(x_B, 0.0), revenue)
+
+        if best is None:
+            # Only possible with negative capacities
+            return self._fast_no_solution(LpStatus[-1], start, len(candidates))
+
+        return {
+            "status": LpStatus[1],  # Optimal
+            "Product_A": best[0],
+            "Product_B": best[1],
+            "Total_Revenue": best[2],
+            "solver_stats": self._fast_stats(start, len(candidates)),
+        }
+
+    def _fast_no_solution(self, status, start, iterations):
+        return {
+            "status": status,
+            "Product_A": None,
+            "Product_B": None,
+            "Total_Revenue": None,
+            "solver_stats": self._fast_stats(start, iterations),
+        }
+
+    def _fast_stats(self, start, iterations):
         return {
-            "status": LpStatus[status],
-            "Product_A": x_A.varValue,
-            "Product_B": x_B.varValue,
-            "Total_Revenue": value(prob.objective)
+            "backend": self.config.backend,
+            "wall_time": time.perf_counter() - start,
+            "iterations": iterations,
         }
@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pulp import LpProblem, LpVariable, LpMaximize, LpStatus, lpSum, value
+
+from .solver import SolverConfig
+
+
+class ParetoFrontier:
+    '''
+    Computes the trade-off between revenue and a second objective with the
+    epsilon-constraint method: revenue is maximized while the second objective
+    is capped at epsilon, for a sweep of epsilon values.
+    The sweep is adaptive. It starts from the two extremes of the frontier and
+    bisects, round after round, only the segments where the frontier bends
+    away from a straight line, so flat parts get few points and kinks get
+    many. All points of a round are solved in parallel.
+    Second objectives (both minimized):
+        - 'overtime': total overtime hours. Each machine may run up to the
+          optional 'Machine_<m>_Overtime_Hours' beyond its available hours.
+        - 'utilization': total machine hours used.
+    Attributes:
+        params (dict): The parameters of one scenario.
+        objective (str): One of OBJECTIVES.
+        config (SolverConfig): Solver settings for each point.
+        tolerance (float): Relative deviation from linear interpolation, as a
+            fraction of the revenue range, below which a segment is final.
+        max_points (int): Upper bound on the number of solved points.
+        workers (int): Number of points solved concurrently.
+    '''
+    OBJECTIVES = ('overtime', 'utilization')
+    MACHINES = [1, 2]
+
+    def __init__(self, params, objective='overtime', config=None,
+                 tolerance=0.01, max_points=33, workers=4):
+        if objective not in self.OBJECTIVES:
+            raise ValueError(
+                f"Unknown objective {objective!r}, expected one of {self.OBJECTIVES}.")
+        self.params = params
+        self.objective = objective
+        self.config = (config or SolverConfig.from_settings()).for_pulp()
+        self.tolerance = tolerance
+        self.max_points = max_points
+        self.workers = workers
+
+    def compute(self) -> list:
+        '''
+        Computes the frontier.
+        Returns:
+            list: Frontier points sorted by the second objective, each a dict
+                with 'Total_Revenue', the objective name (its value),
+                'Product_A' and 'Product_B'. Empty if the scenario has no
+                optimal solution.
+        '''
+        # --- STEP 1: The two extremes of the frontier ---
+        best_revenue = self._solve_point(None)
+        if best_revenue is None:
+            return []
+        least = self._solve_point(0.0)
+        points = {0.0: least, best_revenue[self.objective]: best_revenue}
+
+        revenue_range = best_revenue["Total_Revenue"] - least["Total_Revenue"]
+        threshold = self.tolerance * max(abs(revenue_range), 1e-9)
+        segments = [(0.0, best_revenue[self.objective])]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            # --- STEP 2: Bisect segments that are not flat enough ---
+            while segments and len(points) < self.max_points:
+                budget = self.max_points - len(points)
+                segments = [(lo, hi) for lo, hi in segments
+                            if hi - lo > 1e-6][:budget]
+                mids = [(lo + hi) / 2 for lo, hi in segments]
+                solved = list(pool.map(self._solve_point, mids))
+
+                next_segments = []
+                for (lo, hi), mid, point in zip(segments, mids, solved):
+                    if point is None:
+                        continue
+                    points[mid] = point
+                    interpolated = (points[lo]["Total_Revenue"]
+                                    + points[hi]["Total_Revenue"]) / 2
+                    # Revenue is concave in epsilon: a midpoint on the chord
+                    # means the whole segment is linear
+                    if point["Total_Revenue"] - interpolated > threshold:
+                        next_segments += [(lo, mid), (mid, hi)]
+                segments = next_segments
+
+        # Several epsilons can land on the same vertex, keep it once
+        frontier = {}
+        for point in points.values():
+            key = (round(point[self.objective], 6),
+                   round(point["Total_Revenue"], 6))
+            frontier.setdefault(key, point)
+        return [frontier[key] for key in sorted(frontier)]
+
+    def _solve_point(self, epsilon):
+        '''
+        Maximizes revenue with the second objective capped at epsilon.
+        Args:
+            epsilon (float): The cap, or None for no cap.
+        Returns:
+            dict: The frontier point, or None if the solve was not optimal.
+        '''
+        p = self.params
+        prob = LpProblem("Pareto_Point", LpMaximize)
+        x_A = LpVariable("Product_A", lowBound=0)
+        x_B = LpVariable("Product_B", lowBound=0)
+
+        used = {}
+        overtime = {}
+        for m in self.MACHINES:
+            used[m] = (p[f"Product_A_Production_Time_Machine_{m}"] * x_A
+                       + p[f"Product_B_Production_Time_Machine_{m}"] * x_B)
+            overtime[m] = LpVariable(
+                f"Overtime_Machine_{m}", lowBound=0,
+                upBound=p.get(f"Machine_{m}_Overtime_Hours", 0.0))
+            prob += (used[m] <= p[f"Machine_{m}_Available_Hours"] + overtime[m],
+                     f"Machine_{m}_Constraint")
+
+        secondary = lpSum(overtime.values() if self.objective == 'overtime'
+                          else used.values())
+        revenue = p["Price_Product_A"] * x_A + p["Price_Product_B"] * x_B
+        # The tiny penalty picks the non-dominated plan among equal revenues
+        prob += revenue - 1e-6 * secondary, "Total_Revenue"
+        if epsilon is not None:
+            prob += secondary <= epsilon, "Epsilon_Constraint"
+
+        status, _ = self.config.run(prob)
+        if LpStatus[status] != "Optimal":
+            return None
+        return {
+            "Total_Revenue": value(revenue),
+            self.objective: value(secondary),
+            "Product_A": x_A.varValue,
+            "Product_B": x_B.varValue,
+        }
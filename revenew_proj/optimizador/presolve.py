@@ -0,0 +1,443 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .admission import Saturated, get_admission
+from .dataloader import DataLoader
+from .optimizer import OptimizationModel
+from .pareto import ParetoFrontier
+from .results import ResultsHandler
+from .singleflight import fcntl, params_key
+from .solver import SolverConfig
+from .timing import StageTimer
+
+logger = logging.getLogger(__name__)
+
+# Background work polls for a spare slot this often, and gives up after
+# waiting this long
+SPARE_SLOT_POLL = 0.5
+SPARE_SLOT_PATIENCE = 300.0
+
+
+def private_dir(*parts) -> str:
+    '''
+    Returns a directory under the project's private state directory
+    (BASE_DIR/var, next to the result cache), created with mode 0700.
+    Nothing in it may be writable by other users: they could plant
+    scenarios or hold its locks.
+    Args:
+        *parts: Path components below BASE_DIR/var.
+    Returns:
+        str: The directory.
+    Raises:
+        ImproperlyConfigured: If the directory belongs to another user.
+    '''
+    path = os.path.join(settings.BASE_DIR, 'var', *parts)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.stat(path).st_uid != os.getuid():
+        raise ImproperlyConfigured(f"{path} belongs to another user.")
+    os.chmod(path, 0o700)
+    return path
+
+
+def result_key(params, integer=False, pareto=''):
+    '''
+    Builds the key of a formatted result: the scenario (with its overtime
+    limits), the solve options and the solver settings (OPTIMIZADOR_SOLVER),
+    which can change the plan found, e.g. through a time limit.
+    '''
+    config = SolverConfig.from_settings()
+    solver = [config.backend, config.time_limit, config.mip_gap, config.threads]
+    return params_key(params, integer=integer, pareto=pareto, solver=solver)
+
+
+class ResultCache:
+    '''
+    Solution and plot caches on top of a Django cache.
+    Solutions (with the Pareto frontier, if any) and rendered plots are
+    stored separately, so a result whose plots were skipped under load can
+    get them later without being solved again. Solutions that are not
+    proven optimal (e.g. a whole-unit plan cut short by the time limit) are
+    only kept for unproven_timeout, so they are soon solved again.
+    Attributes:
+        cache: The Django cache backend.
+        timeout (int): Seconds entries are kept.
+        unproven_timeout (int): Seconds entries of unproven solutions are kept.
+    '''
+
+    def __init__(self, cache, timeout=7 * 24 * 3600, unproven_timeout=300):
+        self.cache = cache
+        self.timeout = timeout
+        self.unproven_timeout = unproven_timeout
+
+    @classmethod
+    def from_settings(cls):
+        '''
+        Uses the OPTIMIZADOR_RESULT_CACHE setting, e.g.:
+
+            OPTIMIZADOR_RESULT_CACHE = {
+                'ALIAS': 'optimizador',   # Entry of CACHES to use
+                'TIMEOUT': 7 * 24 * 3600,
+                'UNPROVEN_TIMEOUT': 300,
+            }
+        '''
+        config = getattr(settings, 'OPTIMIZADOR_RESULT_CACHE', {})
+        return cls(caches[config.get('ALIAS', 'default')],
+                   config.get('TIMEOUT', 7 * 24 * 3600),
+                   config.get('UNPROVEN_TIMEOUT', 300))
+
+    def timeout_for(self, solution) -> int:
+        '''Seconds to keep the entries of a solution (see the class docs).'''
+        stats = solution.get("solver_stats") or {}
+        proven = (solution["status"] == "Optimal"
+                  and not stats.get("mip_gap"))
+        return self.timeout if proven else self.unproven_timeout
+
+    def get_solution(self, key):
+        return self.cache.get(f"optimizador:solution:{key}")
+
+    def set_solution(self, key, solved):
+        self.cache.set(f"optimizador:solution:{key}", solved,
+                       self.timeout_for(solved["solution"]))
+
+    def get_plots(self, key):
+        return self.cache.get(f"optimizador:plots:{key}")
+
+    def set_plots(self, key, plots, solution):
+        # Never outlive the solution they were drawn from
+        self.cache.set(f"optimizador:plots:{key}", plots,
+                       self.timeout_for(solution))
+
+    def is_warm(self, key) -> bool:
+        '''Whether both the solution and, if it has any, its plots are cached.'''
+        solved = self.get_solution(key)
+        if solved is None:
+            return False
+        return (solved["solution"]["status"] != "Optimal"
+                or self.get_plots(key) is not None)
+
+
+@contextmanager
+def _spare_slot(gate):
+    # Takes a slot only while no live request is waiting for one
+    deadline = time.monotonic() + SPARE_SLOT_PATIENCE
+    while not gate.try_acquire():
+        if time.monotonic() > deadline:
+            raise Saturated(gate.name, "no spare slot", gate.retry_after)
+        time.sleep(SPARE_SLOT_POLL)
+    try:
+        yield
+    finally:
+        gate.release()
+
+
+def solve_and_format(params, integer=False, pareto='', background=False,
+                     timer=None):
+    '''
+    Solves one scenario and formats it for the results page, through the
+    solution and plot caches and admission control.
+    Args:
+        params (dict): The parameters of one scenario.
+        integer (bool): Whether to plan whole units only.
+        pareto (str): Optional second objective for a trade-off frontier.
+        background (bool): Warming mode: only take solver and render slots
+            no live request is waiting for, and always render the plots.
+        timer (StageTimer): Records the 'queue', 'solve' and 'plots' stages.
+    Returns:
+        dict: As ResultsHandler.format(), plus 'cached' (whether the
+            solution came from the cache), 'plots_skipped' and, with a
+            frontier, 'pareto_objective' and 'pareto_plot'.
+    Raises:
+        Saturated: If no solver slot (or, in background, render slot) freed
+            up in time.
+    '''
+    admission = get_admission()
+    cache = ResultCache.from_settings()
+    timer = timer or StageTimer()
+    key = result_key(params, integer, pareto)
+
+    # --- STEP 2: Solve the optimization problem, unless cached ---
+    solved = cache.get_solution(key)
+    cached = solved is not None
+    if not cached:
+        # Raises Saturated when all solver slots stay busy
+        with timer.stage('queue'), (_spare_slot(admission.solve) if background
+                                    else admission.solve.slot()):
+            with timer.stage('solve'):
+                solution = OptimizationModel(params, integer=integer).solve()
+
+                # --- Optional: trade-off frontier against a second objective ---
+                frontier = None
+                if pareto and solution["status"] == "Optimal":
+                    # One slot is one solver process: no concurrent points
+                    frontier = ParetoFrontier(params, pareto, workers=1).compute()
+        solved = {"solution": solution, "frontier": frontier}
+        cache.set_solution(key, solved)
+
+    # --- STEP 3: Format the result for display ---
+    formatter = ResultsHandler(solved["solution"], params)
+    result = formatter.format(plots=False)
+    result["cached"] = cached
+    if solved["frontier"] is not None:
+        result["pareto_objective"] = pareto
+
+    plots = None
+    if not result.get("error"):
+        plots = cache.get_plots(key)
+        if plots is None and background:
+            with timer.stage('queue'), _spare_slot(admission.render):
+                with timer.stage('plots'):
+                    plots = _render_plots(formatter, solved["frontier"], pareto)
+        elif plots is None:
+            # Plots are optional: skip them rather than wait for a busy renderer
+            with timer.stage('queue'), admission.render.try_slot() as admitted:
+                if admitted:
+                    with timer.stage('plots'):
+                        plots = _render_plots(formatter, solved["frontier"], pareto)
+        if plots is not None:
+            cache.set_plots(key, plots, solved["solution"])
+            result.update(plots)
+    result["plots_skipped"] = plots is None and not result.get("error")
+    return result
+
+
+def _render_plots(formatter, frontier, pareto):
+    rendered = formatter.format(plots=True)
+    plots = {"plot": rendered["plot"],
+             "feasible_region_plot": rendered["feasible_region_plot"]}
+    if frontier is not None:
+        plots["pareto_plot"] = formatter.generate_pareto_plot(frontier, pareto)
+    return plots
+
+
+class ScenarioLibrary:
+    '''
+    Registered parameter sets to keep warm: a directory of scenario CSVs
+    (one scenario per row), each validated by DataLoader when registered and
+    again when read.
+    Attributes:
+        directory (str): Where the CSV files are kept.
+    '''
+
+    def __init__(self, directory):
+        self.directory = str(directory)
+
+    @classmethod
+    def from_settings(cls):
+        config = getattr(settings, 'OPTIMIZADOR_PRESOLVE', {})
+        return cls(config.get('LIBRARY_DIR') or private_dir('scenario_library'))
+
+    def register(self, name, file) -> int:
+        '''
+        Validates a scenario CSV and adds it to the library, replacing any
+        set registered under the same name.
+        Args:
+            name (str): Name of the parameter set.
+            file: Path or binary file object of the CSV.
+        Returns:
+            int: Number of scenarios in the set.
+        Raises:
+            ValidationError: If the CSV file is invalid or has no rows.
+        '''
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                content = f.read()
+        else:
+            content = file.read()
+        count = len(DataLoader(BytesIO(content)).load_batch())
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{slugify(name) or 'scenarios'}.csv")
+        with open(path, 'wb') as f:
+            f.write(content)
+        return count
+
+    def names(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.directory)
+                      if name.endswith('.csv'))
+
+    def scenarios(self):
+        '''
+        Yields:
+            tuple: Set name, row index and validated parameters of every
+                scenario in the library.
+        '''
+        for name in self.names():
+            with open(os.path.join(self.directory, f"{name}.csv"), 'rb') as f:
+                for index, params in enumerate(DataLoader(f).iter_scenarios()):
+                    yield name, index, params
+
+
+def warm(library=None, variants=None, workers=None) -> dict:
+    '''
+    Pre-solves and pre-renders every scenario of the library into the
+    solution and plot caches. Work runs in the background mode of
+    solve_and_format(), so it only uses capacity live requests leave free.
+    Args:
+        library (ScenarioLibrary): Defaults to ScenarioLibrary.from_settings().
+        variants (list): (integer, pareto) option pairs to warm per scenario,
+            default from OPTIMIZADOR_PRESOLVE['VARIANTS'].
+        workers (int): Scenarios warmed concurrently, default from
+            OPTIMIZADOR_PRESOLVE['WORKERS'].
+    Returns:
+        dict: Counts of 'warmed', 'cached' (already warm), 'deferred' (no
+            spare capacity) and 'failed' results, and the 'wall_time'.
+    '''
+    config = getattr(settings, 'OPTIMIZADOR_PRESOLVE', {})
+    library = library or ScenarioLibrary.from_settings()
+    variants = variants or config.get('VARIANTS', [(False, '')])
+    workers = workers or config.get('WORKERS', 1)
+    cache = ResultCache.from_settings()
+    start = time.perf_counter()
+
+    def warm_one(task):
+        name, index, params, integer, pareto = task
+        if cache.is_warm(result_key(params, integer, pareto)):
+            return 'cached'
+        try:
+            solve_and_format(params, integer, pareto, background=True)
+        except Saturated:
+            return 'deferred'
+        except Exception:
+            logger.exception("Warming %s row %d failed", name, index)
+            return 'failed'
+        return 'warmed'
+
+    tasks = ((name, index, params, integer, pareto)
+             for name, index, params in library.scenarios()
+             for integer, pareto in variants)
+    counts = {'warmed': 0, 'cached': 0, 'deferred': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for outcome in pool.map(warm_one, tasks):
+            counts[outcome] += 1
+    counts['wall_time'] = time.perf_counter() - start
+    return counts
+
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+
+def parse_schedule(entries):
+    '''
+    Parses schedule entries such as 'mon 05:30' or 'daily 06:00' (in the
+    TIME_ZONE setting).
+    Returns:
+        list: (weekday or None for daily, time) pairs.
+    Raises:
+        ValueError: If an entry is malformed.
+    '''
+    parsed = []
+    for entry in entries:
+        try:
+            day, clock = entry.lower().split()
+            at = datetime.datetime.strptime(clock, '%H:%M').time()
+        except ValueError:
+            raise ValueError(f"Invalid schedule entry {entry!r}, "
+                             "expected e.g. 'mon 05:30' or 'daily 06:00'.")
+        if day != 'daily' and day not in WEEKDAYS:
+            raise ValueError(f"Invalid weekday in schedule entry {entry!r}.")
+        parsed.append((None if day == 'daily' else WEEKDAYS.index(day), at))
+    return parsed
+
+
+class WarmingScheduler:
+    '''
+    Runs warm() at the times of a schedule, in a daemon thread of the web
+    process. When several processes of a host run the scheduler, a file lock
+    lets only one of them warm at a time; the caches are shared, so the
+    others have nothing left to do.
+    Attributes:
+        schedule (list): Pairs from parse_schedule().
+        lock_path (str): File locked while warming, by default in the
+            project's private directory (see private_dir()).
+    '''
+
+    def __init__(self, schedule, lock_path=None):
+        self.schedule = schedule
+        self.lock_path = lock_path or os.path.join(private_dir(), 'presolve.lock')
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_run(self, now):
+        '''
+        Args:
+            now (datetime): Aware current time.
+        Returns:
+            datetime: The first scheduled time after now.
+        '''
+        now = timezone.localtime(now)
+        candidates = []
+        for weekday, at in self.schedule:
+            for days in range(8):
+                day = now.date() + datetime.timedelta(days=days)
+                if weekday is not None and day.weekday() != weekday:
+                    continue
+                when = datetime.datetime.combine(day, at, tzinfo=now.tzinfo)
+                if when > now:
+                    candidates.append(when)
+                    break
+        return min(candidates)
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop, name='optimizador-presolve', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            delay = (self.next_run(timezone.now()) - timezone.now()).total_seconds()
+            if self._stop.wait(max(delay, 0)):
+                return
+            self.run_once()
+
+    def run_once(self):
+        '''Warms the caches unless another process is already doing it.'''
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, 'r+') as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return None
+            try:
+                self.last_result = warm()
+                logger.info("Cache warming finished: %s", self.last_result)
+            except Exception:
+                logger.exception("Cache warming failed")
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return self.last_result
+
+
+def start_scheduler():
+    '''
+    Starts a WarmingScheduler if OPTIMIZADOR_PRESOLVE['SCHEDULE'] is set.
+    Called from the WSGI and ASGI entry points, which only server processes
+    load (with runserver, the one serving requests).
+    Returns:
+        WarmingScheduler: The scheduler, or None if none was started.
+    '''
+    config = getattr(settings, 'OPTIMIZADOR_PRESOLVE', {})
+    if not config.get('SCHEDULE'):
+        return None
+    scheduler = WarmingScheduler(parse_schedule(config['SCHEDULE']))
+    scheduler.start()
+    return scheduler
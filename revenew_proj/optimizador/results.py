@@ -11,23 +11,29 @@ class ResultsHandler:
     Handles the formatting of optimization results for display.
     This class takes the solution dictionary from the optimization model and formats it for easier interpretation and display in the web application.
     Attributes:
-        solution (dict): The solution dictionary containing the optimization results.
-        params (dict): The original parameters used for the optimization.
+        solution (dict): The solution dictionary containing the optimization results
+            (a ResultRow of a ResultBatch works as well).
+        params (dict): The original parameters used for the optimization
+            (or a ScenarioRow of a ScenarioBatch).
     '''
 
     def __init__(self, solution: dict, params: dict):
         self.solution = solution
         self.params = params
 
-    def format(self):
+    def format(self, plots=True):
         '''
         Formats the optimization results for display.
+        Args:
+            plots (bool): Whether to render the plots. Without them the result
+                has 'plot' and 'feasible_region_plot' set to None.
         Returns:
             dict: A dictionary containing the formatted results, including:
                 - status: The status of the optimization (e.g., "Optimal", "Infeasible").
                 - Product_A: The optimal quantity of Product A to produce.
                 - Product_B: The optimal quantity of Product B to produce.
                 - Total_Revenue: The total revenue from the optimal production plan.
+                - solver_stats: Solver backend, wall time and iterations, if reported.
                 - plot: Base64 string of the bar plot for production quantities.
                 - feasible_region_plot: Base64 string of the plot showing constraints and feasible region.
         '''
@@ -39,16 +45,26 @@ class ResultsHandler:
                 "Product_B": None,
                 "Total_Revenue": None,
                 "plot": None,
-                "feasible_region_plot": None  # Add this for consistency
+                "feasible_region_plot": None,  # Add this for consistency
+                "solver_stats": self.solution.get("solver_stats"),
             }
 
+        # Whole-unit plans are shown as integers, rounding them to 2 decimals
+        # would only add noise like 59.99999
+        digits = None if self.solution.get("integer") else 2
+
         result = {
             "status": self.solution["status"],
-            "Product_A": round(self.solution["Product_A"], 2),
-            "Product_B": round(self.solution["Product_B"], 2),
+            "Product_A": round(self.solution["Product_A"], digits),
+            "Product_B": round(self.solution["Product_B"], digits),
             "Total_Revenue": round(self.solution["Total_Revenue"], 2),
+            "solver_stats": self.solution.get("solver_stats"),
         }
 
+        if not plots:
+            result["plot"] = result["feasible_region_plot"] = None
+            return result
+
         # Add a bar plot (as base64 string)
         result["plot"] = self.generate_plot(result)
         # Add the feasible region plot (as base64 string)
@@ -166,3 +182,40 @@ class ResultsHandler:
         plt.close(fig)  # Close the figure to free memory
         plot_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
         return f"data:image/png;base64,{plot_base64}"
+
+    def generate_pareto_plot(self, frontier: list, objective: str) -> str:
+        '''
+        Generates a plot of the revenue trade-off curve computed by ParetoFrontier.
+        Args:
+            frontier (list): Frontier points sorted by the second objective.
+            objective (str): Name of the second objective ('overtime' or 'utilization').
+        Returns:
+            str: A base64-encoded string representing the plot image.
+        '''
+        labels = {
+            "overtime": "Total Overtime (Hours)",
+            "utilization": "Total Machine Time Used (Hours)",
+        }
+        x = [point[objective] for point in frontier]
+        y = [point["Total_Revenue"] for point in frontier]
+
+        fig, ax = plt.subplots(figsize=(8, 5))
+        ax.plot(x, y, '-o', color='steelblue', markersize=5,
+                markeredgecolor='black', label='Pareto frontier')
+        ax.fill_between(x, 0, y, color='steelblue', alpha=0.1,
+                        label='Dominated plans')
+        ax.set_xlabel(labels.get(objective, objective))
+        ax.set_ylabel("Total Revenue")
+        ax.set_title(f"Revenue vs. {objective.capitalize()} Trade-off")
+        ax.set_xlim(left=0)
+        ax.set_ylim(bottom=0)
+        ax.grid(True, linestyle=':', alpha=0.6)
+        ax.legend()
+
+        # Save to memory
+        buffer = BytesIO()
+        plt.tight_layout()
+        plt.savefig(buffer, format='png')
+        plt.close(fig)  # Close the figure to free memory
+        plot_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        return f"data:image/png;base64,{plot_base64}"
@@ -0,0 +1,197 @@
+from collections.abc import Mapping
+
+import numpy as np
+from pulp import LpStatus
+
+from .dataloader import DataLoader
+
+# One float64 per required column: 64 bytes per scenario, against ~350 bytes
+# for the equivalent dict of Python floats
+PARAMS_DTYPE = np.dtype([(col, 'f8') for col in DataLoader.REQUIRED_COLUMNS])
+
+# Status is stored as PuLP's integer code; missing values are NaN
+RESULTS_DTYPE = np.dtype([
+    ('status', 'i1'),
+    ('Product_A', 'f8'),
+    ('Product_B', 'f8'),
+    ('Total_Revenue', 'f8'),
+])
+_STATUS_CODES = {name: code for code, name in LpStatus.items()}
+
+
+class ScenarioBatch:
+    '''
+    Columnar container for many scenarios, backed by a NumPy structured array.
+    Scenarios are accessed through lightweight ScenarioRow views, which behave
+    like the parameter dicts used elsewhere (OptimizationModel,
+    ResultsHandler) without materializing one dict per scenario.
+    Attributes:
+        data (ndarray): Structured array with PARAMS_DTYPE.
+    '''
+
+    def __init__(self, data: np.ndarray):
+        if data.dtype != PARAMS_DTYPE:
+            data = data.astype(PARAMS_DTYPE)
+        self.data = data
+
+    @classmethod
+    def from_dataframe(cls, df):
+        '''
+        Builds a batch from the required columns of a DataFrame.
+        Args:
+            df (DataFrame): Validated scenarios, one per row.
+        Returns:
+            ScenarioBatch: The packed scenarios.
+        '''
+        data = np.empty(len(df), dtype=PARAMS_DTYPE)
+        for col in DataLoader.REQUIRED_COLUMNS:
+            data[col] = df[col].to_numpy(dtype='f8')
+        return cls(data)
+
+    @classmethod
+    def from_records(cls, records):
+        '''
+        Builds a batch from an iterable of parameter mappings.
+        Args:
+            records (iterable): Parameter dicts, e.g. from DataLoader.
+        Returns:
+            ScenarioBatch: The packed scenarios.
+        '''
+        rows = [tuple(r[col] for col in DataLoader.REQUIRED_COLUMNS)
+                for r in records]
+        return cls(np.array(rows, dtype=PARAMS_DTYPE))
+
+    @classmethod
+    def concatenate(cls, batches):
+        return cls(np.concatenate([b.data for b in batches]))
+
+    @property
+    def itemsize(self) -> int:
+        # Size of one packed record, not counting the array's own overhead
+        return self.data.dtype.itemsize
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def column(self, name) -> np.ndarray:
+        return self.data[name]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ScenarioBatch(self.data[index])
+        if index < 0:
+            index += len(self.data)
+        if not 0 <= index < len(self.data):
+            raise IndexError("scenario index out of range")
+        return ScenarioRow(self.data, index)
+
+    def __iter__(self):
+        for index in range(len(self.data)):
+            yield ScenarioRow(self.data, index)
+
+
+class ResultBatch:
+    '''
+    Columnar container for the solutions of a ScenarioBatch.
+    Attributes:
+        data (ndarray): Structured array with RESULTS_DTYPE.
+    '''
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    @classmethod
+    def empty(cls, size):
+        data = np.empty(size, dtype=RESULTS_DTYPE)
+        data['status'] = _STATUS_CODES["Not Solved"]
+        for name in ('Product_A', 'Product_B', 'Total_Revenue'):
+            data[name] = np.nan
+        return cls(data)
+
+    def set(self, index, solution):
+        '''
+        Stores one solution dict, as returned by OptimizationModel.solve().
+        Only the status and the quantities are kept.
+        '''
+        row = self.data[index:index + 1]
+        row['status'] = _STATUS_CODES[solution["status"]]
+        for name in ('Product_A', 'Product_B', 'Total_Revenue'):
+            row[name] = np.nan if solution[name] is None else solution[name]
+
+    @property
+    def itemsize(self) -> int:
+        # Size of one packed record, not counting the array's own overhead
+        return self.data.dtype.itemsize
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def column(self, name) -> np.ndarray:
+        return self.data[name]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultBatch(self.data[index])
+        if index < 0:
+            index += len(self.data)
+        if not 0 <= index < len(self.data):
+            raise IndexError("result index out of range")
+        return ResultRow(self.data, index)
+
+    def __iter__(self):
+        for index in range(len(self.data)):
+            yield ResultRow(self.data, index)
+
+
+class _RowView(Mapping):
+    '''Read-only mapping view of one row of a structured array.'''
+    __slots__ = ('_data', '_index')
+
+    def __init__(self, data, index):
+        self._data = data
+        self._index = index
+
+    def __iter__(self):
+        return iter(self._data.dtype.names)
+
+    def __len__(self):
+        return len(self._data.dtype.names)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def to_dict(self) -> dict:
+        return dict(self)
+
+
+class ScenarioRow(_RowView):
+    '''View of one scenario, usable wherever a parameter dict is expected.'''
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return float(self._data[key][self._index])
+        except ValueError:
+            raise KeyError(key)
+
+
+class ResultRow(_RowView):
+    '''View of one solution, shaped like the dict from OptimizationModel.solve().'''
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            raw = self._data[key][self._index]
+        except ValueError:
+            raise KeyError(key)
+        if key == 'status':
+            return LpStatus[int(raw)]
+        return None if np.isnan(raw) else float(raw)
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .admission import get_admission
+from .dataloader import DataLoader
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory file locks, stay in-process
+    fcntl = None
+
+
+def params_key(params, **options) -> str:
+    '''
+    Builds a stable key for a set of parameters.
+    The required columns and the overtime limits take part (a missing limit
+    counts as 0), values are normalized to floats so that e.g. 10 and 10.0
+    (or differently ordered CSV columns) map to the same key.
+    Args:
+        params (dict): The parameters of one scenario.
+        **options: Solve options that change the result (e.g. integer=True).
+    Returns:
+        str: A hex digest identifying the scenario.
+    '''
+    normalized = {col: float(params[col]) for col in DataLoader.REQUIRED_COLUMNS}
+    for col in DataLoader.OVERTIME_COLUMNS:
+        value = params.get(col)
+        normalized[col] = 0.0 if value is None or value != value else float(value)
+    payload = json.dumps([normalized, options], sort_keys=True).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class LocalBackend:
+    '''
+    Backend that simply runs the computation. Coalescing only happens
+    between threads of the same process.
+    '''
+
+    def run(self, key, fn, wait):
+        return fn()
+
+
+class FileLockBackend:
+    '''
+    Backend that coalesces identical computations across processes.
+    The leader holds an exclusive lock on a per-key file while computing;
+    processes that want the same key wait for the lock and then run the
+    computation themselves, which is cheap once the leader has stored its
+    result in a shared cache (solve_and_format uses the result cache). Only
+    empty lock files are written, and each is removed by whoever releases
+    it last, so nothing needs to expire.
+    Attributes:
+        lock_dir (str): Private directory (mode 0700) holding the lock files.
+    '''
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, lock_dir):
+        self.lock_dir = os.fspath(lock_dir)
+        os.makedirs(self.lock_dir, mode=0o700, exist_ok=True)
+        info = os.stat(self.lock_dir)
+        if info.st_uid != os.getuid():
+            raise ImproperlyConfigured(
+                f"The singleflight LOCK_DIR {self.lock_dir} belongs to another user.")
+        os.chmod(self.lock_dir, 0o700)
+
+    def run(self, key, fn, wait):
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+
+        while True:
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if not self._lock(fd, 0.0):
+                    # Another process computes the same key
+                    wait(lambda seconds: self._lock(fd, seconds))
+                # The previous holder may have removed the file while we
+                # waited: then the lock is on a stale inode, start over
+                if not self._is_current(fd, lock_path):
+                    continue
+                try:
+                    return fn()
+                finally:
+                    os.unlink(lock_path)
+            finally:
+                os.close(fd)
+
+    def _lock(self, fd, seconds):
+        # Polled rather than blocking so that a stuck leader cannot hold
+        # its waiters forever
+        deadline = time.monotonic() + seconds
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(self.POLL_INTERVAL, remaining))
+
+    @staticmethod
+    def _is_current(fd, path):
+        try:
+            return os.path.samestat(os.fstat(fd), os.stat(path))
+        except FileNotFoundError:
+            return False
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    '''
+    Coalesces concurrent calls that share a key into a single computation.
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight block and receive the same result, or the
+    same exception. Nothing is kept once the call has finished.
+    Attributes:
+        backend: Runs the leader's computation (LocalBackend or FileLockBackend).
+        gate (Gate): Admission gate whose queue the waiting callers are
+            counted in and bounded by, or None to wait without a limit.
+    '''
+
+    def __init__(self, backend=None, gate=None):
+        self.backend = backend or LocalBackend()
+        self.gate = gate
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        '''
+        Runs fn() once per key among concurrent callers.
+        Args:
+            key (str): Identifies identical computations.
+            fn (callable): Computation without arguments.
+        Returns:
+            The result of fn(), shared by every caller for the key.
+        Raises:
+            Saturated: If the gate's queue is full, or the leader took
+                longer than its timeout.
+        '''
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._wait(call.done.wait)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self.backend.run(key, fn, self._wait)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _wait(self, ready):
+        if self.gate is not None:
+            self.gate.wait(ready)
+        else:
+            while not ready(1.0):
+                pass
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    '''
+    Returns the process-wide SingleFlight configured by the
+    OPTIMIZADOR_SINGLEFLIGHT setting, e.g.:
+
+        OPTIMIZADOR_SINGLEFLIGHT = {
+            'BACKEND': 'file',     # 'file' (cross-process) or 'local'
+            'LOCK_DIR': BASE_DIR / 'var' / 'singleflight',
+        }
+
+    The file backend needs LOCK_DIR: a directory private to the user the
+    web processes run as. Callers waiting for an identical request are
+    counted in the queue of the 'solve' admission gate, and give up after
+    its QUEUE_TIMEOUT.
+    Raises:
+        ImproperlyConfigured: If the file backend has no LOCK_DIR, or it
+            belongs to another user.
+    '''
+    global _default
+    with _default_lock:
+        if _default is None:
+            config = getattr(settings, 'OPTIMIZADOR_SINGLEFLIGHT', {})
+            backend_name = config.get('BACKEND', 'file')
+            if backend_name == 'file' and fcntl is not None:
+                if not config.get('LOCK_DIR'):
+                    raise ImproperlyConfigured(
+                        "OPTIMIZADOR_SINGLEFLIGHT['LOCK_DIR'] is required by "
+                        "the file backend.")
+                backend = FileLockBackend(config['LOCK_DIR'])
+            else:
+                backend = LocalBackend()
+            _default = SingleFlight(backend, get_admission().solve)
+        return _default
@@ -0,0 +1,141 @@
+import os
+import re
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from pulp import PULP_CBC_CMD, HiGHS
+
+
+class SolverConfig:
+    '''
+    Solver settings used by OptimizationModel.
+    Defaults come from the OPTIMIZADOR_SOLVER Django setting and can be
+    overridden per call (e.g. from CLI flags).
+    Attributes:
+        backend (str): 'cbc' (PuLP's bundled CBC), 'highs' (HiGHS through
+            PuLP, requires the optional highspy package) or 'fast' (the
+            built-in closed-form solver for the two-product model).
+        time_limit (float): Maximum solver wall time in seconds, or None.
+        mip_gap (float): Relative MIP gap at which to stop, or None.
+        threads (int): Number of solver threads, or None for the default.
+        quiet (bool): Whether to keep the solver log off stdout.
+    '''
+    BACKENDS = ('cbc', 'highs', 'fast')
+
+    def __init__(self, backend='cbc', time_limit=None, mip_gap=None,
+                 threads=None, quiet=True):
+        if backend not in self.BACKENDS:
+            raise ImproperlyConfigured(
+                f"Unknown solver backend {backend!r}, expected one of {self.BACKENDS}.")
+        self.backend = backend
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.threads = threads
+        self.quiet = quiet
+
+    @classmethod
+    def from_settings(cls, **overrides):
+        '''
+        Builds a configuration from the OPTIMIZADOR_SOLVER setting.
+        Args:
+            **overrides: Attribute values taking precedence over the setting.
+                None values are ignored.
+        Returns:
+            SolverConfig: The resulting configuration.
+        '''
+        try:
+            config = getattr(settings, 'OPTIMIZADOR_SOLVER', {})
+        except ImproperlyConfigured:  # Used outside of a Django project
+            config = {}
+        kwargs = {
+            'backend': config.get('BACKEND', 'cbc'),
+            'time_limit': config.get('TIME_LIMIT'),
+            'mip_gap': config.get('MIP_GAP'),
+            'threads': config.get('THREADS'),
+            'quiet': config.get('QUIET', True),
+        }
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**kwargs)
+
+    def for_pulp(self):
+        '''
+        Returns a configuration able to solve arbitrary PuLP models.
+        The 'fast' backend only handles the base two-product LP, so models it
+        cannot solve (MIPs, extended models) fall back to CBC with the same
+        limits.
+        '''
+        if self.backend != 'fast':
+            return self
+        return SolverConfig('cbc', self.time_limit, self.mip_gap,
+                            self.threads, self.quiet)
+
+    def run(self, prob, warm_start=False):
+        '''
+        Solves a PuLP problem with the configured backend.
+        Args:
+            prob (LpProblem): The problem to solve.
+            warm_start (bool): Whether to pass the variables' initial values
+                to the solver as a starting solution (CBC only).
+        Returns:
+            tuple: The PuLP status code and a dict of solver statistics
+                ('backend', 'wall_time' in seconds and 'iterations', which
+                is None when the backend does not report it).
+        '''
+        if self.backend == 'highs':
+            return self._run_highs(prob)
+        return self._run_cbc(prob, warm_start)
+
+    def _run_cbc(self, prob, warm_start=False):
+        # CBC only reports iterations in its log, so always capture it
+        fd, log_path = tempfile.mkstemp(suffix='.log')
+        os.close(fd)
+        try:
+            solver = PULP_CBC_CMD(
+                msg=False, timeLimit=self.time_limit, gapRel=self.mip_gap,
+                threads=self.threads, logPath=log_path, warmStart=warm_start)
+            start = time.perf_counter()
+            status = prob.solve(solver)
+            wall_time = time.perf_counter() - start
+
+            with open(log_path) as f:
+                log = f.read()
+        finally:
+            os.unlink(log_path)
+
+        if not self.quiet:
+            sys.stdout.write(log)
+
+        return status, {
+            'backend': self.backend,
+            'wall_time': wall_time,
+            'iterations': _parse_cbc_iterations(log),
+        }
+
+    def _run_highs(self, prob):
+        solver = HiGHS(
+            msg=not self.quiet, timeLimit=self.time_limit,
+            gapRel=self.mip_gap, threads=self.threads)
+        if not solver.available():
+            raise ImproperlyConfigured(
+                "The 'highs' solver backend requires the highspy package.")
+
+        start = time.perf_counter()
+        status = prob.solve(solver)
+        wall_time = time.perf_counter() - start
+
+        info = prob.solverModel.getInfo()
+        return status, {
+            'backend': self.backend,
+            'wall_time': wall_time,
+            'iterations': info.simplex_iteration_count,
+        }
+
+
+def _parse_cbc_iterations(log):
+    # MIP runs end with a summary, pure LPs only with the simplex line
+    match = (re.search(r"Total iterations:\s+(\d+)", log)
+             or re.search(r"- (\d+) iterations", log))
+    return int(match.group(1)) if match else None
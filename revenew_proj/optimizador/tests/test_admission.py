@@ -0,0 +1,128 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from optimizador.admission import AdmissionController, Gate, Saturated
+from optimizador.dataloader import DataLoader
+
+
+class GateTest(unittest.TestCase):
+
+    def test_queue_full_is_rejected_at_once(self):
+        gate = Gate('solve', limit=1, max_queue=0, timeout=5)
+        gate.acquire()
+        with self.assertRaises(Saturated) as raised:
+            gate.acquire()
+        self.assertEqual(raised.exception.retry_after, 5)
+        gate.release()
+
+        gate.acquire()
+        self.assertEqual(gate.stats()["admitted"], 2)
+        self.assertEqual(gate.stats()["rejected"], 1)
+
+    def test_waiter_gets_freed_slot_or_times_out(self):
+        """Test that queued callers wait for a slot, but not forever."""
+        gate = Gate('solve', limit=1, max_queue=1, timeout=5)
+        gate.acquire()
+        waiter = threading.Thread(target=gate.acquire)
+        waiter.start()
+        while gate.stats()["waiting"] == 0:
+            pass
+        gate.release()
+        waiter.join(timeout=5)
+        self.assertEqual(gate.stats()["active"], 1)
+
+        with self.assertRaises(Saturated):
+            gate.acquire(timeout=0.05)
+        self.assertEqual(gate.stats()["timed_out"], 1)
+        self.assertEqual(gate.stats()["waiting"], 0)
+
+    def test_try_slot_degrades_instead_of_raising(self):
+        gate = Gate('render', limit=0)
+        with gate.try_slot() as admitted:
+            self.assertFalse(admitted)
+        with Gate('render', limit=None).try_slot() as admitted:
+            self.assertTrue(admitted)
+
+
+@override_settings(OPTIMIZADOR_RESULT_CACHE={'ALIAS': 'default'})
+class AdmissionViewTest(TestCase):
+
+    def setUp(self):
+        # Results cached by earlier tests would bypass the gates
+        caches['default'].clear()
+
+    def scenario(self, row):
+        return dict(zip(DataLoader.REQUIRED_COLUMNS, map(float, row.split(','))))
+
+    def post_upload(self, row="10,5,5,10,300,600,10,50"):
+        # Distinct rows per test: identical uploads may share a recent result
+        header = ",".join(DataLoader.REQUIRED_COLUMNS)
+        csv_file = SimpleUploadedFile(
+            "data.csv", f"{header}\n{row}\n".encode('utf-8'), "text/csv")
+        return self.client.post(reverse('upload'), {'csv_file': csv_file})
+
+    @patch('optimizador.admission._default',
+           AdmissionController(max_solves=0, max_queue=0, retry_after=7))
+    def test_saturated_solver_returns_503(self):
+        response = self.post_upload("1,2,3,4,5,6,7,8")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertContains(response, "server is busy", status_code=503)
+
+        api = self.client.post(reverse('solve_api'),
+                               [self.scenario("1,2,3,4,5,6,7,8")],
+                               content_type='application/json')
+        self.assertEqual(api.status_code, 503)
+        self.assertEqual(api['Retry-After'], '7')
+
+    def test_stream_holds_a_slot_only_while_solving(self):
+        """Test that a slow client holds no slot, and a busy server ends the stream."""
+        admission = AdmissionController(max_solves=1, max_queue=0)
+        scenarios = [self.scenario("10,5,5,10,300,600,10,50")] * 3
+        with patch('optimizador.admission._default', admission):
+            response = self.client.post(reverse('solve_api'), scenarios,
+                                        content_type='application/json')
+            self.assertEqual(admission.solve.stats()['active'], 0)
+
+            lines = iter(response.streaming_content)
+            self.assertIn(b'"Total_Revenue": 3000.0', next(lines))
+            self.assertIn(b'"Total_Revenue": 3000.0', next(lines))
+            with admission.solve.slot():
+                last = next(lines)
+            self.assertIn(b'"retry_after": 5', last)
+            self.assertEqual(list(lines), [])
+            response.close()
+
+        self.assertEqual(admission.solve.stats()['admitted'], 3)
+        self.assertEqual(admission.solve.stats()['rejected'], 1)
+
+    @patch('optimizador.admission._default', AdmissionController(max_renders=0))
+    def test_saturated_renderer_skips_plots(self):
+        response = self.post_upload()
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual(result['Total_Revenue'], 3000.0)
+        self.assertIsNone(result['plot'])
+        self.assertTrue(result['plots_skipped'])
+        self.assertContains(response, "Charts were skipped")
+
+    @patch('optimizador.views.get_admission')
+    def test_metrics(self, mock_admission):
+        admission = mock_admission.return_value = AdmissionController(
+            max_solves=0, max_queue=0)
+        with self.assertRaises(Saturated):
+            admission.solve.acquire()
+
+        stats = self.client.get(reverse('metrics')).json()
+        self.assertEqual(stats['solve']['rejected'], 1)
+        self.assertEqual(stats['render']['active'], 0)
+
+        text = self.client.get(reverse('metrics'), {'format': 'prometheus'})
+        self.assertIn('optimizador_admission_rejected_total{gate="solve"} 1',
+                      text.content.decode())
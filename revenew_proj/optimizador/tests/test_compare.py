@@ -0,0 +1,125 @@
+import unittest
+
+import numpy as np
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from optimizador.compare import ScenarioComparison, shadow_prices
+from optimizador.dataloader import DataLoader
+from optimizador.models import OptimizationRun
+from optimizador.optimizer import OptimizationModel
+from optimizador.scenarios import ScenarioBatch
+
+HEADER = ",".join(DataLoader.REQUIRED_COLUMNS)
+
+
+def scenario(a1, b1, a2, b2, cap1, cap2, price_A, price_B):
+    return {
+        'Product_A_Production_Time_Machine_1': a1,
+        'Product_B_Production_Time_Machine_1': b1,
+        'Product_A_Production_Time_Machine_2': a2,
+        'Product_B_Production_Time_Machine_2': b2,
+        'Machine_1_Available_Hours': cap1,
+        'Machine_2_Available_Hours': cap2,
+        'Price_Product_A': price_A,
+        'Price_Product_B': price_B,
+    }
+
+
+class ScenarioComparisonTest(unittest.TestCase):
+
+    def setUp(self):
+        self.batch = ScenarioBatch.from_records([
+            scenario(10, 5, 5, 10, 300, 600, 10, 50),
+            scenario(10, 5, 5, 10, 300, 600, 200, 50),
+            scenario(1, 1, 10, 1, 3, 15, 3, 2),
+        ])
+
+    def test_shadow_prices_match_revenue(self):
+        """Test that the dual prices value the machine hours at the revenue."""
+        rng = np.random.default_rng(0)
+        batch = ScenarioBatch.from_records(
+            scenario(*rng.uniform(0.5, 20, 4), *rng.uniform(10, 1000, 2),
+                     *rng.uniform(0, 100, 2)) for _ in range(200))
+        revenue = OptimizationModel.solve_batch(batch).column('Total_Revenue')
+        prices = shadow_prices(batch)
+
+        hours = np.stack([batch.column('Machine_1_Available_Hours'),
+                          batch.column('Machine_2_Available_Hours')], axis=1)
+        np.testing.assert_allclose((prices * hours).sum(axis=1), revenue, rtol=1e-6)
+        self.assertTrue((prices >= 0).all())
+
+    def test_deltas_and_binding_constraints(self):
+        analysis = ScenarioComparison.from_batch(self.batch).compute()
+
+        np.testing.assert_allclose(analysis['Total_Revenue'], [3000, 6000, 22 / 3])
+        np.testing.assert_allclose(analysis['delta_Total_Revenue'], [0, 3000, 22 / 3 - 3000])
+        np.testing.assert_allclose(analysis['delta_Total_Revenue_pct'][1], 100)
+        np.testing.assert_array_equal(
+            analysis['binding'], [[True, True], [True, False], [True, True]])
+        np.testing.assert_allclose(analysis['shadow_price'][2], [17 / 9, 1 / 9])
+        np.testing.assert_allclose(
+            analysis['delta_shadow_price'],
+            analysis['shadow_price'] - analysis['shadow_price'][0])
+        np.testing.assert_array_equal(analysis['delta_shadow_price'][0], [0, 0])
+        np.testing.assert_array_equal(
+            analysis['binding_changed'], [[False, False], [False, True], [False, False]])
+
+    def test_size_limits(self):
+        with self.assertRaises(ValidationError):
+            ScenarioComparison.from_batch(self.batch[:1])
+        with self.assertRaises(ValidationError):
+            ScenarioComparison(self.batch, None, baseline=3)
+
+
+@override_settings(OPTIMIZADOR_RESULT_CACHE={'ALIAS': 'default'})
+class CompareViewTest(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def upload(self, row):
+        csv_file = SimpleUploadedFile(
+            "plan.csv", f"{HEADER}\n{row}\n".encode('utf-8'), "text/csv")
+        return self.client.post(reverse('upload'), {'csv_file': csv_file})
+
+    def test_uploads_are_stored_and_compared(self):
+        first = self.upload("10,5,5,10,300,600,10,52").context['run']
+        second = self.upload("10,5,5,10,300,600,200,52").context['run']
+        self.assertEqual(OptimizationRun.objects.count(), 2)
+        self.assertEqual(second.params['Price_Product_A'], 200.0)
+
+        response = self.client.get(reverse('compare'), {'runs': f"{second.pk},{first.pk}"})
+        rows = response.context['rows']
+        self.assertEqual([row['label'] for row in rows],
+                         [f"#{second.pk} plan.csv", f"#{first.pk} plan.csv"])
+        self.assertTrue(rows[0]['is_baseline'])
+        self.assertEqual(rows[1]['delta_Total_Revenue'], 3120.0 - 6000.0)
+        self.assertTrue(rows[1]['machines'][0]['binding'])
+        self.assertTrue(rows[1]['machines'][1]['binding_changed'])
+        self.assertIsNotNone(rows[1]['machines'][0]['delta_shadow_price'])
+        self.assertContains(response, "now binding")
+        self.assertIsNotNone(response.context['plot'])
+
+        missing = self.client.get(reverse('compare'), {'runs': f"{first.pk},999"})
+        self.assertContains(missing, "Unknown runs: 999.")
+
+    def test_batch_upload(self):
+        rows = "\n".join(["10,5,5,10,300,600,10,50", "10,5,5,10,300,600,200,50",
+                          "10,5,5,10,0,600,10,50"])
+        csv_file = SimpleUploadedFile(
+            "batch.csv", f"{HEADER}\n{rows}\n".encode('utf-8'), "text/csv")
+        response = self.client.post(reverse('compare'), {'csv_file': csv_file})
+
+        rows = response.context['rows']
+        self.assertEqual([row['Total_Revenue'] for row in rows], [3000.0, 6000.0, 0.0])
+        self.assertEqual(rows[2]['delta_Total_Revenue_pct'], -100.0)
+        self.assertEqual(OptimizationRun.objects.count(), 0)
+
+        single = SimpleUploadedFile(
+            "one.csv", f"{HEADER}\n10,5,5,10,300,600,10,50\n".encode('utf-8'), "text/csv")
+        response = self.client.post(reverse('compare'), {'csv_file': single})
+        self.assertContains(response, "Select between 2 and 50 scenarios to compare, got 1.")
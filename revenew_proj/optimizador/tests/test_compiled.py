@@ -0,0 +1,103 @@
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from django.core.management import call_command
+from pulp import LpStatus, value
+
+from optimizador.compiled import CompiledModel, ModelCache
+from optimizador.optimizer import OptimizationModel
+from optimizador.solver import SolverConfig
+
+
+class CompiledModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.params = {
+            'Product_A_Production_Time_Machine_1': 10,
+            'Product_B_Production_Time_Machine_1': 5,
+            'Machine_1_Available_Hours': 300,
+            'Product_A_Production_Time_Machine_2': 5,
+            'Product_B_Production_Time_Machine_2': 10,
+            'Machine_2_Available_Hours': 600,
+            'Price_Product_A': 10,
+            'Price_Product_B': 50,
+        }
+        self.config = SolverConfig('cbc')
+
+    def solve(self, prob):
+        status, _ = self.config.run(prob)
+        return LpStatus[status], value(prob.objective)
+
+    def test_structure_key_ignores_coefficients(self):
+        """Test that only names, senses and sparsity make up the structure."""
+        model = OptimizationModel(self.params).compile()
+        other = OptimizationModel(
+            dict(self.params, Price_Product_A=99)).compile()
+
+        self.assertEqual(model.structure_key, other.structure_key)
+        self.assertNotEqual(model.structure_key,
+                            OptimizationModel(self.params).compile('Integer').structure_key)
+
+    def test_cache_patches_coefficients_into_reused_problem(self):
+        """Test that a cached problem gives the same answer as a fresh one."""
+        cache = ModelCache()
+        first = OptimizationModel(self.params).compile()
+        second = OptimizationModel(
+            dict(self.params, Price_Product_A=100, Machine_2_Available_Hours=50)
+        ).compile()
+
+        with cache.problem(first) as (prob, _):
+            self.assertEqual(self.solve(prob), ("Optimal", 3000.0))
+        with cache.problem(second) as (reused, _):
+            self.assertIs(reused, prob)
+            patched = self.solve(reused)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(patched, self.solve(second.to_problem()[0]))
+
+    def test_zero_price_model_does_not_spoil_cached_problem(self):
+        """Test that problems solved with an empty objective are not reused."""
+        cache = ModelCache()
+        prices = [(0, 0), (25, 30), (7, 3), (0, 0), (25, 30)]
+        results = []
+        for a, b in prices:
+            model = OptimizationModel(
+                dict(self.params, Price_Product_A=a, Price_Product_B=b)).compile()
+            with cache.problem(model) as (prob, _):
+                results.append(self.solve(prob))
+
+        self.assertEqual([r[0] for r in results], ["Optimal"] * 5)
+        for (a, b), (_, revenue) in zip(prices, results):
+            self.assertAlmostEqual(revenue or 0.0, max(30 * a, 60 * b))
+        self.assertEqual((cache.hits, cache.misses), (2, 3))
+
+    def test_write_and_read(self):
+        """Test that models survive a round trip through .npz and .mps."""
+        model = OptimizationModel(self.params).compile()
+        with tempfile.TemporaryDirectory() as tmp:
+            for extension in ('npz', 'mps'):
+                path = os.path.join(tmp, f"model.{extension}")
+                model.write(path)
+                loaded = CompiledModel.read(path)
+                self.assertEqual(loaded.shape, (2, 2))
+                self.assertEqual(self.solve(loaded.to_problem()[0]),
+                                 ("Optimal", 3000.0))
+
+            model.write(os.path.join(tmp, "model.lp"))
+            with self.assertRaises(ValueError):
+                CompiledModel.read(os.path.join(tmp, "model.lp"))
+
+    def test_export_dir_and_replay(self):
+        """Test that solved models are captured and can be replayed."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ModelCache(export_dir=tmp)
+            with cache.problem(OptimizationModel(self.params).compile()):
+                pass
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+            out = StringIO()
+            call_command('replay_models', tmp, solver='cbc', stdout=out)
+            self.assertIn("Optimal", out.getvalue())
+            self.assertIn("3000", out.getvalue())
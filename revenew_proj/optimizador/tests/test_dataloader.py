@@ -112,3 +112,55 @@ class DataLoaderTest(unittest.TestCase):
         # Using sorted() for comparison to ignore order
         self.assertEqual(sorted(DataLoader.REQUIRED_COLUMNS),
                          sorted(expected_columns))
+
+    def test_overtime_limits(self):
+        """Test that empty overtime limits are 0 and negative ones rejected."""
+        header = self.valid_csv_content.splitlines()[0]
+        header += ",Machine_1_Overtime_Hours,Machine_2_Overtime_Hours\n"
+
+        params = DataLoader(StringIO(header + "10,15,600,5,8,480,25,30,,40\n")).load()
+        self.assertEqual(params['Machine_1_Overtime_Hours'], 0.0)
+        self.assertEqual(params['Machine_2_Overtime_Hours'], 40.0)
+
+        with self.assertRaisesRegex(ValidationError, "negative values in overtime"):
+            DataLoader(StringIO(header + "10,15,600,5,8,480,25,30,-50,0\n")).load()
+        with self.assertRaisesRegex(ValidationError, "non-numeric values in overtime"):
+            DataLoader(StringIO(header + "10,15,600,5,8,480,25,30,x,0\n")).load()
+
+    def test_iter_scenarios_multiple_rows(self):
+        """Test that iter_scenarios yields every validated row in order."""
+        csv_file = StringIO(self.invalid_multiple_rows_csv)
+        loader = DataLoader(csv_file)
+        rows = list(loader.iter_scenarios(chunksize=1))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['Price_Product_B'], 40)
+
+    def test_iter_scenarios_row_errors(self):
+        """Test that invalid rows can be yielded as errors instead of raised."""
+        header = self.valid_csv_content.splitlines()[0]
+        csv_file = StringIO(f"{header}\n10,15,600,5,8,480,25,30\n"
+                            "10,x,600,5,8,480,25,30\n20,25,700,10,12,500,30,40\n")
+        rows = list(DataLoader(csv_file).iter_scenarios(row_errors=True))
+
+        self.assertEqual(len(rows), 3)
+        self.assertIsInstance(rows[1], ValidationError)
+        self.assertEqual(rows[2]['Product_B_Production_Time_Machine_1'], 25.0)
+
+    def test_validate_params(self):
+        """Test validation of a scenario given as a mapping."""
+        params = {col: 1 for col in DataLoader.REQUIRED_COLUMNS}
+        self.assertEqual(DataLoader.validate_params(params),
+                         {col: 1.0 for col in DataLoader.REQUIRED_COLUMNS})
+
+        with self.assertRaisesRegex(ValidationError, "non-numeric"):
+            DataLoader.validate_params(dict(params, Price_Product_A="x"))
+        with self.assertRaisesRegex(ValidationError, "negative"):
+            DataLoader.validate_params(dict(params, Price_Product_A=-1))
+
+        overtime = DataLoader.validate_params(dict(
+            params, Machine_1_Overtime_Hours=None, Machine_2_Overtime_Hours="8"))
+        self.assertEqual(overtime['Machine_1_Overtime_Hours'], 0.0)
+        self.assertEqual(overtime['Machine_2_Overtime_Hours'], 8.0)
+        with self.assertRaisesRegex(ValidationError, "negative values in overtime"):
+            DataLoader.validate_params(dict(params, Machine_1_Overtime_Hours=-50))
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from optimizador.decomposition import (
+    LagrangianDecomposition, benchmark, solve_monolithic, synthetic_plants)
+from optimizador.solver import SolverConfig
+
+
+class LagrangianDecompositionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.plants, self.budget = synthetic_plants(12, seed=3)
+        self.config = SolverConfig('fast')
+
+    def test_matches_monolithic_solve(self):
+        """Test that the decomposition reaches the monolithic optimum."""
+        result = LagrangianDecomposition(
+            self.plants, self.budget, self.config).solve()
+        monolithic = solve_monolithic(self.plants, self.budget)
+
+        self.assertEqual(result['status'], 'Optimal')
+        self.assertAlmostEqual(result['Total_Revenue'] / monolithic['Total_Revenue'],
+                               1.0, places=5)
+        self.assertAlmostEqual(result['multiplier'], monolithic['multiplier'],
+                               places=2)
+        self.assertLessEqual(result['gap'], 1e-6)
+
+        # The blended plan is feasible for the shared budget
+        raw_used = sum(
+            plant['Raw_Material_Product_A'] * a + plant['Raw_Material_Product_B'] * b
+            for plant, a, b in zip(self.plants, result['Product_A'], result['Product_B']))
+        self.assertLessEqual(raw_used, self.budget * (1 + 1e-9))
+
+    def test_bound_converges(self):
+        """Test that the dual bound never increases and closes the gap."""
+        result = LagrangianDecomposition(
+            self.plants, self.budget, self.config).solve()
+        bounds = [step['upper_bound'] for step in result['history']]
+
+        self.assertEqual(bounds, sorted(bounds, reverse=True))
+        self.assertGreater(result['history'][0]['gap'], result['gap'])
+        self.assertEqual(len(result['history']), result['iterations'] + 1)
+
+    def test_parallel_workers_agree(self):
+        """Test that worker processes give the same plan as in-process solves."""
+        serial = LagrangianDecomposition(
+            self.plants, self.budget, self.config, workers=1).solve()
+        parallel = LagrangianDecomposition(
+            self.plants, self.budget, self.config, workers=2).solve()
+
+        np.testing.assert_allclose(serial['Product_A'], parallel['Product_A'])
+        self.assertEqual(serial['iterations'], parallel['iterations'])
+
+    def test_budget_not_binding(self):
+        """Test that a loose budget is solved in one round at zero price."""
+        result = LagrangianDecomposition(
+            self.plants, self.budget * 10, self.config).solve()
+
+        self.assertEqual(result['multiplier'], 0.0)
+        self.assertEqual(result['iterations'], 0)
+        self.assertEqual(result['gap'], 0.0)
+
+    def test_benchmark_report(self):
+        """Test that the benchmark reports timings and speedup."""
+        reports = benchmark(5, config=self.config)
+
+        # Like for like first, then with the closed-form plant solver
+        self.assertEqual([(r['backend'], r['monolithic_backend']) for r in reports],
+                         [('cbc', 'cbc'), ('fast', 'cbc')])
+        for report in reports:
+            for key in ('decomposition_time', 'monolithic_time', 'speedup',
+                        'iterations', 'revenue_difference'):
+                self.assertIn(key, report)
+            self.assertLess(abs(report['revenue_difference']), 1e-5)
@@ -0,0 +1,131 @@
+import time
+import unittest
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from optimizador.dataloader import DataLoader
+from optimizador.loadtest import (
+    ASGIDriver, Driver, LoadResult, WSGIDriver, in_process, synthetic_csv,
+    synthetic_scenarios)
+from optimizador.models import OptimizationRun
+from optimizador.singleflight import LocalBackend, get_singleflight
+from optimizador.timing import StageTimer, parse_server_timing
+
+
+class StageTimerTest(unittest.TestCase):
+
+    def test_nested_stages_are_exclusive(self):
+        timer = StageTimer()
+        with timer.stage('outer'):
+            time.sleep(0.02)
+            with timer.stage('inner'):
+                time.sleep(0.05)
+
+        self.assertLess(timer.durations['outer'], 0.045)
+        self.assertGreaterEqual(timer.durations['inner'], 0.05)
+        parsed = parse_server_timing(timer.header() + ', cache;desc="hit"')
+        self.assertEqual(list(parsed), ['outer', 'inner'])
+        self.assertAlmostEqual(parsed['inner'], timer.durations['inner'], places=4)
+
+
+class SyntheticDataTest(unittest.TestCase):
+
+    def test_csv_is_valid_and_reproducible(self):
+        scenarios = synthetic_scenarios(20, seed=3)
+        batch = DataLoader(BytesIO(synthetic_csv(scenarios))).load_batch()
+        self.assertEqual(len(batch), 20)
+        self.assertEqual(scenarios, synthetic_scenarios(20, seed=3))
+        self.assertNotEqual(scenarios, synthetic_scenarios(20, seed=4))
+        self.assertEqual(len({tuple(s.values()) for s in scenarios}), 20)
+
+        repeated = synthetic_scenarios(20, seed=3, distinct=2)
+        self.assertLessEqual(len({tuple(s.values()) for s in repeated}), 2)
+
+    def test_summary(self):
+        result = LoadResult('wsgi')
+        for latency in (0.1, 0.2, 0.3):
+            result.add(200, latency, {'solve': latency / 2})
+        result.add(503, 0.01)
+        result.add(None, 1.0, error="ConnectionError()")
+        result.wall_time = 2.0
+
+        summary = result.summary()
+        self.assertEqual((summary['ok'], summary['shed'], summary['errors']), (3, 1, 1))
+        self.assertAlmostEqual(summary['error_rate'], 0.4)
+        self.assertAlmostEqual(summary['throughput'], 2.5)
+        self.assertAlmostEqual(summary['latency']['p50'], 0.2)
+        self.assertAlmostEqual(summary['latency']['max'], 0.3)
+        self.assertAlmostEqual(summary['stages']['solve']['mean'], 0.1)
+
+
+@override_settings(OPTIMIZADOR_RESULT_CACHE={'ALIAS': 'default'})
+class ServerTimingTest(TestCase):
+
+    def test_upload_view_reports_stages(self):
+        csv_file = SimpleUploadedFile(
+            "data.csv", synthetic_csv(synthetic_scenarios(1, seed=11)), "text/csv")
+        response = self.client.post(reverse('upload'), {'csv_file': csv_file})
+
+        stages = parse_server_timing(response['Server-Timing'])
+        for stage in ('upload', 'load', 'queue', 'solve', 'plots', 'record', 'render'):
+            self.assertIn(stage, stages)
+        self.assertNotIn('Server-Timing', self.client.get(reverse('upload')))
+
+    @override_settings(OPTIMIZADOR_LOAD_TEST_TOKEN='secret')
+    def test_load_test_tag_needs_debug_or_token(self):
+        """Test that clients cannot mark their runs for the load test's cleanup."""
+        def tag(seed, **headers):
+            csv_file = SimpleUploadedFile(
+                "data.csv", synthetic_csv(synthetic_scenarios(1, seed=seed)), "text/csv")
+            response = self.client.post(reverse('upload'), {'csv_file': csv_file},
+                                        headers={'X-Load-Test': 'abc', **headers})
+            return response.context['run'].load_test
+
+        self.assertEqual(tag(30), '')
+        self.assertEqual(tag(31, **{'X-Load-Test-Token': 'wrong'}), '')
+        self.assertEqual(tag(32, **{'X-Load-Test-Token': 'secret'}), 'abc')
+        with override_settings(DEBUG=True):
+            self.assertEqual(tag(33), 'abc')
+
+
+class DriverTest(TransactionTestCase):
+
+    def test_sync_and_async_drivers(self):
+        for seed, driver in enumerate((WSGIDriver(), ASGIDriver()), start=20):
+            # Distinct scenarios, or the second driver reuses the first's results
+            payloads = [synthetic_csv([s]) for s in synthetic_scenarios(4, seed=seed)]
+            summary = driver.run(payloads, concurrency=2).summary()
+            self.assertEqual(summary['ok'], 4, driver.name)
+            self.assertIn('solve', summary['stages'])
+            self.assertIsNotNone(summary['latency']['p95'])
+            self.assertEqual(OptimizationRun.objects.filter(load_test=driver.tag).count(), 4)
+
+    def test_in_process_coalesces_only_locally(self):
+        """Test that a fresh run does not share the file-backed singleflight."""
+        outer = get_singleflight()
+        with in_process(fresh_cache=True):
+            inner = get_singleflight()
+            self.assertIsNot(inner, outer)
+            self.assertIsInstance(inner.backend, LocalBackend)
+        self.assertIs(get_singleflight(), outer)
+
+    def test_drivers_are_abstract(self):
+        with self.assertRaises(TypeError):
+            Driver()
+
+    def test_command_compares_modes_and_cleans_up(self):
+        # A real upload whose name looks like a generated one must survive
+        OptimizationRun.objects.create(name="load_0.csv", params={}, status="Optimal")
+        out = StringIO()
+        call_command('loadtest', driver=['wsgi', 'asgi'], requests=3,
+                     concurrency=2, rate=50, seed=13, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[1].startswith('wsgi'))
+        self.assertTrue(lines[2].startswith('asgi'))
+        self.assertIn('Server-Timing stages', out.getvalue())
+        self.assertEqual(list(OptimizationRun.objects.values_list('name', 'load_test')),
+                         [("load_0.csv", "")])
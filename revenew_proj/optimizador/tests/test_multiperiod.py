@@ -0,0 +1,100 @@
+import unittest
+from io import StringIO
+
+import pandas as pd
+from django.core.exceptions import ValidationError
+
+from optimizador.dataloader import DataLoader
+from optimizador.multiperiod import MultiPeriodModel, RollingHorizonPlanner
+from optimizador.optimizer import OptimizationModel
+
+
+def long_format(periods):
+    """Builds a long-format CSV from a list of per-period parameter dicts."""
+    rows = [(t, name, value)
+            for t, params in enumerate(periods)
+            for name, value in params.items()]
+    return pd.DataFrame(rows, columns=DataLoader.PERIOD_COLUMNS).to_csv(index=False)
+
+
+class MultiPeriodModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.base = {
+            'Product_A_Production_Time_Machine_1': 1,
+            'Product_B_Production_Time_Machine_1': 1,
+            'Machine_1_Available_Hours': 10,
+            'Product_A_Production_Time_Machine_2': 1,
+            'Product_B_Production_Time_Machine_2': 1,
+            'Machine_2_Available_Hours': 10,
+            'Price_Product_A': 10,
+            'Price_Product_B': 1,
+            'Demand_Product_B': 0,
+            'Holding_Cost_Product_A': 1,
+        }
+        # Period 1 sells A at a much better price but cannot produce it
+        self.periods = [
+            dict(self.base, Demand_Product_A=0),
+            dict(self.base, Price_Product_A=50, Machine_1_Available_Hours=0),
+        ]
+
+    def test_load_periods(self):
+        """Test that the long format is pivoted into one row per period."""
+        periods = DataLoader(StringIO(long_format(self.periods))).load_periods()
+
+        self.assertEqual(list(periods.index), [0, 1])
+        self.assertEqual(periods.loc[1, 'Price_Product_A'], 50)
+        self.assertTrue(pd.isnull(periods.loc[1, 'Demand_Product_A']))
+
+    def test_load_periods_validation(self):
+        """Test that incomplete or invalid long-format files are rejected."""
+        incomplete = dict(self.base)
+        del incomplete['Price_Product_A']
+        csv = long_format([self.base, incomplete])
+        with self.assertRaisesRegex(ValidationError, r"periods: \[1\]"):
+            DataLoader(StringIO(csv)).load_periods()
+
+        csv = long_format([dict(self.base, Price_Product_A=-1)])
+        with self.assertRaisesRegex(ValidationError, "negative"):
+            DataLoader(StringIO(csv)).load_periods()
+
+        with self.assertRaisesRegex(ValidationError, "Missing required columns"):
+            DataLoader(StringIO("Period,Value\n0,1\n")).load_periods()
+
+    def test_inventory_beats_chained_single_periods(self):
+        """Test that stock is built up for the expensive period."""
+        periods = DataLoader(StringIO(long_format(self.periods))).load_periods()
+        result = MultiPeriodModel(periods).solve()
+
+        self.assertEqual(result['status'], 'Optimal')
+        plan = result['plan']
+        self.assertAlmostEqual(plan.loc[0, 'Production_Product_A'], 10)
+        self.assertAlmostEqual(plan.loc[0, 'Inventory_Product_A'], 10)
+        self.assertAlmostEqual(plan.loc[1, 'Sales_Product_A'], 10)
+        # 10 units sold at 50, minus one period of holding cost
+        self.assertAlmostEqual(result['Total_Revenue'], 490)
+
+        # Chaining single-period solves cannot carry stock over
+        chained = sum(
+            OptimizationModel(row.to_dict()).solve()['Total_Revenue']
+            for _, row in periods.iterrows())
+        self.assertLess(chained, result['Total_Revenue'])
+
+    def test_rolling_horizon(self):
+        """Test that the rolling planner covers every period and freezes old ones."""
+        periods = DataLoader(
+            StringIO(long_format(self.periods * 5))).load_periods()
+        full = MultiPeriodModel(periods).solve()
+
+        # A window covering the whole horizon is the monolithic model
+        planner = RollingHorizonPlanner(window=len(periods))
+        planner.extend(periods)
+        self.assertAlmostEqual(planner.total_revenue, full['Total_Revenue'])
+
+        planner = RollingHorizonPlanner(window=3)
+        for t in range(len(periods)):
+            plan = planner.extend(periods.iloc[t:t + 1])
+        self.assertEqual(list(plan.index), list(periods.index))
+        self.assertEqual(planner.last_status, 'Optimal')
+        self.assertAlmostEqual(planner.total_revenue, full['Total_Revenue'])
+        self.assertTrue((plan['Inventory_Product_A'] >= -1e-9).all())
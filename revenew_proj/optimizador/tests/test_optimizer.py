@@ -1,8 +1,10 @@
 import unittest
+from unittest.mock import patch
 from pulp import LpStatus, value
 
 # Assuming optimizer.py is in the same directory as this test file,
 # or reachable via optimizador.optimizer
+from optimizador.compiled import get_model_cache
 from optimizador.optimizer import OptimizationModel
 
 
@@ -80,3 +82,94 @@ class OptimizationModelTest(unittest.TestCase):
         self.assertAlmostEqual(solution['Product_A'], 0.0, places=5)
         self.assertAlmostEqual(solution['Product_B'], 0.0, places=5)
         self.assertAlmostEqual(solution['Total_Revenue'], 0.0, places=5)
+
+
+    def test_zero_prices_give_zero_revenue(self):
+        """Test that an empty objective is reported as 0, not None."""
+        params = {
+            'Price_Product_A': 0,
+            'Price_Product_B': 0,
+            'Product_A_Production_Time_Machine_1': 10,
+            'Product_B_Production_Time_Machine_1': 15,
+            'Machine_1_Available_Hours': 600,
+            'Product_A_Production_Time_Machine_2': 5,
+            'Product_B_Production_Time_Machine_2': 8,
+            'Machine_2_Available_Hours': 480,
+        }
+        # Built afresh, so the problem really has an empty objective
+        get_model_cache().clear()
+        solution = OptimizationModel(params).solve()
+
+        self.assertEqual(solution['status'], LpStatus[1])
+        self.assertEqual(solution['Total_Revenue'], 0.0)
+
+        # A problem of the same shape solved next still has its objective
+        priced = dict(params, Price_Product_A=25, Price_Product_B=30)
+        self.assertAlmostEqual(
+            OptimizationModel(priced).solve()['Total_Revenue'], 1500.0, places=5)
+
+class IntegerModeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.params = {
+            'Product_A_Production_Time_Machine_1': 1.5,
+            'Product_A_Production_Time_Machine_2': 2.0,
+            'Product_B_Production_Time_Machine_1': 1.0,
+            'Product_B_Production_Time_Machine_2': 1.5,
+            'Machine_1_Available_Hours': 8.0,
+            'Machine_2_Available_Hours': 10.0,
+            'Price_Product_A': 100,
+            'Price_Product_B': 80,
+        }
+
+    def _brute_force(self, params):
+        best = 0
+        for a in range(20):
+            for b in range(20):
+                if (a * 1.5 + b * 1.0 <= 8 and a * 2.0 + b * 1.5 <= 10):
+                    best = max(best, 100 * a + 80 * b)
+        return best
+
+    def test_integer_solution_is_whole_and_optimal(self):
+        """Test that integer mode returns the best whole-unit plan."""
+        solution = OptimizationModel(self.params, integer=True).solve()
+
+        self.assertEqual(solution['status'], 'Optimal')
+        self.assertTrue(solution['integer'])
+        self.assertEqual(solution['Product_A'], int(solution['Product_A']))
+        self.assertEqual(solution['Product_B'], int(solution['Product_B']))
+        self.assertAlmostEqual(solution['Total_Revenue'],
+                               self._brute_force(self.params))
+        stats = solution['solver_stats']
+        self.assertEqual(stats['mip_gap'], 0.0)
+        self.assertGreater(stats['lp_bound'], solution['Total_Revenue'])
+        self.assertLessEqual(stats['time_to_first_incumbent'], stats['wall_time'])
+
+    def test_integer_mode_with_zero_prices(self):
+        """Test that an empty objective counts as zero revenue."""
+        params = dict(self.params, Price_Product_A=0, Price_Product_B=0)
+        # Built afresh, so the problem really has an empty objective
+        get_model_cache().clear()
+        solution = OptimizationModel(params, integer=True).solve()
+
+        self.assertEqual(solution['status'], 'Optimal')
+        self.assertEqual(solution['Total_Revenue'], 0)
+
+    def test_rounding_heuristic_is_feasible(self):
+        """Test that the rounded incumbent respects both machines."""
+        a, b, revenue = OptimizationModel(self.params)._round_down(0, 6.67)
+
+        self.assertEqual((a, b), (0, 6))
+        self.assertLessEqual(a * 1.5 + b * 1.0, 8)
+        self.assertLessEqual(a * 2.0 + b * 1.5, 10)
+        self.assertEqual(revenue, 480)
+
+    def test_incumbent_is_kept_when_mip_runs_out_of_time(self):
+        """Test that the heuristic plan is returned, with its gap, on timeout."""
+        model = OptimizationModel(self.params, integer=True)
+        stats = {'backend': 'cbc', 'wall_time': 0.0, 'iterations': None}
+        with patch.object(model.config, 'run', return_value=(0, stats)):
+            solution = model.solve()
+
+        self.assertEqual(solution['Total_Revenue'], 480)
+        self.assertGreater(solution['solver_stats']['mip_gap'], 0)
@@ -0,0 +1,67 @@
+import unittest
+
+from optimizador.pareto import ParetoFrontier
+from optimizador.results import ResultsHandler
+from optimizador.solver import SolverConfig
+
+
+class ParetoFrontierTest(unittest.TestCase):
+
+    def setUp(self):
+        # Product A earns 30 per machine hour, Product B only 10
+        self.params = {
+            'Product_A_Production_Time_Machine_1': 1,
+            'Product_B_Production_Time_Machine_1': 0,
+            'Machine_1_Available_Hours': 10,
+            'Product_A_Production_Time_Machine_2': 0,
+            'Product_B_Production_Time_Machine_2': 1,
+            'Machine_2_Available_Hours': 10,
+            'Price_Product_A': 30,
+            'Price_Product_B': 10,
+        }
+
+    def test_utilization_frontier_finds_the_kink(self):
+        """Test that the sweep refines around the kink of the frontier."""
+        frontier = ParetoFrontier(self.params, 'utilization').compute()
+        points = [(round(p['utilization'], 6), round(p['Total_Revenue'], 6))
+                  for p in frontier]
+
+        self.assertEqual(points[0], (0, 0))
+        self.assertIn((10, 300), points)
+        self.assertEqual(points[-1], (20, 400))
+        # Non-dominated: more utilization always buys more revenue
+        revenues = [revenue for _, revenue in points]
+        self.assertEqual(revenues, sorted(revenues))
+
+    def test_linear_frontier_needs_few_points(self):
+        """Test that a straight frontier is not refined needlessly."""
+        params = dict(self.params, Price_Product_A=10, Machine_1_Overtime_Hours=5)
+        frontier = ParetoFrontier(params, 'overtime').compute()
+
+        self.assertEqual(len(frontier), 3)
+        self.assertAlmostEqual(frontier[0]['Total_Revenue'], 200)
+        self.assertAlmostEqual(frontier[-1]['overtime'], 5)
+        self.assertAlmostEqual(frontier[-1]['Total_Revenue'], 250)
+
+    def test_max_points_is_respected(self):
+        """Test that the sweep stops at max_points."""
+        frontier = ParetoFrontier(
+            self.params, 'utilization', tolerance=0, max_points=4).compute()
+        self.assertLessEqual(len(frontier), 4)
+
+    def test_fast_backend_falls_back_to_cbc(self):
+        """Test that the closed-form backend is not used for frontier points."""
+        pareto = ParetoFrontier(self.params, config=SolverConfig('fast'))
+        self.assertEqual(pareto.config.backend, 'cbc')
+
+        with self.assertRaises(ValueError):
+            ParetoFrontier(self.params, 'profit')
+
+    def test_pareto_plot(self):
+        """Test that ResultsHandler draws the frontier."""
+        frontier = ParetoFrontier(self.params, 'utilization').compute()
+        solution = {'status': 'Optimal', 'Product_A': 10, 'Product_B': 10,
+                    'Total_Revenue': 400}
+        plot = ResultsHandler(solution, self.params).generate_pareto_plot(
+            frontier, 'utilization')
+        self.assertTrue(plot.startswith('data:image/png;base64,'))
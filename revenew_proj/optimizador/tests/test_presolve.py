@@ -0,0 +1,162 @@
+import datetime
+import os
+import stat
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from optimizador.admission import AdmissionController, Gate
+from optimizador.dataloader import DataLoader
+from optimizador.pareto import ParetoFrontier
+from optimizador.presolve import (
+    ResultCache, ScenarioLibrary, WarmingScheduler, parse_schedule,
+    result_key, solve_and_format, warm)
+
+HEADER = ",".join(DataLoader.REQUIRED_COLUMNS)
+
+
+@override_settings(OPTIMIZADOR_RESULT_CACHE={'ALIAS': 'default'})
+class PresolveTest(TestCase):
+
+    def setUp(self):
+        caches['default'].clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.library = ScenarioLibrary(self.tmp.name)
+        self.csv = f"{HEADER}\n10,5,5,10,300,600,10,51\n10,5,5,10,300,600,11,50\n"
+
+    def test_register_validates_and_stores(self):
+        with self.assertRaises(ValidationError):
+            self.library.register("broken", BytesIO(b"a,b\n1,2\n"))
+        self.assertEqual(self.library.names(), [])
+
+        self.assertEqual(self.library.register("Weekly Plan", BytesIO(self.csv.encode())), 2)
+        self.assertEqual(self.library.names(), ["weekly-plan"])
+        self.assertEqual([index for _, index, _ in self.library.scenarios()], [0, 1])
+
+    def test_warmed_results_are_served_without_solving(self):
+        """Test that warming fills both caches and uploads then skip the solver."""
+        self.library.register("weekly", BytesIO(self.csv.encode()))
+        first = warm(self.library)
+        self.assertEqual((first['warmed'], first['cached'], first['failed']), (2, 0, 0))
+        self.assertEqual(warm(self.library)['cached'], 2)
+
+        csv_file = SimpleUploadedFile(
+            "data.csv", f"{HEADER}\n10,5,5,10,300,600,10,51\n".encode(), "text/csv")
+        with patch('optimizador.presolve.OptimizationModel') as mock_model, \
+                patch('optimizador.admission._default', AdmissionController(max_renders=0)):
+            response = self.client.post(reverse('upload'), {'csv_file': csv_file})
+        mock_model.assert_not_called()
+        result = response.context['result']
+        self.assertEqual(result['Total_Revenue'], 3060.0)
+        self.assertIsNotNone(result['plot'])
+        self.assertFalse(result['plots_skipped'])
+        self.assertTrue(result['cached'])
+        self.assertContains(response, "Cached result")
+
+    def test_warming_yields_to_queued_requests(self):
+        """Test that background work never takes a slot a request waits for."""
+        gate = Gate('solve', limit=1, max_queue=1, timeout=5)
+        self.assertTrue(gate.try_acquire())
+        self.assertFalse(gate.try_acquire())
+        gate.release()
+        gate.waiting = 1
+        self.assertFalse(gate.try_acquire())
+        self.assertEqual(gate.stats()["rejected"], 0)
+
+        self.library.register("weekly", BytesIO(self.csv.encode()))
+        with patch('optimizador.admission._default', AdmissionController(max_solves=0)), \
+                patch('optimizador.presolve.SPARE_SLOT_PATIENCE', 0):
+            self.assertEqual(warm(self.library)['deferred'], 2)
+
+    def test_frontier_stays_within_its_solve_slot(self):
+        params = DataLoader.validate_params(dict(zip(
+            DataLoader.REQUIRED_COLUMNS, [10, 5, 5, 10, 300, 600, 10, 50])))
+        with patch('optimizador.presolve.ParetoFrontier', wraps=ParetoFrontier) as frontier:
+            result = solve_and_format(params, pareto='utilization')
+
+        self.assertEqual(frontier.call_args.kwargs['workers'], 1)
+        self.assertIsNotNone(result['pareto_plot'])
+
+    def test_key_includes_overtime(self):
+        params = DataLoader.validate_params(dict(zip(
+            DataLoader.REQUIRED_COLUMNS, [10, 5, 5, 10, 300, 600, 10, 50])))
+        overtime = dict(params, Machine_1_Overtime_Hours=40)
+        self.assertNotEqual(result_key(params), result_key(overtime))
+        self.assertNotEqual(result_key(params, pareto='overtime'),
+                            result_key(overtime, pareto='overtime'))
+        self.assertEqual(result_key(params, pareto='overtime'), result_key(
+            dict(params, Machine_1_Overtime_Hours=0), pareto='overtime'))
+
+    def test_key_includes_solver_settings(self):
+        params = DataLoader.validate_params(dict(zip(
+            DataLoader.REQUIRED_COLUMNS, [10, 5, 5, 10, 300, 600, 10, 50])))
+        key = result_key(params)
+        with override_settings(OPTIMIZADOR_SOLVER={'BACKEND': 'cbc', 'TIME_LIMIT': 1}):
+            self.assertNotEqual(result_key(params), key)
+
+    def test_unproven_solutions_expire_soon(self):
+        cache = ResultCache(caches['default'], timeout=3600, unproven_timeout=60)
+        proven = {"status": "Optimal", "solver_stats": {"mip_gap": 0.0}}
+        self.assertEqual(cache.timeout_for(proven), 3600)
+        self.assertEqual(cache.timeout_for({"status": "Optimal"}), 3600)
+        self.assertEqual(cache.timeout_for(
+            {"status": "Optimal", "solver_stats": {"mip_gap": 0.02}}), 60)
+        self.assertEqual(cache.timeout_for({"status": "Not Solved"}), 60)
+
+    def test_command(self):
+        path = f"{self.tmp.name}/weekly.csv"
+        with open(path, 'w') as f:
+            f.write(self.csv)
+        with override_settings(OPTIMIZADOR_PRESOLVE={'LIBRARY_DIR': f"{self.tmp.name}/library"}):
+            out = StringIO()
+            call_command('warm_cache', register=path, stdout=out)
+            call_command('warm_cache', list=True, stdout=out)
+            call_command('warm_cache', stdout=out)
+        self.assertIn("Registered 'weekly' (2 scenarios)", out.getvalue())
+        self.assertIn("weekly: 2 scenarios", out.getvalue())
+        self.assertIn("2 warmed", out.getvalue())
+
+
+class ScheduleTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.base_dir = tmp.name
+        settings = override_settings(BASE_DIR=self.base_dir)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_default_paths_are_private(self):
+        """Test that the lock and library default to BASE_DIR/var, mode 0700."""
+        scheduler = WarmingScheduler([])
+        with override_settings(OPTIMIZADOR_PRESOLVE={}):
+            library = ScenarioLibrary.from_settings()
+
+        var = os.path.join(self.base_dir, 'var')
+        self.assertEqual(os.path.dirname(scheduler.lock_path), var)
+        self.assertEqual(os.path.dirname(library.directory), var)
+        self.assertEqual(stat.S_IMODE(os.stat(var).st_mode), 0o700)
+        self.assertEqual(stat.S_IMODE(os.stat(library.directory).st_mode), 0o700)
+
+        with patch('optimizador.presolve.warm', return_value={}):
+            scheduler.run_once()
+        self.assertEqual(stat.S_IMODE(os.stat(scheduler.lock_path).st_mode), 0o600)
+
+    def test_next_run(self):
+        scheduler = WarmingScheduler(parse_schedule(['mon 05:30', 'daily 23:00']))
+        monday = datetime.datetime(2026, 10, 19, 6, 0, tzinfo=datetime.timezone.utc)
+        self.assertEqual(scheduler.next_run(monday), monday.replace(hour=23))
+        self.assertEqual(scheduler.next_run(monday.replace(hour=23, minute=30)),
+                         datetime.datetime(2026, 10, 20, 23, 0, tzinfo=datetime.timezone.utc))
+        with self.assertRaises(ValueError):
+            parse_schedule(['someday 05:30'])
@@ -0,0 +1,98 @@
+import tracemalloc
+import unittest
+from io import StringIO
+
+import numpy as np
+from django.core.exceptions import ValidationError
+
+from optimizador.dataloader import DataLoader
+from optimizador.optimizer import OptimizationModel
+from optimizador.results import ResultsHandler
+from optimizador.scenarios import ResultBatch
+from optimizador.solver import SolverConfig
+
+
+class ScenarioBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.csv_content = """Product_A_Production_Time_Machine_1,Product_B_Production_Time_Machine_1,Machine_1_Available_Hours,Product_A_Production_Time_Machine_2,Product_B_Production_Time_Machine_2,Machine_2_Available_Hours,Price_Product_A,Price_Product_B
+10,15,600,5,8,480,25,30
+10,5,300,5,10,600,10,50
+0,15,600,0,8,480,25,30
+"""
+
+    def test_load_batch_is_compact(self):
+        """Test that DataLoader packs scenarios into 64 bytes each."""
+        batch = DataLoader(StringIO(self.csv_content)).load_batch(chunksize=2)
+
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch.itemsize, 64)
+        self.assertEqual(batch.nbytes, 3 * 64)
+        self.assertEqual(batch[1]['Price_Product_B'], 50.0)
+
+    def test_batch_uses_less_memory_than_dicts(self):
+        """Test the memory kept per scenario against one dict per scenario."""
+        n = 10000
+        header, row = self.csv_content.splitlines()[:2]
+        csv_content = header + "\n" + (row + "\n") * n
+
+        def retained(load):
+            tracemalloc.start()
+            try:
+                loaded = load()
+                current, _ = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            self.assertEqual(len(loaded), n)
+            return current / n
+
+        batch_bytes = retained(
+            lambda: DataLoader(StringIO(csv_content)).load_batch())
+        dict_bytes = retained(
+            lambda: list(DataLoader(StringIO(csv_content)).iter_scenarios()))
+
+        self.assertLess(batch_bytes, 2 * 64)
+        self.assertGreater(dict_bytes, 3 * batch_bytes)
+
+    def test_load_batch_validates(self):
+        """Test that invalid or empty files are rejected."""
+        header = self.csv_content.splitlines()[0]
+        with self.assertRaisesRegex(ValidationError, "negative"):
+            DataLoader(StringIO(header + "\n-1,1,1,1,1,1,1,1\n")).load_batch()
+        with self.assertRaisesRegex(ValidationError, "at least one row"):
+            DataLoader(StringIO(header + "\n")).load_batch()
+
+    def test_rows_behave_like_dicts(self):
+        """Test that row views work with the existing per-scenario classes."""
+        batch = DataLoader(StringIO(self.csv_content)).load_batch()
+        row = batch[0]
+
+        self.assertEqual(set(row), set(DataLoader.REQUIRED_COLUMNS))
+        self.assertFalse(hasattr(row, '__dict__'))
+        with self.assertRaises(KeyError):
+            row['Unknown']
+
+        solution = OptimizationModel(row, SolverConfig('fast')).solve()
+        self.assertAlmostEqual(solution['Total_Revenue'], 1500.0)
+
+        results = ResultBatch.empty(1)
+        results.set(0, solution)
+        formatted = ResultsHandler(results[0], row).format()
+        self.assertEqual(formatted['status'], 'Optimal')
+        self.assertAlmostEqual(formatted['Product_A'], 60.0)
+        self.assertTrue(formatted['plot'].startswith('data:image/png'))
+
+    def test_vectorized_batch_matches_single_solves(self):
+        """Test the vectorized fast path against per-scenario CBC solves."""
+        batch = DataLoader(StringIO(self.csv_content)).load_batch()
+        fast = OptimizationModel.solve_batch(batch, SolverConfig('fast'))
+        cbc = OptimizationModel.solve_batch(batch, SolverConfig('cbc'))
+
+        self.assertEqual(fast.itemsize, 25)
+        self.assertEqual([r['status'] for r in fast],
+                         ['Optimal', 'Optimal', 'Unbounded'])
+        self.assertEqual([r['status'] for r in cbc],
+                         ['Optimal', 'Optimal', 'Unbounded'])
+        np.testing.assert_allclose(
+            fast.column('Total_Revenue')[:2], cbc.column('Total_Revenue')[:2])
+        self.assertIsNone(fast[2]['Total_Revenue'])
@@ -0,0 +1,167 @@
+import os
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from optimizador.admission import Gate, Saturated
+from optimizador.dataloader import DataLoader
+from optimizador.singleflight import (
+    FileLockBackend, SingleFlight, fcntl, get_singleflight, params_key)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def _run_concurrently(self, flight, key, fn, n=8):
+        results = [None] * n
+        errors = [None] * n
+        start = threading.Barrier(n)
+
+        def worker(i):
+            start.wait()
+            try:
+                results[i] = flight.do(key, fn)
+            except Exception as e:
+                errors[i] = e
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results, errors
+
+    def test_concurrent_identical_calls_run_once(self):
+        """Test that concurrent callers with the same key share one computation."""
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"status": "Optimal"}
+
+        results, errors = self._run_concurrently(SingleFlight(), "k", slow)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(errors, [None] * 8)
+        self.assertTrue(all(r == {"status": "Optimal"} for r in results))
+
+    def test_errors_are_shared_and_not_kept(self):
+        """Test that waiters receive the leader's error and later calls rerun."""
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        results, errors = self._run_concurrently(flight, "k", failing)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+        self.assertEqual(flight.do("k", lambda: 42), 42)
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_file_backend_serializes_instances(self):
+        """Test that a second process (instance) waits for the leader, then runs."""
+        with tempfile.TemporaryDirectory() as lock_dir:
+            first = SingleFlight(FileLockBackend(lock_dir))
+            second = SingleFlight(FileLockBackend(lock_dir))
+            events = []
+
+            def lead():
+                events.append("lead start")
+                time.sleep(0.2)
+                events.append("lead end")
+                return 1
+
+            def follow():
+                events.append("follow")
+                return 2
+
+            leader = threading.Thread(target=first.do, args=("k", lead))
+            leader.start()
+            time.sleep(0.05)
+            self.assertEqual(second.do("k", follow), 2)
+            leader.join()
+
+            self.assertEqual(events, ["lead start", "lead end", "follow"])
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_file_backend_leaves_no_files(self):
+        """Test that the directory is private and no lock or result files remain."""
+        with tempfile.TemporaryDirectory() as parent:
+            lock_dir = os.path.join(parent, "flight")
+            backend = FileLockBackend(lock_dir)
+            SingleFlight(backend).do("k", lambda: {"a": [1, 2]})
+
+            self.assertEqual(stat.S_IMODE(os.stat(lock_dir).st_mode), 0o700)
+            self.assertEqual(os.listdir(lock_dir), [])
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_file_backend_waits_bounded_time(self):
+        """Test that a waiter gives up with Saturated when the lock is held too long."""
+        with tempfile.TemporaryDirectory() as lock_dir:
+            gate = Gate('solve', limit=1, max_queue=1, timeout=0.1)
+            flight = SingleFlight(FileLockBackend(lock_dir), gate)
+            fd = os.open(os.path.join(lock_dir, "k.lock"), os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                started = time.monotonic()
+                with self.assertRaises(Saturated):
+                    flight.do("k", lambda: 1)
+                self.assertLess(time.monotonic() - started, 1)
+            finally:
+                os.close(fd)
+            self.assertEqual(gate.stats()["timed_out"], 1)
+            self.assertEqual(flight.do("k", lambda: 1), 1)
+
+    def test_waiters_are_counted_and_bounded_by_the_gate(self):
+        """Test that callers waiting for an identical request use the gate's queue."""
+        gate = Gate('solve', limit=1, max_queue=1, timeout=5)
+        flight = SingleFlight(gate=gate)
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return 42
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        leader.start()
+        started.wait(5)
+        waiter = threading.Thread(target=lambda: results.append(flight.do("k", slow)))
+        waiter.start()
+        while gate.stats()["waiting"] == 0:
+            time.sleep(0.01)
+
+        # The queue is full: a third identical request is refused at once
+        with self.assertRaises(Saturated):
+            flight.do("k", slow)
+        release.set()
+        leader.join(5)
+        waiter.join(5)
+
+        self.assertEqual(results, [42, 42])
+        self.assertEqual(gate.stats()["rejected"], 1)
+        self.assertEqual(gate.stats()["waiting"], 0)
+
+    @unittest.skipIf(fcntl is None, "fcntl is not available")
+    def test_file_backend_requires_lock_dir(self):
+        """Test that the file backend is not configured without LOCK_DIR."""
+        with patch('optimizador.singleflight._default', None), \
+                override_settings(OPTIMIZADOR_SINGLEFLIGHT={'BACKEND': 'file'}):
+            with self.assertRaises(ImproperlyConfigured):
+                get_singleflight()
+
+    def test_params_key_is_normalized(self):
+        """Test that equivalent parameter sets produce the same key."""
+        params = {col: 1 for col in DataLoader.REQUIRED_COLUMNS}
+        reordered = {col: 1.0 for col in reversed(DataLoader.REQUIRED_COLUMNS)}
+
+        self.assertEqual(params_key(params), params_key(reordered))
+        self.assertNotEqual(params_key(params),
+                            params_key(dict(params, Price_Product_A=2)))
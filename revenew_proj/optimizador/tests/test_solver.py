@@ -0,0 +1,81 @@
+import unittest
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from optimizador.optimizer import OptimizationModel
+from optimizador.solver import SolverConfig, _parse_cbc_iterations
+
+
+class SolverConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.params = {
+            'Price_Product_A': 25,
+            'Price_Product_B': 30,
+            'Product_A_Production_Time_Machine_1': 10,
+            'Product_B_Production_Time_Machine_1': 15,
+            'Machine_1_Available_Hours': 600,
+            'Product_A_Production_Time_Machine_2': 5,
+            'Product_B_Production_Time_Machine_2': 8,
+            'Machine_2_Available_Hours': 480,
+        }
+
+    @override_settings(OPTIMIZADOR_SOLVER={'BACKEND': 'fast', 'TIME_LIMIT': 5})
+    def test_from_settings_with_overrides(self):
+        """Test that settings provide defaults and non-None overrides win."""
+        config = SolverConfig.from_settings(threads=4, time_limit=None)
+
+        self.assertEqual(config.backend, 'fast')
+        self.assertEqual(config.time_limit, 5)
+        self.assertEqual(config.threads, 4)
+        self.assertTrue(config.quiet)
+
+    def test_unknown_backend(self):
+        """Test that an unknown backend is a configuration error."""
+        with self.assertRaises(ImproperlyConfigured):
+            SolverConfig(backend='gurobi')
+
+    def test_cbc_reports_stats(self):
+        """Test that CBC runs report wall time and iterations."""
+        config = SolverConfig('cbc', time_limit=10, threads=1)
+        solution = OptimizationModel(self.params, config).solve()
+
+        stats = solution['solver_stats']
+        self.assertEqual(stats['backend'], 'cbc')
+        self.assertGreaterEqual(stats['wall_time'], 0)
+        self.assertIsInstance(stats['iterations'], int)
+
+    def test_fast_backend_matches_cbc(self):
+        """Test that the closed-form solver agrees with CBC."""
+        scenarios = [
+            self.params,
+            dict(self.params, Price_Product_B=60),
+            dict(self.params, Product_A_Production_Time_Machine_1=0,
+                 Product_B_Production_Time_Machine_2=2),
+            dict(self.params, Machine_1_Available_Hours=0),
+        ]
+        for params in scenarios:
+            cbc = OptimizationModel(params, SolverConfig('cbc')).solve()
+            fast = OptimizationModel(params, SolverConfig('fast')).solve()
+
+            self.assertEqual(fast['status'], cbc['status'])
+            self.assertAlmostEqual(
+                fast['Total_Revenue'], cbc['Total_Revenue'], places=5)
+
+    def test_fast_backend_unbounded(self):
+        """Test that a profitable product without machine time is unbounded."""
+        params = dict(self.params, Product_A_Production_Time_Machine_1=0,
+                      Product_A_Production_Time_Machine_2=0)
+        solution = OptimizationModel(params, SolverConfig('fast')).solve()
+
+        self.assertEqual(solution['status'], 'Unbounded')
+        self.assertIsNone(solution['Total_Revenue'])
+
+    def test_parse_cbc_iterations(self):
+        """Test iteration parsing for LP and MIP logs."""
+        self.assertEqual(_parse_cbc_iterations(
+            "Optimal objective 12 - 3 iterations time 0.002"), 3)
+        self.assertEqual(_parse_cbc_iterations(
+            "Enumerated nodes: 0\nTotal iterations:               7\n"), 7)
+        self.assertIsNone(_parse_cbc_iterations(""))
@@ -0,0 +1,178 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers, StopUpload
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from optimizador.dataloader import DataLoader
+from optimizador.uploadhandlers import ParsedCSVUpload, StreamingCSVUploadHandler
+
+HEADER = ",".join(DataLoader.REQUIRED_COLUMNS)
+
+
+def stream(content, chunk_size=7, field_name='csv_file'):
+    '''Feeds content to a handler in small chunks, like the multipart parser.'''
+    handler = StreamingCSVUploadHandler()
+    try:
+        handler.new_file(field_name, 'data.csv', 'text/csv', None)
+    except StopFutureHandlers:
+        pass
+    try:
+        for start in range(0, len(content), chunk_size):
+            handler.receive_data_chunk(content[start:start + chunk_size], start)
+    except StopUpload as e:
+        assert e.connection_reset
+        return handler, handler.rejected
+    return handler, handler.file_complete(len(content))
+
+
+class StreamingCSVUploadHandlerTest(TestCase):
+
+    def test_rows_are_parsed_across_chunk_boundaries(self):
+        """Test that lines split between chunks are reassembled."""
+        content = (f"{HEADER},Machine_1_Overtime_Hours\r\n"
+                   "10,5,5,10,300,600,10,50,4\r\n"
+                   "\r\n"
+                   "1,2,3,4,5,6,7,8,\r\n").encode()
+        _, upload = stream(content)
+
+        self.assertIsInstance(upload, ParsedCSVUpload)
+        self.assertIsNone(upload.error)
+        self.assertEqual(len(upload), 2)
+
+        first, second = list(DataLoader(upload).iter_scenarios())
+        self.assertEqual(first['Price_Product_B'], 50.0)
+        self.assertEqual(first['Machine_1_Overtime_Hours'], 4.0)
+        self.assertEqual(second['Machine_1_Overtime_Hours'], 0.0)
+
+        batch = DataLoader(upload).load_batch()
+        self.assertEqual(batch.nbytes, 2 * 64)
+        self.assertEqual(batch[1]['Price_Product_B'], 8.0)
+
+    def test_upload_stops_at_the_first_malformed_line(self):
+        """Test that the body after a malformed line is not read."""
+        content = (HEADER + "\n1,1,1,1,1,1,1,1\n1,1,1,1,1,1,1,1,1\n"
+                   + "1,1,1,1,1,1,1,1\n" * 100).encode()
+        handler, upload = stream(content)
+
+        self.assertLess(handler.received, len(content) // 4)
+        self.assertIs(upload, handler.rejected)
+        with self.assertRaisesRegex(ValidationError, "more fields"):
+            DataLoader(upload).load()
+
+    def test_quoted_fields_may_span_lines(self):
+        """Test that a newline inside a quoted field does not split the row."""
+        content = (f'{HEADER},"Note\nline"\n'
+                   '1,1,1,1,1,1,1,1,"first\nsecond, third"\n'
+                   '2,2,2,2,2,2,2,2,""\n').encode()
+        _, upload = stream(content, chunk_size=5)
+
+        self.assertIsNone(upload.error)
+        self.assertEqual(len(upload), 2)
+        self.assertEqual(upload.row_errors, {})
+        self.assertEqual(DataLoader(upload).load_batch()[1]['Price_Product_B'], 2.0)
+
+    def test_unclosed_quote_is_an_error(self):
+        content = (HEADER + '\n1,1,1,1,1,1,1,1\n"1,1,1,1,1,1,1,1\n').encode()
+        _, upload = stream(content)
+        with self.assertRaisesRegex(ValidationError, "quoted field is not closed"):
+            DataLoader(upload).load_batch()
+
+    def test_invalid_rows_are_recorded_and_parsing_goes_on(self):
+        """Test that rows with invalid values are rejected one by one."""
+        content = (HEADER + "\n1,1,1,1,1,1,1,1\n1,1,1,-1,1,1,1,1\n"
+                   + "1,1,1,1,1,1,1,1\n" * 50 + "1,x,1,1,1,1,1,1\n").encode()
+        _, upload = stream(content)
+
+        self.assertEqual(len(upload), 53)
+        self.assertEqual(list(upload.row_errors), [1, 52])
+        with self.assertRaisesRegex(ValidationError, "negative"):
+            DataLoader(upload).load_batch()
+
+        rows = list(DataLoader(upload).iter_scenarios(row_errors=True))
+        self.assertIn("negative", rows[1].messages[0])
+        self.assertIn("non-numeric", rows[52].messages[0])
+        self.assertEqual(sum(isinstance(r, dict) for r in rows), 51)
+
+    def test_header_and_value_errors_match_dataloader(self):
+        """Test that errors read like those of the pandas-based loader."""
+        cases = [
+            (b"", "No columns to parse"),
+            (b"a,b\n1,2\n", "Missing required columns"),
+            ((HEADER + "\n1,1,1,x,1,1,1,1\n").encode(), "non-numeric"),
+            ((HEADER + "\n1,1,1,1,1,1,1,1,1\n").encode(), "more fields than the 8"),
+        ]
+        for content, message in cases:
+            with self.subTest(content=content):
+                _, upload = stream(content)
+                with self.assertRaisesRegex(ValidationError, message):
+                    DataLoader(upload).load()
+
+    def test_overtime_limits_are_validated(self):
+        """Test that overtime limits must be non-negative numbers."""
+        header = f"{HEADER},Machine_1_Overtime_Hours,Machine_2_Overtime_Hours\n"
+        cases = [
+            ("1,1,1,1,1,1,1,1,-50,0\n", "negative values in overtime"),
+            ("1,1,1,1,1,1,1,1,x,0\n", "non-numeric values in overtime"),
+        ]
+        for row, message in cases:
+            with self.subTest(row=row):
+                _, upload = stream((header + row).encode())
+                with self.assertRaisesRegex(ValidationError, message):
+                    DataLoader(upload).load()
+
+    def test_load_requires_exactly_one_row(self):
+        _, upload = stream((HEADER + "\n1,1,1,1,1,1,1,1\n" * 2).encode())
+        with self.assertRaisesRegex(ValidationError, "exactly one row"):
+            DataLoader(upload).load()
+
+    def test_other_fields_are_passed_through(self):
+        """Test that uploads of other fields go to the next handler."""
+        handler = StreamingCSVUploadHandler()
+        handler.new_file('attachment', 'notes.txt', 'text/plain', None)
+        self.assertEqual(handler.receive_data_chunk(b"hello", 0), b"hello")
+        self.assertIsNone(handler.file_complete(5))
+
+
+class StreamingUploadRequestTest(TestCase):
+
+    def setUp(self):
+        self.api_url = reverse('solve_api')
+        self.rows = "10,5,5,10,300,600,10,50\n"
+
+    def test_upload_is_parsed_without_temp_file(self):
+        """Test that the view receives the parsed upload and solves it."""
+        csv_file = SimpleUploadedFile(
+            "data.csv", (HEADER + "\n" + self.rows * 3).encode(), "text/csv")
+        response = self.client.post(self.api_url, {'csv_file': csv_file})
+
+        lines = [json.loads(line) for line in b''.join(
+            response.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[2]['Total_Revenue'], 3000.0)
+
+    @override_settings(OPTIMIZADOR_MAX_UPLOAD_SIZE=512)
+    def test_oversized_request_is_refused(self):
+        csv_file = SimpleUploadedFile(
+            "data.csv", (HEADER + "\n" + self.rows * 50).encode(), "text/csv")
+        with self.assertLogs('django.security', 'ERROR'):
+            response = self.client.post(self.api_url, {'csv_file': csv_file})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_header_is_reported(self):
+        csv_file = SimpleUploadedFile(
+            "data.csv", b"a,b\n" + b"1,2\n" * 50000, "text/csv")
+        response = self.client.post(self.api_url, {'csv_file': csv_file})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Missing required columns", response.json()['error'])
+
+    def test_stopped_upload_is_reported_by_the_form_views(self):
+        """Test that a file stopped early still shows its error, not a missing field."""
+        csv_file = SimpleUploadedFile("data.csv", b"a,b\n1,2\n", "text/csv")
+        response = self.client.post(reverse('upload'), {'csv_file': csv_file})
+
+        self.assertContains(response, "Missing required columns")
+        self.assertNotContains(response, "This field is required.")
@@ -1,9 +1,13 @@
+import json
 from django.test import TestCase, Client
 from django.urls import reverse
 from unittest.mock import patch, MagicMock
 from io import StringIO
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
+from pulp import PulpSolverError
+
+from optimizador.optimizer import OptimizationModel
 
 
 class UploadViewTest(TestCase):
@@ -74,6 +78,39 @@ class UploadViewTest(TestCase):
         self.assertContains(response, "Test invalid data error")
         MockDataLoader.assert_called_once()
 
+    @patch('optimizador.views.solve_and_format')
+    def test_post_request_valid_csv_is_solved_through_singleflight(self, mock_solve):
+        """Test that a valid upload is solved once and the results rendered."""
+        mock_solve.return_value = self.formatted_result
+        csv_file = SimpleUploadedFile(
+            "valid.csv", self.valid_csv_content.encode('utf-8'),
+            content_type="text/csv")
+
+        with patch('optimizador.views.get_singleflight') as mock_flight:
+            mock_flight.return_value.do.side_effect = lambda key, fn: fn()
+            response = self.client.post(self.upload_url, {'csv_file': csv_file})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'optimizador/results.html')
+        mock_solve.assert_called_once()
+        self.assertEqual(mock_solve.call_args.args[0], self.valid_params)
+        self.assertEqual(mock_flight.return_value.do.call_count, 1)
+
+    @patch('optimizador.views.solve_and_format')
+    def test_integer_results_show_gap_and_first_incumbent(self, mock_solve):
+        """Test that the MIP gap and time to first incumbent are shown."""
+        mock_solve.return_value = dict(self.formatted_result, solver_stats={
+            'backend': 'cbc', 'wall_time': 0.5, 'iterations': None,
+            'mip_gap': 0.0125, 'time_to_first_incumbent': 0.004})
+        csv_file = SimpleUploadedFile(
+            "valid.csv", self.valid_csv_content.encode('utf-8'),
+            content_type="text/csv")
+
+        response = self.client.post(self.upload_url, {'csv_file': csv_file})
+
+        self.assertContains(response, "MIP gap 0.0125")
+        self.assertContains(response, "first incumbent after 0.004 s")
+
     def test_post_request_no_file(self):
         """Test POST request without a file (form validation error)."""
         response = self.client.post(self.upload_url, {})
@@ -81,3 +118,110 @@ class UploadViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'optimizador/upload.html')
         self.assertContains(response, "This field is required.")
+
+
+class SolveApiTest(TestCase):
+
+    def setUp(self):
+        self.client = Client()
+        self.api_url = reverse('solve_api')
+        self.params = {
+            'Product_A_Production_Time_Machine_1': 10,
+            'Product_B_Production_Time_Machine_1': 15,
+            'Machine_1_Available_Hours': 600,
+            'Product_A_Production_Time_Machine_2': 5,
+            'Product_B_Production_Time_Machine_2': 8,
+            'Machine_2_Available_Hours': 480,
+            'Price_Product_A': 25,
+            'Price_Product_B': 30
+        }
+
+    def _lines(self, response):
+        body = b"".join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_json_list_streams_one_line_per_scenario(self):
+        """Test that a JSON list is solved and streamed back as NDJSON."""
+        invalid = dict(self.params, Price_Product_A=-1)
+        response = self.client.post(
+            self.api_url, json.dumps([self.params, invalid, self.params]),
+            content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self._lines(response)
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+        self.assertEqual(lines[0]['status'], 'Optimal')
+        self.assertAlmostEqual(lines[0]['Total_Revenue'], 1500.0, places=5)
+        self.assertIn('negative', lines[1]['error'])
+        self.assertEqual(lines[2]['status'], 'Optimal')
+
+    def test_multipart_csv_with_several_rows(self):
+        """Test that every row of an uploaded CSV is solved."""
+        header = ",".join(self.params)
+        row = ",".join(str(v) for v in self.params.values())
+        csv_file = SimpleUploadedFile(
+            "batch.csv", f"{header}\n{row}\n{row}\n".encode('utf-8'),
+            content_type="text/csv")
+
+        response = self.client.post(self.api_url, {'csv_file': csv_file})
+
+        self.assertEqual(response.status_code, 200)
+        lines = self._lines(response)
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(all(line['status'] == 'Optimal' for line in lines))
+
+    def test_invalid_csv_rows_are_reported_per_scenario(self):
+        """Test that a bad CSV row gets an error line, like a bad JSON scenario."""
+        header = ",".join(self.params)
+        row = ",".join(str(v) for v in self.params.values())
+        bad = ",".join(["-1"] + row.split(",")[1:])
+        csv_file = SimpleUploadedFile(
+            "batch.csv", f"{header}\n{row}\n{bad}\n{row}\n".encode('utf-8'),
+            content_type="text/csv")
+
+        response = self.client.post(self.api_url, {'csv_file': csv_file})
+
+        self.assertEqual(response.status_code, 200)
+        lines = self._lines(response)
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+        self.assertIn('negative', lines[1]['error'])
+        self.assertEqual(lines[2]['status'], 'Optimal')
+
+    def test_solver_failure_is_reported_per_scenario(self):
+        """Test that a scenario the solver fails on gets an error line."""
+        solve = OptimizationModel.solve
+        calls = []
+
+        def flaky_solve(model):
+            calls.append(model)
+            if len(calls) == 2:
+                raise PulpSolverError("CBC crashed")
+            return solve(model)
+
+        with patch.object(OptimizationModel, 'solve', flaky_solve), \
+                self.assertLogs('optimizador.views', 'ERROR'):
+            response = self.client.post(
+                self.api_url, json.dumps([self.params] * 3),
+                content_type='application/json')
+            lines = self._lines(response)
+
+        self.assertEqual([line['index'] for line in lines], [0, 1, 2])
+        self.assertEqual(lines[1]['error'], "Solver failed: CBC crashed")
+        self.assertEqual(lines[2]['status'], 'Optimal')
+
+    def test_bad_requests_are_rejected_before_streaming(self):
+        """Test that malformed bodies get a 400 JSON error."""
+        response = self.client.post(
+            self.api_url, "{not json", content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        csv_file = SimpleUploadedFile(
+            "bad.csv", b"Price_Product_A\n1\n", content_type="text/csv")
+        response = self.client.post(self.api_url, {'csv_file': csv_file})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Missing required columns", response.json()['error'])
+
+        response = self.client.get(self.api_url)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,55 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    '''
+    Measures the time a request spends in named stages, for the
+    Server-Timing response header. Stages may be nested; time spent in an
+    inner stage is not counted for the outer one, so the stages add up to
+    the total.
+    Attributes:
+        durations (dict): Seconds per stage name, in the order stages were entered.
+    '''
+
+    def __init__(self):
+        self.durations = {}
+        self._children = []
+
+    @contextmanager
+    def stage(self, name):
+        self.durations.setdefault(name, 0.0)
+        start = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = self._children.pop()
+            self.durations[name] += elapsed - inner
+            if self._children:
+                self._children[-1] += elapsed
+
+    def header(self) -> str:
+        '''Returns the durations as a Server-Timing header value (in ms).'''
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}"
+                         for name, seconds in self.durations.items())
+
+
+def parse_server_timing(header) -> dict:
+    '''
+    Parses a Server-Timing header value.
+    Returns:
+        dict: Seconds per metric name; metrics without a duration are skipped.
+    '''
+    durations = {}
+    for metric in filter(None, (m.strip() for m in (header or '').split(','))):
+        name, *fields = [f.strip() for f in metric.split(';')]
+        for field in fields:
+            key, _, value = field.partition('=')
+            if key == 'dur':
+                try:
+                    durations[name] = float(value) / 1000
+                except ValueError:
+                    pass
+    return durations
@@ -0,0 +1,311 @@
+import codecs
+import csv
+import io
+import math
+from array import array
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig, ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import (
+    FileUploadHandler, StopFutureHandlers, StopUpload)
+from django.utils.datastructures import MultiValueDict
+
+from .dataloader import DataLoader
+
+DEFAULT_MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+# A quoted field may span lines; a record still open after this many
+# characters is taken for an unclosed quote
+MAX_RECORD_SIZE = 64 * 1024
+
+
+def uploaded_files(request):
+    '''
+    Returns request.FILES, plus the scenario CSVs whose upload was stopped
+    early because the file was invalid. Their error is raised when they are
+    loaded, like for any other ParsedCSVUpload.
+    Args:
+        request (HttpRequest): The request.
+    Returns:
+        MultiValueDict: The uploaded files by field name.
+    '''
+    files = request.FILES
+    rejected = getattr(request, 'rejected_uploads', None)
+    if not rejected:
+        return files
+    files = files.copy()
+    for name, uploads in rejected.lists():
+        for upload in uploads:
+            files.appendlist(name, upload)
+    return files
+
+
+class ParsedCSVUpload(UploadedFile):
+    '''
+    An uploaded scenario CSV that was parsed and validated while it streamed
+    in, so nothing was written to disk and nothing has to be read again.
+    Required values are kept row after row in one flat float64 array, which
+    has exactly the memory layout of scenarios.PARAMS_DTYPE. Optional numeric
+    columns are kept alongside, NaN where a value is missing or not a number;
+    overtime limits ('Machine_<m>_Overtime_Hours') are validated like the
+    required columns, with empty cells read as 0.
+    Attributes:
+        error (str): Why the file was rejected, or None if it is valid.
+        row_errors (dict): Why each invalid row (by index) was rejected.
+    '''
+
+    def __init__(self, name, content_type, size, charset, values, extras,
+                 error=None, row_errors=None):
+        super().__init__(None, name, content_type, size, charset)
+        self.error = error
+        self.row_errors = row_errors or {}
+        self._values = values
+        self._extras = extras
+
+    def __len__(self):
+        return len(self._values) // len(DataLoader.REQUIRED_COLUMNS)
+
+    def scenarios(self):
+        '''
+        Yields:
+            dict: The parameters of each scenario, in file order, or a
+                ValidationError in place of an invalid row.
+        '''
+        width = len(DataLoader.REQUIRED_COLUMNS)
+        for row in range(len(self)):
+            if row in self.row_errors:
+                yield ValidationError(self.row_errors[row])
+                continue
+            params = dict(zip(DataLoader.REQUIRED_COLUMNS,
+                              self._values[row * width:(row + 1) * width]))
+            for col, values in self._extras.items():
+                if not math.isnan(values[row]):
+                    params[col] = values[row]
+            yield params
+
+    def batch(self):
+        '''
+        Returns:
+            ScenarioBatch: The scenarios, sharing memory with the upload.
+        '''
+        from .scenarios import PARAMS_DTYPE, ScenarioBatch
+
+        return ScenarioBatch(np.frombuffer(self._values, dtype=PARAMS_DTYPE))
+
+    def close(self):
+        # Nothing to close: there is no underlying file
+        pass
+
+
+class StreamingCSVUploadHandler(FileUploadHandler):
+    '''
+    Upload handler that parses scenario CSVs chunk by chunk as they come off
+    the socket, instead of spooling them to memory or a temp file first.
+    Only the fields in FIELD_NAMES are handled; other uploads fall through to
+    Django's default handlers. The header is checked as soon as its line has
+    arrived, and the complete records of each chunk (quoted fields may span
+    lines) in one pass of pandas' C parser as soon as the chunk is in. Rows
+    with invalid values are recorded and parsing goes on, so every bad row
+    can be reported. After an error in the file itself (header, encoding,
+    malformed lines) the upload is stopped without reading the rest of the
+    body; the rejected file is kept in request.rejected_uploads (see
+    uploaded_files()). Errors are reported when the upload is loaded (by
+    DataLoader). Requests larger than OPTIMIZADOR_MAX_UPLOAD_SIZE are refused
+    with a 400 before any of the body is read.
+    Attributes:
+        rejected (ParsedCSVUpload): The upload that was stopped, if any.
+    '''
+    FIELD_NAMES = ('csv_file',)
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = getattr(settings, 'OPTIMIZADOR_MAX_UPLOAD_SIZE',
+                                DEFAULT_MAX_UPLOAD_SIZE)
+        self.active = False
+        self.rejected = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        if self.max_size is not None and content_length > self.max_size:
+            raise RequestDataTooBig(
+                f"Upload of {content_length} bytes exceeds the maximum of "
+                f"{self.max_size} bytes.")
+
+    def new_file(self, field_name, file_name, content_type, content_length,
+                 charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length,
+                         charset, content_type_extra)
+        self.active = field_name in self.FIELD_NAMES
+        if not self.active:
+            return
+
+        self.received = 0
+        self.error = None
+        self.columns = None   # Header position of each required column
+        self.extras = None    # Header position of each other column
+        self.values = array('d')
+        self.extra_values = {}
+        self.rows = 0
+        self.row_errors = {}  # Row index -> why it is invalid
+        self.line_number = 0
+        self.pending = ''
+        try:
+            self.decoder = codecs.getincrementaldecoder(charset or 'utf-8-sig')()
+        except LookupError:
+            self.error = f"Error reading CSV file: unknown encoding {charset!r}"
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.max_size is not None and self.received > self.max_size:
+            raise RequestDataTooBig(
+                f"Upload exceeds the maximum of {self.max_size} bytes.")
+        if self.error is None:
+            self._feed(raw_data, final=False)
+        if self.error is not None:
+            self._stop()
+        return None
+
+    def file_complete(self, file_size):
+        if not self.active:
+            return None
+        self.active = False
+
+        if self.error is None:
+            self._feed(b'', final=True)
+        if self.error is None and self.columns is None:
+            self.error = "Error reading CSV file: No columns to parse from file"
+        return self._upload(file_size)
+
+    def _upload(self, size):
+        return ParsedCSVUpload(
+            self.file_name, self.content_type, size, self.charset,
+            self.values, self.extra_values, self.error, self.row_errors)
+
+    def _stop(self):
+        # Nothing more of an invalid file is needed: keep it for its error
+        # and stop the parser without reading the rest of the body
+        self.active = False
+        self.rejected = self._upload(self.received)
+        if self.request is not None:
+            if not hasattr(self.request, 'rejected_uploads'):
+                self.request.rejected_uploads = MultiValueDict()
+            self.request.rejected_uploads.appendlist(self.field_name, self.rejected)
+        raise StopUpload(connection_reset=True)
+
+    def _feed(self, raw_data, final):
+        # Splits the decoded text into complete records; the unfinished last
+        # one waits for the next chunk
+        try:
+            text = self.pending + self.decoder.decode(raw_data, final)
+        except UnicodeDecodeError as e:
+            self.error = f"Error reading CSV file: {e}"
+            return
+        lines = text.split('\n')
+        self.pending = '' if final else lines.pop()
+        if '"' in text:
+            lines = self._complete_records(lines, final)
+            if self.error is not None:
+                return
+        self.line_number += len(lines)
+
+        if self.columns is None:
+            # Blank lines before the header are skipped, as by pandas
+            while lines and not lines[0].strip():
+                lines.pop(0)
+            if not lines:
+                return
+            reader = csv.reader([line + '\n' for line in lines])
+            self._read_header(next(reader))
+            lines = lines[reader.line_num:]
+        if self.error is None and any(line.strip() for line in lines):
+            self._read_rows('\n'.join(lines))
+
+    def _complete_records(self, lines, final):
+        # A line with an odd number of quotes opens (or closes) a quoted
+        # field containing a newline: lines after the last complete record
+        # go back to pending
+        complete, in_quotes = 0, False
+        for i, line in enumerate(lines):
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                complete = i + 1
+        if complete < len(lines):
+            self.pending = '\n'.join(lines[complete:] + [self.pending])
+            if final or len(self.pending) > MAX_RECORD_SIZE:
+                self.error = ("Error reading CSV file: a quoted field is not "
+                              f"closed after line {self.line_number + complete}")
+        return lines[:complete]
+
+    def _read_header(self, header):
+        header = [name.strip() for name in header]
+        missing = [col for col in DataLoader.REQUIRED_COLUMNS if col not in header]
+        if missing:
+            self.error = f"Missing required columns: {missing}"
+            return
+        self.width = len(header)
+        self.columns = [header.index(col) for col in DataLoader.REQUIRED_COLUMNS]
+        self.extras = {name: i for i, name in enumerate(header)
+                       if name and name not in DataLoader.REQUIRED_COLUMNS}
+        self.extra_values = {name: array('d') for name in self.extras}
+
+    def _read_rows(self, text):
+        # The complete lines of a chunk go through pandas' C parser at once.
+        # One column more than the header catches lines with extra fields.
+        try:
+            try:
+                df = self._parse(text, dtype={i: 'f8' for i in self.columns})
+            except ValueError as e:
+                if 'could not convert' not in str(e) and 'Unable to parse' not in str(e):
+                    raise
+                # Some required value is not a number: parse as text and
+                # find the rows below
+                df = self._parse(text, dtype=str)
+        except Exception as e:
+            self.error = f"Error reading CSV file: {e}"
+            return
+        if df[self.width].notna().any():
+            self.error = ("Error reading CSV file: a row has more fields "
+                          f"than the {self.width} columns of the header")
+            return
+
+        # Invalid values only reject their row: the rest of the file is
+        # still read, so callers can report every bad row. The checks run
+        # from last to first so each row keeps the message DataLoader gives.
+        required = df[self.columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='f8')
+        errors = np.full(len(df), '', dtype=object)
+        extras = {}
+        checks = [(np.isnan(required).any(axis=1),
+                   "CSV contains non-numeric values in required columns."),
+                  ((required < 0).any(axis=1),
+                   "CSV contains negative values in required columns.")]
+        for name, i in self.extras.items():
+            extra = pd.to_numeric(df[i], errors='coerce').to_numpy(dtype='f8')
+            if name in DataLoader.OVERTIME_COLUMNS:
+                # Validated like DataLoader does: empty is 0, else a number >= 0
+                checks += [(np.isnan(extra) & df[i].notna().to_numpy(),
+                            "CSV contains non-numeric values in overtime columns."),
+                           (extra < 0,
+                            "CSV contains negative values in overtime columns.")]
+                extra = np.nan_to_num(extra, nan=0.0)
+            extras[name] = extra
+        for invalid, message in reversed(checks):
+            errors[invalid] = message
+        for row in np.flatnonzero(errors != ''):
+            self.row_errors[self.rows + int(row)] = errors[row]
+        self.rows += len(df)
+
+        self.values.frombytes(np.ascontiguousarray(required).tobytes())
+        for name, extra in extras.items():
+            self.extra_values[name].frombytes(extra.tobytes())
+
+    def _parse(self, text, dtype):
+        return pd.read_csv(io.StringIO(text), header=None, index_col=False,
+                           names=range(self.width + 1), dtype=dtype)
@@ -3,4 +3,7 @@ from . import views
 
 urlpatterns = [
     path("", views.upload_view, name="upload"),
+    path("compare/", views.compare_view, name="compare"),
+    path("api/solve/", views.solve_api, name="solve_api"),
+    path("api/metrics/", views.metrics_view, name="metrics"),
 ]
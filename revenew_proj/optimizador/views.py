@@ -1,44 +1,318 @@
+import json
+import logging
+from itertools import chain
+
+from django.conf import settings
 from django.shortcuts import render
 from django.core.exceptions import ValidationError
 from django.contrib import messages
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 
-from .forms import UploadForm
+from .admission import Saturated, get_admission
+from .compare import ScenarioComparison
+from .forms import CompareForm, UploadForm
 from .dataloader import DataLoader
+from .models import OptimizationRun
 from .optimizer import OptimizationModel
-from .results import ResultsHandler
+from .presolve import result_key, solve_and_format
+from .singleflight import get_singleflight
+from .timing import StageTimer
+from .uploadhandlers import uploaded_files
 
-# Create your views here.
+logger = logging.getLogger(__name__)
 
 
 def upload_view(request):
+    # Time per stage goes out in the Server-Timing header (see loadtest)
+    timer = StageTimer()
     if request.method == 'POST':
-        form = UploadForm(request.POST, request.FILES)
+        with timer.stage('upload'):
+            form = UploadForm(request.POST, uploaded_files(request))
 
         if form.is_valid():
             try:
                 # --- STEP 1: Load and validate uploaded CSV ---
-                csv_file = request.FILES['csv_file']
-                loader = DataLoader(csv_file)
-                params = loader.load()
+                with timer.stage('load'):
+                    csv_file = form.cleaned_data['csv_file']
+                    loader = DataLoader(csv_file)
+                    params = loader.load()
 
-                # --- STEP 2: Solve the optimization problem ---
-                model = OptimizationModel(params)
-                solution = model.solve()
+                # --- STEPS 2-3: Solve and format, once per identical upload ---
+                # Concurrent uploads of the same parameters share one computation
+                integer = form.cleaned_data['integer_mode']
+                pareto = form.cleaned_data['pareto_objective']
+                # Pre-solved (warmed) results come straight from the cache
+                with timer.stage('compute'):
+                    result = get_singleflight().do(
+                        result_key(params, integer, pareto),
+                        lambda: solve_and_format(params, integer, pareto, timer=timer))
 
-                # --- STEP 3: Format the result for display ---
-                # MODIFICATION HERE: Pass 'params' to ResultsHandler
-                formatter = ResultsHandler(solution, params)
-                result = formatter.format()
+                # Kept so the scenario can be compared with others later
+                with timer.stage('record'):
+                    run = OptimizationRun.record(
+                        csv_file.name, params, integer, result,
+                        load_test=_load_test_tag(request))
 
                 # --- STEP 4: Render the results page ---
-                return render(request, 'optimizador/results.html', {
-                    'result': result
-                })
+                with timer.stage('render'):
+                    response = render(request, 'optimizador/results.html', {
+                        'result': result,
+                        'run': run,
+                    })
+                return _with_server_timing(response, timer)
 
             except ValidationError as e:
                 messages.error(request, str(e))
 
+            except Saturated as e:
+                # Shed load instead of queueing more solver processes
+                messages.error(request, "The server is busy, please try again "
+                                        f"in {e.retry_after} seconds.")
+                response = render(request, 'optimizador/upload.html',
+                                  {'form': form}, status=503)
+                response['Retry-After'] = str(e.retry_after)
+                return _with_server_timing(response, timer)
+
     else:
         form = UploadForm()
 
-    return render(request, 'optimizador/upload.html', {'form': form})
+    response = render(request, 'optimizador/upload.html', {'form': form})
+    return _with_server_timing(response, timer)
+
+
+def _load_test_tag(request):
+    '''
+    Returns the X-Load-Test tag of a request, or '' if it has none or may
+    not set one. Runs marked with a tag are deleted by the loadtest command,
+    so the tag is only taken with DEBUG on or with the configured
+    OPTIMIZADOR_LOAD_TEST_TOKEN in X-Load-Test-Token.
+    '''
+    tag = request.headers.get('X-Load-Test', '')
+    if not tag or settings.DEBUG:
+        return tag[:32]
+    token = getattr(settings, 'OPTIMIZADOR_LOAD_TEST_TOKEN', None)
+    if token and constant_time_compare(
+            request.headers.get('X-Load-Test-Token', ''), token):
+        return tag[:32]
+    return ''
+
+
+def _with_server_timing(response, timer):
+    if timer.durations:
+        response['Server-Timing'] = timer.header()
+    return response
+
+
+def compare_view(request):
+    '''
+    Compares scenarios side by side: stored runs selected with ?runs=3,5,8
+    (or repeated 'runs' parameters), or the rows of an uploaded batch CSV,
+    which are solved together. The first scenario is the baseline.
+    '''
+    form = CompareForm()
+    comparison = None
+    try:
+        if request.method == 'POST':
+            form = CompareForm(request.POST, uploaded_files(request))
+            if form.is_valid():
+                batch = DataLoader(form.cleaned_data['csv_file']).load_batch()
+                ScenarioComparison.check_size(len(batch))
+                with get_admission().solve.slot():
+                    comparison = ScenarioComparison.from_batch(
+                        batch, form.cleaned_data['integer_mode'])
+        elif request.GET.getlist('runs'):
+            comparison = ScenarioComparison.from_runs(
+                _selected_runs(request.GET.getlist('runs')))
+
+    except ValidationError as e:
+        messages.error(request, '; '.join(e.messages))
+
+    except Saturated as e:
+        messages.error(request, "The server is busy, please try again "
+                                f"in {e.retry_after} seconds.")
+        response = render(request, 'optimizador/compare.html', {
+            'form': form, 'runs': OptimizationRun.objects.all()[:50]}, status=503)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+
+    context = {'form': form, 'runs': OptimizationRun.objects.all()[:50]}
+    if comparison is not None:
+        # One chart for all scenarios, skipped when the renderer is busy
+        with get_admission().render.try_slot() as plots:
+            context['plot'] = comparison.plot() if plots else None
+        context['rows'] = comparison.rows()
+        context['plots_skipped'] = not plots
+    return render(request, 'optimizador/compare.html', context)
+
+
+def _selected_runs(values):
+    try:
+        ids = [int(v) for value in values for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise ValidationError("Run IDs must be integers.")
+    ScenarioComparison.check_size(len(ids))
+    found = OptimizationRun.objects.in_bulk(ids)
+    missing = [str(i) for i in ids if i not in found]
+    if missing:
+        raise ValidationError(f"Unknown runs: {', '.join(missing)}.")
+    return [found[i] for i in ids]
+
+
+@csrf_exempt
+@require_POST
+def solve_api(request):
+    '''
+    Bulk solve endpoint for machine clients.
+    Accepts either a JSON body (a list of parameter objects, or an object with
+    a "scenarios" list) or a multipart upload with a "csv_file" holding one
+    scenario per row. Results are streamed back as NDJSON, one line per
+    scenario, as soon as each one is solved. Pass ?integer=1 to plan whole
+    units only.
+    '''
+    integer = request.GET.get('integer', '').lower() in ('1', 'true', 'yes')
+
+    if request.content_type == 'application/json':
+        try:
+            payload = json.loads(request.body)
+        except ValueError as e:
+            return JsonResponse({'error': f"Invalid JSON body: {e}"}, status=400)
+
+        if isinstance(payload, dict):
+            payload = payload.get('scenarios')
+        if not isinstance(payload, list):
+            return JsonResponse(
+                {'error': "Expected a list of scenarios."}, status=400)
+        scenarios = iter(payload)
+        validate = DataLoader.validate_params
+
+    elif 'csv_file' in uploaded_files(request):
+        # Rows with invalid values get error lines, like invalid JSON scenarios
+        scenarios = DataLoader(
+            uploaded_files(request)['csv_file']).iter_scenarios(row_errors=True)
+        validate = None
+
+        # Pull the first chunk eagerly so errors in the file itself (e.g. its
+        # header) get a proper 400 instead of an error line in an already
+        # started stream
+        try:
+            first = next(scenarios, None)
+        except ValidationError as e:
+            return JsonResponse({'error': '; '.join(e.messages)}, status=400)
+        if first is not None:
+            scenarios = chain([first], scenarios)
+
+    else:
+        return JsonResponse(
+            {'error': "Send a JSON body or a 'csv_file' upload."}, status=400)
+
+    # Each scenario takes a solve slot only while it is solved, so a slow
+    # client holds none. The first one is solved before the response
+    # starts: if the server is busy the request still gets a proper 503.
+    lines = _stream_solutions(scenarios, validate, integer)
+    try:
+        first = next(lines, None)
+    except Saturated as e:
+        return _busy_response(e)
+    if first is not None:
+        lines = chain([first], lines)
+
+    response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+    response['X-Accel-Buffering'] = 'no'  # Let proxies pass lines through
+    return response
+
+
+def _busy_response(error):
+    response = JsonResponse({'error': str(error)}, status=503)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+@require_GET
+def metrics_view(request):
+    '''
+    Admission control counters of this process, for autoscaling: per gate,
+    the configured limit, active and waiting requests, and how many were
+    admitted, rejected (queue full) or timed out. JSON by default,
+    ?format=prometheus for the Prometheus text format.
+    '''
+    stats = get_admission().stats()
+    if request.GET.get('format') != 'prometheus':
+        return JsonResponse(stats)
+
+    lines = []
+    for name, kind in (('active', 'gauge'), ('waiting', 'gauge'),
+                       ('admitted', 'counter'), ('rejected', 'counter'),
+                       ('timed_out', 'counter')):
+        suffix = '_total' if kind == 'counter' else ''
+        metric = f"optimizador_admission_{name}{suffix}"
+        lines.append(f"# TYPE {metric} {kind}")
+        lines += [f'{metric}{{gate="{gate}"}} {values[name]}'
+                  for gate, values in stats.items()]
+    return HttpResponse('\n'.join(lines) + '\n',
+                        content_type='text/plain; version=0.0.4')
+
+
+def _stream_solutions(scenarios, validate=None, integer=False):
+    '''
+    Solves scenarios one at a time and yields one NDJSON line per scenario.
+    Each solve takes a slot of the 'solve' admission gate, released before
+    its line is yielded. If no slot frees up in time, the stream ends with an
+    error line for that scenario (carrying 'retry_after'); before any line
+    was yielded, Saturated is raised instead.
+    Args:
+        scenarios (iterator): Parameter dictionaries, consumed lazily, or
+            a ValidationError in place of an invalid scenario.
+        validate (callable): Optional per-scenario validator. Invalid
+            scenarios, and scenarios the solver fails on, produce an error
+            line and the stream goes on.
+        integer (bool): Whether to plan whole units only.
+    Yields:
+        bytes: A JSON document followed by a newline.
+    Raises:
+        Saturated: If the first scenario could not be admitted.
+    '''
+    gate = get_admission().solve
+    index = 0
+    while True:
+        try:
+            params = next(scenarios)
+        except StopIteration:
+            return
+        except ValidationError as e:
+            # The source itself is broken (e.g. a malformed CSV chunk): report
+            # and stop
+            yield _ndjson({'index': index, 'error': '; '.join(e.messages)})
+            return
+
+        try:
+            if isinstance(params, ValidationError):
+                raise params
+            if validate is not None:
+                params = validate(params)
+            with gate.slot():
+                solution = OptimizationModel(params, integer=integer).solve()
+            line = {'index': index, **solution}
+        except Saturated as e:
+            if index == 0:
+                raise
+            # The client may resume from this scenario later
+            yield _ndjson({'index': index, 'error': str(e),
+                           'retry_after': e.retry_after})
+            return
+        except ValidationError as e:
+            line = {'index': index, 'error': '; '.join(e.messages)}
+        except Exception as e:
+            # The response is already a 200: a failing scenario can only be
+            # reported in its own line, the others are still solved
+            logger.exception("Solving scenario %d of a batch failed", index)
+            line = {'index': index, 'error': f"Solver failed: {e}"}
+
+        yield _ndjson(line)
+        index += 1
+
+
+def _ndjson(obj):
+    return (json.dumps(obj) + '\n').encode('utf-8')
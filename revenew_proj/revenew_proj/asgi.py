@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'revenew_proj.settings')
 
 application = get_asgi_application()
+
+# Pre-solves registered parameter sets on OPTIMIZADOR_PRESOLVE['SCHEDULE'].
+# Started here, with the server, so management commands never run one.
+from optimizador.presolve import start_scheduler  # noqa: E402
+
+start_scheduler()
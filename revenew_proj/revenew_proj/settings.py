@@ -122,3 +122,127 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Optimization solver
+# BACKEND: 'cbc' (bundled with PuLP), 'highs' (requires highspy) or 'fast'
+# (built-in closed-form solver for the two-product, two-machine model).
+# TIME_LIMIT is in seconds; None values leave the solver default.
+
+OPTIMIZADOR_SOLVER = {
+    'BACKEND': 'cbc',
+    'TIME_LIMIT': 60,
+    'MIP_GAP': None,
+    'THREADS': 1,
+    'QUIET': True,
+}
+
+
+# Uploads
+# Scenario CSVs ('csv_file' fields) are parsed and validated while they stream
+# in, without temp files; other uploads use Django's default handlers.
+# Requests larger than OPTIMIZADOR_MAX_UPLOAD_SIZE (bytes) are refused.
+
+FILE_UPLOAD_HANDLERS = [
+    'optimizador.uploadhandlers.StreamingCSVUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+OPTIMIZADOR_MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+
+
+# Compiled-model cache
+# Built solver models are kept by structure (names, senses, sparsity) and new
+# coefficients are patched into them, so repeated shapes skip model building.
+# MAX_ENTRIES = 0 disables the cache. With EXPORT_DIR set, every solved model
+# is also saved there (.npz) for 'manage.py replay_models'.
+
+OPTIMIZADOR_MODEL_CACHE = {
+    'MAX_ENTRIES': 64,
+    'MAX_IDLE': 4,
+    'EXPORT_DIR': None,
+}
+
+
+# Request coalescing
+# Identical uploads solved concurrently share one computation. The 'file'
+# backend also coalesces across processes through lock files in LOCK_DIR,
+# which must be private to the user the web processes run as: a process
+# waiting for another one solving the same upload then reuses its result
+# from the result cache. 'local' only coalesces within a process. Waiting
+# requests take room in the solve queue and wait at most QUEUE_TIMEOUT
+# (see OPTIMIZADOR_ADMISSION below).
+
+OPTIMIZADOR_SINGLEFLIGHT = {
+    'BACKEND': 'file',
+    'LOCK_DIR': BASE_DIR / 'var' / 'singleflight',
+}
+
+
+# Admission control (per process)
+# At most MAX_SOLVES solver runs and MAX_RENDERS plot renders at once; up to
+# MAX_QUEUE requests wait for a slot. Solves that wait longer than
+# QUEUE_TIMEOUT seconds get a 503 with Retry-After; renders that wait longer
+# than RENDER_TIMEOUT are skipped. Counters: /optimizador/api/metrics/
+
+OPTIMIZADOR_ADMISSION = {
+    'MAX_SOLVES': 4,
+    'MAX_RENDERS': 2,
+    'MAX_QUEUE': 16,
+    'QUEUE_TIMEOUT': 10,
+    'RENDER_TIMEOUT': 1,
+    'RETRY_AFTER': 5,
+}
+
+
+# Result caches
+# Solutions and rendered plots of uploads are cached by parameters in the
+# CACHES entry named by ALIAS. It should be shared by all web processes (and
+# 'manage.py warm_cache') for pre-solved results to be found. Keys include the
+# OPTIMIZADOR_SOLVER settings; solutions not proven optimal are only kept for
+# UNPROVEN_TIMEOUT seconds. The file-based cache unpickles what it reads, so
+# its LOCATION must be private to the user the web processes run as (Django
+# creates it with mode 0700).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'optimizador': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'var' / 'results',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+OPTIMIZADOR_RESULT_CACHE = {
+    'ALIAS': 'optimizador',
+    'TIMEOUT': 7 * 24 * 3600,
+    'UNPROVEN_TIMEOUT': 300,
+}
+
+
+# Pre-solving (cache warming)
+# Parameter sets registered with 'manage.py warm_cache --register' are kept in
+# LIBRARY_DIR and solved and rendered ahead of time, by 'manage.py warm_cache'
+# or, with SCHEDULE set (e.g. ['mon 05:30'], TIME_ZONE), by a scheduler that
+# the web server starts (from wsgi.py or asgi.py; management commands never
+# do). VARIANTS are the (integer, pareto objective) options warmed per
+# scenario. Warming only uses solver and render slots no request waits for.
+
+OPTIMIZADOR_PRESOLVE = {
+    'LIBRARY_DIR': BASE_DIR / 'scenario_library',
+    'SCHEDULE': [],
+    'WORKERS': 1,
+    'VARIANTS': [(False, '')],
+}
+
+
+# Load testing
+# 'manage.py loadtest' marks the runs its uploads record (X-Load-Test header)
+# and deletes them afterwards. The mark is only accepted with DEBUG on, or
+# from requests carrying this token in X-Load-Test-Token: set it (to a long
+# random string) to load test a server running with DEBUG off.
+
+OPTIMIZADOR_LOAD_TEST_TOKEN = None